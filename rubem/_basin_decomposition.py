@@ -0,0 +1,96 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+__all__ = ["partition_basins", "mosaic_partitions"]
+
+
+def partition_basins(basins: np.ndarray, missing_value: int, partitions: int) -> list:
+    """Split the drainage basins of a grid into partitions with balanced numbers of cells.
+
+    The basins are assigned from the largest to the smallest, each one to the partition with the
+    fewest cells so far. A basin is never split, so the partitions can be simulated apart.
+
+    :param basins: The drainage basin identifier of each cell of the grid.
+    :type basins: np.ndarray
+
+    :param missing_value: The identifier of the cells that do not belong to any basin.
+    :type missing_value: int
+
+    :param partitions: The maximum number of partitions.
+    :type partitions: int
+
+    :return: A boolean mask of the cells of each partition. There are fewer than ``partitions``
+        masks if there are fewer basins.
+    :rtype: list[np.ndarray]
+
+    :raises ValueError: If ``partitions`` is not positive.
+    """
+    if partitions < 1:
+        raise ValueError(f"Number of partitions must be positive: {partitions}")
+
+    basins = np.asarray(basins)
+    is_basin = basins != missing_value
+    _, index, counts = np.unique(basins[is_basin], return_inverse=True, return_counts=True)
+
+    loads = np.zeros(min(partitions, counts.size), dtype=np.int64)
+    assignment = np.empty(counts.size, dtype=np.intp)
+    for basin in np.argsort(-counts, kind="stable"):
+        partition = int(np.argmin(loads))
+        assignment[basin] = partition
+        loads[partition] += counts[basin]
+
+    labels = np.full(basins.shape, -1, dtype=np.intp)
+    labels[is_basin] = assignment[index]
+    return [labels == partition for partition in range(loads.size)]
+
+
+def mosaic_partitions(shape: tuple, partitions: list, path: Optional[str] = None) -> dict:
+    """Merge the raster series of the partitions of a grid into series of the whole grid.
+
+    The series are merged one timestep at a time, so the series of the partitions can be
+    memory-mapped files which are never fully loaded in memory.
+
+    :param shape: The ``(rows, cols)`` shape of the grid.
+    :type shape: tuple
+
+    :param partitions: The ``(offset, rasters)`` of each partition, where ``offset`` is the
+        ``(row, col)`` of the grid where its window starts and ``rasters`` are its
+        ``(steps, rows, cols)`` series indexed by variable, with ``NaN`` outside the partition.
+    :type partitions: list[tuple]
+
+    :param path: Directory where the merged series are written as memory-mapped NumPy array
+        files (``.npy``), named after their variable. If ``None``, they are held in memory.
+        Default is ``None``.
+    :type path: Optional[str]
+
+    :return: The ``(steps, *shape)`` series of each variable, with ``NaN`` where no partition has
+        a value.
+    :rtype: dict
+    """
+    mosaic = {}
+    for (row_offset, col_offset), rasters in partitions:
+        for variable, series in rasters.items():
+            if variable not in mosaic:
+                mosaic_shape = (series.shape[0], *shape)
+                if path is None:
+                    mosaic[variable] = np.full(mosaic_shape, np.nan, dtype=np.float32)
+                else:
+                    mosaic[variable] = np.lib.format.open_memmap(
+                        os.path.join(path, f"{variable}.npy"),
+                        mode="w+",
+                        dtype=np.float32,
+                        shape=mosaic_shape,
+                    )
+                    for values in mosaic[variable]:
+                        values.fill(np.nan)
+
+            num_rows, num_cols = series.shape[1:]
+            window = mosaic[variable][
+                :, row_offset : row_offset + num_rows, col_offset : col_offset + num_cols
+            ]
+            for step, values in enumerate(series):
+                np.copyto(window[step], values, where=~np.isnan(values))
+
+    return mosaic
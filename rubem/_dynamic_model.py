@@ -1,7 +1,8 @@
 from calendar import monthrange
+import hashlib
 import os
 import logging
-from typing import Callable, Optional, Union
+from typing import Callable, Dict, Optional, Union
 
 from dateutil.relativedelta import relativedelta
 import numpy as np
@@ -9,13 +10,44 @@ import pcraster as pcr
 from pcraster._pcraster import Field
 import pcraster.framework as pcrfw
 
+from . import __release__
+from ._sample_locations import SampleLocations
+from .cache import StaticMapCache
+from .configuration.forcing_transforms import FORCING_TRANSFORM_SERIES
+from .configuration.input_table_files import LANDUSE_PARAMETER_COLUMNS, SOIL_PARAMETER_COLUMNS
 from .configuration.model_configuration import ModelConfiguration
 from .configuration.output_format import OutputFileFormat
-from .file._file_generators import report
+from .configuration.output_raster_base import OutputRasterBase
+from .file._file_generators import report, report_time_series
+from .file._file_readers import (
+    GDAL_SERIES_FILE_EXTENSIONS,
+    RasterGridGeometry,
+    array_to_field,
+    field_to_array,
+    generate_raster_series_file_name,
+    get_missing_value,
+    is_pcraster_map,
+    raster_matches_grid,
+    read_raster,
+)
+from .file._frame_cache import get_frame_cache
+from .file._input_cube import INPUT_CUBE_SERIES, INPUT_CUBE_SERIES_DATA_TYPES, InputCube
+from .file._parameter_table import ParameterTable
+from .file._raster_prefetcher import RasterPrefetcher
+from .file._series_files import is_single_file_series, open_single_file_series
+from .file._series_manifest import SeriesManifest
+from .hooks import StepContext
 from .hydrological_processes import Evapotranspiration, Interception, Soil, SurfaceRunoff
+from .replay import ReplayStore
+from .routing import FlowNetwork, smooth_runoff
+
+REPLAY_CACHE_DIRECTORY_NAME = "replay"
 
 MISSING_VALUE_DEFAULT = -9999
 
+# Size of the float64 timesteps of the discharge block routed at once by the batch routing engine
+ROUTING_CHUNK_BYTES = 64 * 1024 * 1024
+
 
 class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
     """Rainfall-Runoff Balance Enhanced Model.
@@ -27,13 +59,50 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
     has the flexibility to study a wide range of applications, including impacts of changes in
     climate and land use, has flexible spatial resolution, the inputs are raster-type matrix
     files obtained from remote sensing data and operates with a reduced number of parameters.
+
+    :param config: The model configuration.
+    :type config: ModelConfiguration
+
+    :param write_outputs: If ``False``, no raster series nor time series files are written. Defaults to ``True``.
+    :type write_outputs: bool, optional
+
+    :param hooks: Hooks run by the model at each timestep. Defaults to ``None``.
+    :type hooks: Optional[list[rubem.hooks.StepHook]], optional
+
+    :param partition: Boolean ``(rows, cols)`` array of the grid cells to be simulated, e.g. some of
+        the drainage basins of the clone. If ``None``, every cell is simulated. Defaults to ``None``.
+    :type partition: Optional[np.ndarray], optional
+
+    :param static_map_cache: Store of the static maps derived from the inputs by previous runs, which are loaded instead of being derived again. Defaults to ``None``.
+    :type static_map_cache: Optional[rubem.cache.StaticMapCache], optional
+
+    :param prefetcher: Reader of the input raster series of the next timesteps in background threads. Defaults to ``None``.
+    :type prefetcher: Optional[rubem.file._raster_prefetcher.RasterPrefetcher], optional
+
+    :param terrain: The ``dem``, ``ldd`` and ``slope`` arrays of the clone, as returned by :meth:`get_terrain`, used instead of reading the DEM and deriving the LDD and slope again, e.g. by the worker processes of a decomposed run. Defaults to ``None``.
+    :type terrain: Optional[dict], optional
     """
 
-    def __init__(self, config: ModelConfiguration):
+    def __init__(
+        self,
+        config: ModelConfiguration,
+        write_outputs: bool = True,
+        hooks: Optional[list] = None,
+        partition: Optional[np.ndarray] = None,
+        static_map_cache: Optional[StaticMapCache] = None,
+        prefetcher: Optional[RasterPrefetcher] = None,
+        terrain: Optional[dict] = None,
+    ):
         pcrfw.DynamicModel.__init__(self)
         self.logger = logging.getLogger(__name__)
 
         self.config = config
+        self.write_outputs = write_outputs
+        self.hooks = list(hooks or [])
+        self.partition = partition
+        self.static_map_cache = static_map_cache
+        self.prefetcher = prefetcher
+        self.terrain = terrain
         os.chdir(self.config.output_directory.path)
 
         self.logger.info("Reading clone file...")
@@ -41,9 +110,30 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
 
         self.sample_time_series_dict = {}
         self.sample_vals = None
+        self.sample_locations = self.config.raster_files.sample_locations
+        self.output_raster_base = self.config.output_raster_base
+        self.read_geometry = None
+        self.domain_mask = None
+        self.domain_offset = (0, 0)
+        self.grid_shape = None
+        self.basin_totals = {}
+        self.replay_stores = {}
+        self.sample_index = None
         self.dem = None
         self.ldd = None
         self.slope = None
+        self.flow_network = None
+        self.input_cube = None
+        self.series_files = {}
+        self.__held_maps = {}
+        self.__landuse_attributes = None
+        self.__forcing_zone_factors = {}
+        self.__series_file_extensions = {}
+        self.__clone_maps = {}
+        self.discharge_block = None
+        self.runoff_block = None
+        self.accumulated_cell_total_discharge = None
+        self.current_runoff = None
         self.ndvi_max = None
         self.ndvi_min = None
         self.previous_ndvi = None
@@ -69,6 +159,9 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         self.soil_moistute_content_wilting_point = None
         self.soil_moisture_content_field_capacity = None
 
+        if self.config.domain.is_preview:
+            self.__setup_preview_grid()
+
     def initial(self):
         """Contains the initialization of variables used in the model.
 
@@ -78,99 +171,112 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
 
         self.logger.info("Setting up model initial parameters...")
 
-        self.logger.debug("Reading DEM file...")
-        self.dem = self.__readmap_wrapper(self.config.raster_files.dem)
-
-        if self.config.raster_files.ldd:
-            self.logger.info("Reading Local Drain Direction (LDD) file...")
-            self.ldd = self.__readmap_wrapper(
-                file_path=self.config.raster_files.ldd,
-                conversion_func=pcr.ldd,
-            )
-        else:
-            self.logger.info(
-                "Local Drain Direction (LDD) raster map not specified, generating one based on DEM..."
-            )
-            self.ldd = pcrfw.lddcreate(self.dem, 1e31, 1e31, 1e31, 1e31)
-
-        self.logger.info("Creating slope map based on DEM...")
-        self.slope = pcrfw.slope(self.dem)
+        if self.ldd is None:
+            self.__initial_setup_terrain()
 
         if self.config.raster_files.sample_locations and self.config.output_variables.tss:
-            self.logger.info("Setting up TSS output files...")
             self.sample_vals = self.__initial_setup_sample_locations()
-            self.__initial_setup_timeoutput_timeseries()
 
-        self.logger.info("Reading min. and max. NDVI rasters...")
-        self.ndvi_max = self.__readmap_wrapper(self.config.raster_files.ndvi_max)
-        self.ndvi_min = self.__readmap_wrapper(self.config.raster_files.ndvi_min)
+        if self.partition is not None or (
+            self.config.domain.clip_to_samples_catchment
+            and self.config.raster_files.sample_locations
+        ):
+            self.__initial_setup_domain()
 
-        self.logger.info("Computing min. and max. Reflectances Simple Ratio (SR)")
-        self.min_reflectances_simple_ratio = Interception.get_reflectances_simple_ration(
-            self.ndvi_min
-        )
-        self.max_reflectances_simple_ratio = Interception.get_reflectances_simple_ration(
-            self.ndvi_max
-        )
+        if self.config.raster_series.cube:
+            self.input_cube = self.__open_input_cube()
 
-        self.logger.info("Reading soil attributes...")
-        soil = self.__readmap_wrapper(self.config.raster_files.soil)
+        for series, transform in self.config.forcing_transforms.items():
+            if transform.zones:
+                self.logger.info("Reading zones of the %s forcing transform...", series)
+                zones = self.__readmap_wrapper(
+                    transform.zones, conversion_func=pcr.nominal, data_type=pcr.Nominal
+                )
+                self.__forcing_zone_factors[series] = transform.get_zone_factors(
+                    field_to_array(zones, pcr.Nominal)
+                )
 
-        self.logger.info("Reading hydraulic conductivity coefficient...")
-        self.soil_hydraulic_conductivity_coef = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.k_sat,
-            lookup_value=soil,
-            lookup_func=pcrfw.lookupscalar,
-        )
+        if self.config.routing.engine in ("numpy", "batch"):
+            self.logger.info("Sorting the Local Drain Direction (LDD) network...")
+            self.flow_network = FlowNetwork.from_ldd(
+                field_to_array(self.ldd, pcr.Ldd), get_missing_value(pcr.Ldd)
+            )
 
-        self.logger.info("Reading soil density...")
-        self.soil_bulk_density = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.bulk_density,
-            lookup_value=soil,
-            lookup_func=pcrfw.lookupscalar,
-        )
+        if self.config.routing.is_batch:
+            self.discharge_block = np.full(
+                (self.config.simulation_period.total_steps, *self.flow_network.shape),
+                np.nan,
+                dtype=np.float32,
+            )
 
-        self.logger.info("Reading soil root zone depth...")
-        self.soil_rootzone_depth = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.rootzone_depth,
-            lookup_value=soil,
-            lookup_func=pcrfw.lookupscalar,
-        )
+        if self.config.raster_files.sample_locations:
+            self.sample_index = self.__initial_setup_sample_index()
 
-        self.logger.info("Reading soil moisture for saturation of the first layer...")
-        tusat_partial = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.t_sat,
-            lookup_value=soil,
-            lookup_func=pcrfw.lookupscalar,
+        if (
+            self.write_outputs
+            and self.config.raster_files.sample_locations
+            and self.config.output_variables.tss
+        ):
+            self.logger.info("Setting up TSS output files...")
+            self.__initial_setup_timeoutput_timeseries()
+
+        ndvi = self.__setup_static_maps(
+            name="NDVI",
+            files={
+                "ndvi_max": self.config.raster_files.ndvi_max,
+                "ndvi_min": self.config.raster_files.ndvi_min,
+            },
+            data_types={
+                "ndvi_max": pcr.Scalar,
+                "ndvi_min": pcr.Scalar,
+                "min_reflectances_simple_ratio": pcr.Scalar,
+                "max_reflectances_simple_ratio": pcr.Scalar,
+            },
+            derive_func=self.__derive_ndvi_maps,
         )
-        self.soil_moist_content_sat_point = (
-            tusat_partial * self.soil_bulk_density * self.soil_rootzone_depth * 10
+        self.ndvi_max = ndvi["ndvi_max"]
+        self.ndvi_min = ndvi["ndvi_min"]
+        self.min_reflectances_simple_ratio = ndvi["min_reflectances_simple_ratio"]
+        self.max_reflectances_simple_ratio = ndvi["max_reflectances_simple_ratio"]
+
+        soil = self.__setup_static_maps(
+            name="soil",
+            files={
+                "soil": self.config.raster_files.soil,
+                "k_sat": self.config.lookuptable_files.k_sat,
+                "bulk_density": self.config.lookuptable_files.bulk_density,
+                "rootzone_depth": self.config.lookuptable_files.rootzone_depth,
+                "t_sat": self.config.lookuptable_files.t_sat,
+                "t_wp": self.config.lookuptable_files.t_wp,
+                "t_fcap": self.config.lookuptable_files.t_fcap,
+                "soil_parameters": (
+                    self.config.lookuptable_files.soil_parameters.file_path
+                    if self.config.lookuptable_files.soil_parameters
+                    else None
+                ),
+            },
+            data_types={
+                "hydraulic_conductivity_coef": pcr.Scalar,
+                "bulk_density": pcr.Scalar,
+                "rootzone_depth": pcr.Scalar,
+                "moist_content_sat_point": pcr.Scalar,
+                "moist_content_wilting_point": pcr.Scalar,
+                "moist_content_field_capacity": pcr.Scalar,
+            },
+            derive_func=self.__derive_soil_maps,
         )
+        self.soil_hydraulic_conductivity_coef = soil["hydraulic_conductivity_coef"]
+        self.soil_bulk_density = soil["bulk_density"]
+        self.soil_rootzone_depth = soil["rootzone_depth"]
+        self.soil_moist_content_sat_point = soil["moist_content_sat_point"]
+        self.soil_moistute_content_wilting_point = soil["moist_content_wilting_point"]
+        self.soil_moisture_content_field_capacity = soil["moist_content_field_capacity"]
+
         self.initial_soil_moist_content = (
             self.soil_moist_content_sat_point
             * self.config.initial_soil_conditions.initial_soil_moisture_content
         )
 
-        self.logger.info("Reading soil ground wilting point...")
-        tuw_partial = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.t_wp,
-            lookup_value=soil,
-            lookup_func=pcrfw.lookupscalar,
-        )
-        self.soil_moistute_content_wilting_point = (
-            tuw_partial * self.soil_bulk_density * self.soil_rootzone_depth * 10
-        )
-
-        self.logger.info("Reading soil field capacity...")
-        tuw_partial = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.t_fcap,
-            lookup_value=soil,
-            lookup_func=pcrfw.lookupscalar,
-        )
-        self.soil_moisture_content_field_capacity = (
-            tuw_partial * self.soil_bulk_density * self.soil_rootzone_depth * 10
-        )
-
         self.logger.info("Establishing initial conditions...")
         self.initial_baseflow = pcrfw.scalar(self.config.initial_soil_conditions.initial_baseflow)
         self.baseflow_threshold = pcrfw.scalar(self.config.initial_soil_conditions.baseflow_limit)
@@ -186,6 +292,13 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         self.initial_cell_total_flow = pcrfw.scalar(0)
         self.previous_cell_total_flow = pcrfw.scalar(0)
 
+        if self.config.replay_cache.any_enabled():
+            self.logger.info("Setting up replay cache...")
+            self.__initial_setup_replay_stores()
+
+        for hook in self.hooks:
+            hook.initial(self)
+
     def dynamic(self):
         """Contains the implementation of the dynamic section of the model.
 
@@ -205,11 +318,15 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         )
         print(f"## Timestep {current_timestep} of {self.config.simulation_period.last_step}")
 
+        if self.prefetcher and not self.input_cube:
+            self.__prefetch_raster_series(current_timestep)
+
         self.logger.debug("Reading NDVI map from '%s'...", self.config.raster_series.ndvi)
         try:
             current_ndvi = self.__readmap_series_wrapper(
                 files_partial_path=self.config.raster_series.ndvi,
                 dynamic_readmap_func=self.readmap,
+                data_type=INPUT_CUBE_SERIES_DATA_TYPES["ndvi"],
             )
             self.previous_ndvi = current_ndvi
         except RuntimeError:
@@ -225,6 +342,7 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
             current_landuse = self.__readmap_series_wrapper(
                 files_partial_path=self.config.raster_series.landuse,
                 dynamic_readmap_func=self.readmap,
+                data_type=INPUT_CUBE_SERIES_DATA_TYPES["landuse"],
             )
             self.previous_landuse = current_landuse
         except RuntimeError:
@@ -241,8 +359,12 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         current_precipitation = self.__readmap_series_wrapper(
             files_partial_path=self.config.raster_series.precipitation,
             dynamic_readmap_func=self.readmap,
+            data_type=INPUT_CUBE_SERIES_DATA_TYPES["precipitation"],
             conversion_func=pcr.scalar,
         )
+        current_precipitation = self.__apply_forcing_transform(
+            "precipitation", current_precipitation, current_date
+        )
 
         self.logger.debug(
             "Reading potential evapotranspiration map from '%s'...", self.config.raster_series.etp
@@ -250,13 +372,18 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         current_potential_evapotranspiration = self.__readmap_series_wrapper(
             files_partial_path=self.config.raster_series.etp,
             dynamic_readmap_func=self.readmap,
+            data_type=INPUT_CUBE_SERIES_DATA_TYPES["etp"],
             conversion_func=pcr.scalar,
         )
+        current_potential_evapotranspiration = self.__apply_forcing_transform(
+            "etp", current_potential_evapotranspiration, current_date
+        )
 
         self.logger.debug("Reading Kp map from '%s'...", self.config.raster_series.kp)
         current_class_a_pan_coef = self.__readmap_series_wrapper(
             files_partial_path=self.config.raster_series.kp,
             dynamic_readmap_func=self.readmap,
+            data_type=INPUT_CUBE_SERIES_DATA_TYPES["kp"],
             conversion_func=pcr.scalar,
         )
 
@@ -269,54 +396,14 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
             lookup_func=pcrfw.lookupscalar,
         )
 
-        self.logger.debug("Reading landuse attributes: manning...")
-        current_n_manning = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.manning,
-            lookup_value=current_landuse,
-            lookup_func=pcrfw.lookupscalar,
-        )
-
-        self.logger.debug("Reading landuse attributes: a_v...")
-        vegetated_area_fraction = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.a_v,
-            lookup_value=current_landuse,
-            lookup_func=pcrfw.lookupscalar,
-        )
-
-        self.logger.debug("Reading landuse attributes: a_o...")
-        open_water_area_fraction = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.a_o,
-            lookup_value=current_landuse,
-            lookup_func=pcrfw.lookupscalar,
-        )
-
-        self.logger.debug("Reading landuse attributes: a_s...")
-        bare_soil_area_fraction = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.a_s,
-            lookup_value=current_landuse,
-            lookup_func=pcrfw.lookupscalar,
-        )
-
-        self.logger.debug("Reading landuse attributes: a_i...")
-        impervious_area_fraction = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.a_i,
-            lookup_value=current_landuse,
-            lookup_func=pcrfw.lookupscalar,
-        )
-
-        self.logger.debug("Reading landuse attributes: K_c_min...")
-        min_crop_coef = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.kc_min,
-            lookup_value=current_landuse,
-            lookup_func=pcrfw.lookupscalar,
-        )
-
-        self.logger.debug("Reading landuse attributes: K_c_max...")
-        max_crop_coef = self.__lookup_wrapper(
-            file_path=self.config.lookuptable_files.kc_max,
-            lookup_value=current_landuse,
-            lookup_func=pcrfw.lookupscalar,
-        )
+        landuse_attributes = self.__get_landuse_attributes(current_landuse)
+        current_n_manning = landuse_attributes["manning"]
+        vegetated_area_fraction = landuse_attributes["a_v"]
+        open_water_area_fraction = landuse_attributes["a_o"]
+        bare_soil_area_fraction = landuse_attributes["a_s"]
+        impervious_area_fraction = landuse_attributes["a_i"]
+        min_crop_coef = landuse_attributes["kc_min"]
+        max_crop_coef = landuse_attributes["kc_max"]
 
         self.logger.debug("Interception")
         current_reflectances_simple_ratio = Interception.get_reflectances_simple_ration(
@@ -498,21 +585,423 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
             self.current_cell_total_discharge * self.config.grid.area * 0.001 / conversion_den
         )  # [m3/s]
 
-        self.accumulated_cell_total_discharge = pcrfw.accuflux(
-            self.ldd, current_cell_total_discharge_vol
+        if self.config.routing.is_batch:
+            # Routed at the end of the run, see route_discharge_block()
+            self.discharge_block[current_timestep - self.config.simulation_period.first_step] = (
+                pcr.pcr2numpy(current_cell_total_discharge_vol, np.nan)
+            )
+        else:
+            self.accumulated_cell_total_discharge = self.__accuflux(
+                current_cell_total_discharge_vol
+            )
+
+            self.current_runoff = (
+                self.config.calibration_parameters.x * self.previous_cell_total_flow
+                + (1 - self.config.calibration_parameters.x) * self.accumulated_cell_total_discharge
+            )
+            self.previous_cell_total_flow = self.current_runoff
+
+        if self.config.domain.is_preview:
+            self.__accumulate_basin_totals(
+                {
+                    "Precipitation": current_precipitation,
+                    "Interception": self.current_interception,
+                    "Actual Evapotranspiration": self.current_total_real_evapotranspiration,
+                    "Surface Runoff": self.current_surface_runoff,
+                    "Lateral Flow": self.current_lateral_flow,
+                    "Recharge": self.current_recharge,
+                    "Baseflow": self.current_baseflow,
+                    "Total Runoff": self.current_cell_total_discharge,
+                }
+            )
+
+        if "groundwater" in self.replay_stores:
+            self.__cache_replay_step(
+                "groundwater",
+                {
+                    "rec": self.current_recharge,
+                    "srn": self.current_surface_runoff,
+                    "lfw": self.current_lateral_flow,
+                },
+            )
+
+        if "routing" in self.replay_stores and not self.config.routing.is_batch:
+            self.__cache_replay_step("routing", {"acc": self.accumulated_cell_total_discharge})
+
+        output_vars_dict = self.__current_step_outputs()
+        if self.hooks:
+            fields = {
+                **output_vars_dict,
+                "prec": current_precipitation,
+                "etp": current_potential_evapotranspiration,
+                "sat_zone_storage": self.current_soil_sat_zone_storage,
+                "acc": self.accumulated_cell_total_discharge,
+            }
+            context = StepContext(
+                step=current_timestep,
+                date=current_date,
+                # Routed fields are missing with the batch routing engine
+                fields={name: field for name, field in fields.items() if field is not None},
+                sample_locations=self.sample_index,
+            )
+            for hook in self.hooks:
+                hook.dynamic(context)
+
+        if self.write_outputs:
+            self.logger.debug("Exporting variables to files")
+            self.__current_step_report(output_vars_dict)
+
+    def route_discharge_block(self):
+        """Route the discharge of every timestep at once, at the end of a run.
+
+        Used by the batch routing engine, which only stores the discharge of each cell during
+        the dynamic section. Accumulation over the LDD network is linear, so the discharge of
+        the timesteps is accumulated in chunks of ``ROUTING_CHUNK_BYTES``, and the Flow Direction
+        Factor recursion is applied to each chunk with a vectorized scan, starting from the last
+        runoff of the previous chunk. The runoff overwrites the discharge block chunk by chunk,
+        so only a chunk is held in double precision. The Accumulated Total Runoff (ARN) series is
+        then written and cached like in the dynamic section.
+        """
+        steps = len(self.discharge_block)
+        self.logger.info("Routing the discharge of %d timesteps...", steps)
+        chunk_steps = max(1, ROUTING_CHUNK_BYTES // (8 * max(1, self.flow_network.is_cell.size)))
+        store = self.replay_stores.get("routing")
+        runoff = 0.0
+        for start in range(0, steps, chunk_steps):
+            chunk = self.discharge_block[start : start + chunk_steps]
+            accumulated = self.flow_network.accumulate(chunk)
+            if store is not None:
+                for step_index, values in enumerate(accumulated, start=start):
+                    if len(store.shape) == 1:
+                        values = self.sample_index.average(values)
+
+                    store.write("acc", step_index, values)
+
+            smoothed = smooth_runoff(
+                accumulated, self.config.calibration_parameters.x, initial=runoff
+            )
+            runoff = smoothed[-1].copy()
+            chunk[:] = smoothed
+
+        self.runoff_block = self.discharge_block
+        self.discharge_block = None
+
+        arn = self.config.output_variables.arn
+        if not self.write_outputs:
+            return
+
+        if arn.get("is_raster_series_enabled"):
+            self.report_raster_series(arn, self.runoff_block)
+
+        if arn.get("is_time_series_enabled") and self.sample_index:
+            report_time_series(
+                values=np.stack([self.sample_index.average(v) for v in self.runoff_block]),
+                name=arn.get("table_filename_prefix"),
+                outpath=self.config.output_directory.path,
+                first_step=self.config.simulation_period.first_step,
+                cols_names=[str(n) for n in self.sample_index.ids],
+            )
+
+    def report_raster_series(
+        self,
+        var: dict,
+        series: np.ndarray,
+        output_raster_base: Optional[OutputRasterBase] = None,
+    ):
+        """Write the raster series of an output variable computed outside the dynamic section.
+
+        :param var: The output variable.
+        :type var: dict
+
+        :param series: The ``(steps, rows, cols)`` values of the variable on the current clone,
+            with ``NaN`` at missing cells.
+        :type series: np.ndarray
+
+        :param output_raster_base: The base raster information of the series. Default is the one
+            of the simulation domain.
+        :type output_raster_base: Optional[OutputRasterBase]
+        """
+        output_path = self.config.output_directory.path
+        first_step = self.config.simulation_period.first_step
+        file_formats = self.config.output_variables.file_formats
+        for step_index, values in enumerate(series):
+            field = array_to_field(
+                np.where(np.isnan(values), get_missing_value(pcr.Scalar), values), pcr.Scalar
+            )
+
+            if OutputFileFormat.PCRASTER in file_formats:
+                pcr.report(
+                    field,
+                    generate_raster_series_file_name(
+                        os.path.join(output_path, var.get("raster_filename_prefix")),
+                        first_step + step_index,
+                    ),
+                )
+
+            if OutputFileFormat.GEOTIFF in file_formats:
+                report(
+                    variable=field,
+                    name=var.get("raster_filename_prefix"),
+                    timestep=first_step + step_index,
+                    outpath=output_path,
+                    file_format=OutputFileFormat.GEOTIFF,
+                    base_raster_info=output_raster_base or self.output_raster_base,
+                    no_data_value=MISSING_VALUE_DEFAULT,
+                )
+
+    def get_drainage_basins(self) -> np.ndarray:
+        """Return the drainage basin of each cell of the grid.
+
+        The basins are delimited by the LDD, each one identified by its outlet (a pit of the LDD).
+        Cells of different basins never exchange water, so the basins can be simulated apart.
+
+        :return: The ``(rows, cols)`` basin identifiers, with the missing value of
+            ``pcraster.Nominal`` outside the DEM.
+        :rtype: np.ndarray
+        """
+        if self.ldd is None:
+            self.__initial_setup_terrain()
+
+        return field_to_array(pcr.catchment(self.ldd, pcr.pit(self.ldd)), pcr.Nominal)
+
+    def get_terrain(self) -> dict:
+        """Return the DEM, LDD and slope maps of the clone.
+
+        :return: The ``(rows, cols)`` arrays of the ``dem``, ``ldd`` and ``slope`` maps, with the
+            missing value of their data type outside the DEM.
+        :rtype: dict
+        """
+        if self.ldd is None:
+            self.__initial_setup_terrain()
+
+        return {
+            "dem": field_to_array(self.dem, pcr.Scalar),
+            "ldd": field_to_array(self.ldd, pcr.Ldd),
+            "slope": field_to_array(self.slope, pcr.Scalar),
+        }
+
+    def get_sample_locations(self) -> Optional[SampleLocations]:
+        """Return the sample locations of the simulation domain.
+
+        :return: The sample locations, ``None`` if no Sample Locations raster was provided.
+        :rtype: Optional[SampleLocations]
+        """
+        if self.sample_index is None and self.config.raster_files.sample_locations:
+            self.sample_index = self.__initial_setup_sample_index()
+
+        return self.sample_index
+
+    def __initial_setup_terrain(self):
+        """Read the DEM and set up the LDD and slope maps derived from it.
+
+        The LDD and slope maps are cached together, keyed by the DEM and the LDD file, if used.
+        If the terrain of the clone was given to the model, it is used instead.
+        """
+        if self.terrain is not None:
+            self.logger.debug("Setting up the given DEM, LDD and slope maps...")
+            self.dem = array_to_field(self.terrain["dem"], pcr.Scalar)
+            self.ldd = array_to_field(self.terrain["ldd"], pcr.Ldd)
+            self.slope = array_to_field(self.terrain["slope"], pcr.Scalar)
+            return
+
+        self.logger.debug("Reading DEM file...")
+        self.dem = self.__readmap_wrapper(self.config.raster_files.dem, data_type=pcr.Scalar)
+
+        use_ldd_file = bool(self.config.raster_files.ldd) and not self.config.domain.is_preview
+
+        def derive_terrain() -> dict:
+            if use_ldd_file:
+                self.logger.info("Reading Local Drain Direction (LDD) file...")
+                ldd = self.__readmap_wrapper(
+                    file_path=self.config.raster_files.ldd,
+                    conversion_func=pcr.ldd,
+                )
+            else:
+                self.logger.info(
+                    "Local Drain Direction (LDD) raster map not specified, generating one based on DEM..."
+                )
+                ldd = pcrfw.lddcreate(self.dem, 1e31, 1e31, 1e31, 1e31)
+
+            self.logger.info("Creating slope map based on DEM...")
+            return {"ldd": ldd, "slope": pcrfw.slope(self.dem)}
+
+        terrain = self.__setup_static_maps(
+            name="terrain",
+            files={
+                "dem": self.config.raster_files.dem,
+                "ldd": self.config.raster_files.ldd if use_ldd_file else None,
+            },
+            data_types={"ldd": pcr.Ldd, "slope": pcr.Scalar},
+            derive_func=derive_terrain,
         )
+        self.ldd = terrain["ldd"]
+        self.slope = terrain["slope"]
+
+    def __derive_ndvi_maps(self) -> dict:
+        """Read the min. and max. NDVI rasters and compute their Reflectances Simple Ratio (SR)."""
+        self.logger.info("Reading min. and max. NDVI rasters...")
+        ndvi_max = self.__readmap_wrapper(self.config.raster_files.ndvi_max, data_type=pcr.Scalar)
+        ndvi_min = self.__readmap_wrapper(self.config.raster_files.ndvi_min, data_type=pcr.Scalar)
+
+        self.logger.info("Computing min. and max. Reflectances Simple Ratio (SR)")
+        return {
+            "ndvi_max": ndvi_max,
+            "ndvi_min": ndvi_min,
+            "min_reflectances_simple_ratio": Interception.get_reflectances_simple_ration(ndvi_min),
+            "max_reflectances_simple_ratio": Interception.get_reflectances_simple_ration(ndvi_max),
+        }
+
+    def __derive_soil_maps(self) -> dict:
+        """Read the soil attributes and compute the soil moisture contents at their thresholds."""
+        self.logger.info("Reading soil attributes...")
+        soil = self.__readmap_wrapper(self.config.raster_files.soil, data_type=pcr.Nominal)
+
+        if self.config.lookuptable_files.soil_parameters:
+            self.logger.info("Reading soil attributes from the soil parameters table...")
+            parameters = self.__gather_parameters(
+                self.config.lookuptable_files.soil_parameters, soil, SOIL_PARAMETER_COLUMNS
+            )
+            hydraulic_conductivity_coef = parameters["k_sat"]
+            bulk_density = parameters["bulk_density"]
+            rootzone_depth = parameters["rootzone_depth"]
+            tusat_partial = parameters["t_sat"]
+            tuw_partial = parameters["t_wp"]
+            tfcap_partial = parameters["t_fcap"]
+        else:
+            self.logger.info("Reading hydraulic conductivity coefficient...")
+            hydraulic_conductivity_coef = self.__lookup_wrapper(
+                file_path=self.config.lookuptable_files.k_sat,
+                lookup_value=soil,
+                lookup_func=pcrfw.lookupscalar,
+            )
+
+            self.logger.info("Reading soil density...")
+            bulk_density = self.__lookup_wrapper(
+                file_path=self.config.lookuptable_files.bulk_density,
+                lookup_value=soil,
+                lookup_func=pcrfw.lookupscalar,
+            )
+
+            self.logger.info("Reading soil root zone depth...")
+            rootzone_depth = self.__lookup_wrapper(
+                file_path=self.config.lookuptable_files.rootzone_depth,
+                lookup_value=soil,
+                lookup_func=pcrfw.lookupscalar,
+            )
+
+            self.logger.info("Reading soil moisture for saturation of the first layer...")
+            tusat_partial = self.__lookup_wrapper(
+                file_path=self.config.lookuptable_files.t_sat,
+                lookup_value=soil,
+                lookup_func=pcrfw.lookupscalar,
+            )
+
+            self.logger.info("Reading soil ground wilting point...")
+            tuw_partial = self.__lookup_wrapper(
+                file_path=self.config.lookuptable_files.t_wp,
+                lookup_value=soil,
+                lookup_func=pcrfw.lookupscalar,
+            )
 
-        self.current_runoff = (
-            self.config.calibration_parameters.x * self.previous_cell_total_flow
-            + (1 - self.config.calibration_parameters.x) * self.accumulated_cell_total_discharge
+            self.logger.info("Reading soil field capacity...")
+            tfcap_partial = self.__lookup_wrapper(
+                file_path=self.config.lookuptable_files.t_fcap,
+                lookup_value=soil,
+                lookup_func=pcrfw.lookupscalar,
+            )
+
+        return {
+            "hydraulic_conductivity_coef": hydraulic_conductivity_coef,
+            "bulk_density": bulk_density,
+            "rootzone_depth": rootzone_depth,
+            "moist_content_sat_point": tusat_partial * bulk_density * rootzone_depth * 10,
+            "moist_content_wilting_point": tuw_partial * bulk_density * rootzone_depth * 10,
+            "moist_content_field_capacity": tfcap_partial * bulk_density * rootzone_depth * 10,
+        }
+
+    def __setup_static_maps(
+        self, name: str, files: dict, data_types: dict, derive_func: Callable
+    ) -> dict:
+        """Derive a group of static maps from input files, or load them from the static map cache.
+
+        Without a static map cache the maps are always derived. Otherwise, the maps derived from
+        the same files on the same simulation domain are loaded from the cache, or stored in it
+        once derived.
+
+        :param name: The name of the group of maps.
+        :type name: str
+
+        :param files: The paths of the input files the maps are derived from, indexed by name.
+        :type files: dict
+
+        :param data_types: The PCRaster data type of each map, indexed by the map name.
+        :type data_types: dict
+
+        :param derive_func: Function returning the maps derived from the input files, indexed by
+            name.
+        :type derive_func: Callable
+
+        :return: The maps indexed by name.
+        :rtype: dict
+        """
+        if not self.static_map_cache:
+            return derive_func()
+
+        key = self.__get_static_maps_key(name, files)
+        cached = self.static_map_cache.load(key, list(data_types))
+        if cached:
+            self.logger.info("Loading %s maps from the static map cache...", name)
+            return {
+                map_name: array_to_field(cached[map_name], data_type)
+                for map_name, data_type in data_types.items()
+            }
+
+        maps = derive_func()
+        self.static_map_cache.save(
+            key,
+            {
+                map_name: field_to_array(maps[map_name], data_type)
+                for map_name, data_type in data_types.items()
+            },
         )
-        self.previous_cell_total_flow = self.current_runoff
+        return maps
+
+    def __get_static_maps_key(self, name: str, files: dict) -> str:
+        """Return the static map cache key of maps derived from input files on the current clone.
 
-        self.logger.debug("Exporting variables to files")
-        self.__current_step_report()
+        The key also covers the cells masked out of the simulation domain, if any.
 
-    def __current_step_report(self):
-        output_vars_dict = {
+        :param name: The name of the group of maps.
+        :type name: str
+
+        :param files: The paths of the input files the maps are derived from, indexed by name.
+        :type files: dict
+
+        :return: The key of the maps.
+        :rtype: str
+        """
+        geometry = RasterGridGeometry.from_clone()
+        domain_mask = None
+        if self.domain_mask is not None:
+            domain_mask = hashlib.blake2b(
+                field_to_array(self.domain_mask, pcr.Boolean).tobytes(), digest_size=32
+            ).hexdigest()
+
+        return self.static_map_cache.key(
+            files,
+            extra={
+                "name": name,
+                "release": __release__,
+                "rows": geometry.rows,
+                "cols": geometry.cols,
+                "geotransform": list(geometry.get_geotransform()),
+                "domain_mask": domain_mask,
+            },
+        )
+
+    def __current_step_outputs(self) -> dict:
+        """Return the output variables of the current step indexed by their identifier."""
+        return {
             self.config.output_variables.itp.get("id"): self.current_interception,
             self.config.output_variables.bfw.get("id"): self.current_baseflow,
             self.config.output_variables.srn.get("id"): self.current_surface_runoff,
@@ -524,16 +1013,21 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
             self.config.output_variables.arn.get("id"): self.current_runoff,
         }
 
+    def __current_step_report(self, output_vars_dict: dict):
         for var in self.config.output_variables.get_enabled_raster_series():
             if not var.get("is_raster_series_enabled"):
                 continue
 
+            if output_vars_dict.get(var.get("id")) is None:
+                # Routed at the end of the run with the batch routing engine
+                continue
+
             if OutputFileFormat.PCRASTER in self.config.output_variables.file_formats:
                 self.report(
                     variable=output_vars_dict.get(var.get("id")),
                     name=var.get("raster_filename_prefix"),
                 )
-            
+
             if OutputFileFormat.GEOTIFF in self.config.output_variables.file_formats:
                 report(
                     variable=output_vars_dict.get(var.get("id")),
@@ -541,7 +1035,7 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
                     timestep=self.currentStep,
                     outpath=self.config.output_directory.path,
                     file_format=OutputFileFormat.GEOTIFF,
-                    base_raster_info=self.config.output_raster_base,
+                    base_raster_info=self.output_raster_base,
                     no_data_value=MISSING_VALUE_DEFAULT,
                 )
 
@@ -550,16 +1044,169 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
                 sample_func = self.sample_time_series_dict.get(var.get("id"))
                 sample_func(output_vars_dict.get(var.get("id")))
 
+    def __initial_setup_replay_stores(self):
+        """Create the stores of the series cached to replay parts of the model.
+
+        Each store is created in a subdirectory of the ``replay`` directory of the output
+        directory, together with the parameters of the run needed to replay its series.
+        """
+        path = os.path.join(self.config.output_directory.path, REPLAY_CACHE_DIRECTORY_NAME)
+        geometry = RasterGridGeometry.from_clone()
+        metadata = {
+            "first_step": self.config.simulation_period.first_step,
+            "start_date": self.config.simulation_period.start_date.strftime("%d/%m/%Y"),
+            "geotransform": list(geometry.get_geotransform()),
+            "cell_area": self.config.grid.area,
+        }
+
+        if self.config.replay_cache.groundwater:
+            self.replay_stores["groundwater"] = ReplayStore.create(
+                path=os.path.join(path, "groundwater"),
+                variables=["rec", "srn", "lfw"],
+                steps=self.config.simulation_period.total_steps,
+                shape=(geometry.rows, geometry.cols),
+                metadata={
+                    **metadata,
+                    "groundwater": {
+                        "alpha_gw": self.config.calibration_parameters.alpha_gw,
+                        "baseflow_limit": self.config.initial_soil_conditions.baseflow_limit,
+                        "initial_baseflow": self.config.initial_soil_conditions.initial_baseflow,
+                        "initial_saturated_zone_storage": (
+                            self.config.initial_soil_conditions.initial_saturated_zone_storage
+                        ),
+                    },
+                },
+            )
+
+        if self.config.replay_cache.routing == "grid":
+            self.replay_stores["routing"] = ReplayStore.create(
+                path=os.path.join(path, "routing"),
+                variables=["acc"],
+                steps=self.config.simulation_period.total_steps,
+                shape=(geometry.rows, geometry.cols),
+                metadata={**metadata, "routing": {"x": self.config.calibration_parameters.x}},
+            )
+        elif self.config.replay_cache.routing == "samples" and self.sample_index:
+            self.replay_stores["routing"] = ReplayStore.create(
+                path=os.path.join(path, "routing"),
+                variables=["acc"],
+                steps=self.config.simulation_period.total_steps,
+                shape=(len(self.sample_index),),
+                metadata={
+                    **metadata,
+                    "routing": {
+                        "x": self.config.calibration_parameters.x,
+                        "sample_ids": self.sample_index.ids.tolist(),
+                    },
+                },
+            )
+
+    def __initial_setup_sample_index(self) -> SampleLocations:
+        """Index the cells of the sample locations of the simulation domain.
+
+        :return: The sample locations of the simulation domain.
+        :rtype: SampleLocations
+        """
+        sample_map = (
+            self.sample_locations
+            if isinstance(self.sample_locations, Field)
+            else self.__readmap_wrapper(
+                file_path=self.sample_locations,
+                readmap_func=pcrfw.nominal,
+                data_type=pcr.Nominal,
+            )
+        )
+        return SampleLocations(
+            field_to_array(sample_map, pcr.Nominal), get_missing_value(pcr.Nominal)
+        )
+
+    def __accuflux(self, material: Field) -> Field:
+        """Accumulate a material over the LDD network with the configured routing engine.
+
+        :param material: The material of each cell.
+        :type material: Field
+
+        :return: The material of each cell plus the material of every cell upstream.
+        :rtype: Field
+        """
+        if self.flow_network is None:
+            return pcrfw.accuflux(self.ldd, material)
+
+        accumulated = self.flow_network.accumulate(pcr.pcr2numpy(material, np.nan))
+        return array_to_field(
+            np.where(np.isnan(accumulated), get_missing_value(pcr.Scalar), accumulated),
+            pcr.Scalar,
+        )
+
+    def __cache_replay_step(self, store_name: str, fields: dict):
+        """Write the fields of the current step to a replay store.
+
+        :param store_name: The name of the replay store.
+        :type store_name: str
+
+        :param fields: Scalar fields indexed by their variable identifier.
+        :type fields: dict
+        """
+        store = self.replay_stores[store_name]
+        step_index = self.currentStep - self.config.simulation_period.first_step
+        for variable, field in fields.items():
+            values = pcr.pcr2numpy(field, np.nan)
+            if len(store.shape) == 1:
+                values = self.sample_index.average(values)
+
+            store.write(variable, step_index, values)
+
+    def __accumulate_basin_totals(self, fields: dict):
+        """Add the volume of each field over the simulation domain to the basin totals.
+
+        :param fields: Depth fields [mm] indexed by their name.
+        :type fields: dict
+        """
+        for name, field in fields.items():
+            total, is_valid = pcr.cellvalue(pcr.maptotal(field), 1)
+            if is_valid:
+                self.basin_totals[name] = (
+                    self.basin_totals.get(name, 0.0) + total * self.config.grid.area * 0.001
+                )  # [m3]
+
+    def __setup_preview_grid(self):
+        """Replace the clone by a coarse grid for a preview run.
+
+        Each cell of the coarse grid aggregates ``preview_factor`` x ``preview_factor`` cells of
+        the clone. From here on, every input raster is resampled to it while it is read.
+        """
+        factor = self.config.domain.preview_factor
+        full_geometry = RasterGridGeometry.from_clone()
+        try:
+            self.read_geometry = full_geometry.coarsen(factor)
+        except ValueError:
+            self.logger.error("Preview factor %d is larger than the clone", factor)
+            raise
+
+        self.read_geometry.set_clone()
+        self.output_raster_base = self.config.output_raster_base.coarsen(factor)
+        self.logger.info(
+            "Preview grid of %dx%d cells set up from a clone of %dx%d cells",
+            self.read_geometry.rows,
+            self.read_geometry.cols,
+            full_geometry.rows,
+            full_geometry.cols,
+        )
+
     def __initial_setup_timeoutput_timeseries(self):
         """Initial setup of timeoutput timeseries.
 
         Initialize Tss report at sample locations or pits for each enabled output variable.
         """
         for var in self.config.output_variables.get_enabled_time_series():
+            if self.config.routing.is_batch and var is self.config.output_variables.arn:
+                # Written by route_discharge_block()
+                continue
+
             tss_file = pcrfw.TimeoutputTimeseries(
                 var.get("table_filename_prefix"),
                 self,
-                self.config.raster_files.sample_locations,
+                self.sample_locations,
                 noHeader=True,
             )
             self.sample_time_series_dict[var.get("id")] = tss_file.sample
@@ -572,16 +1219,492 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         sample_map = self.__readmap_wrapper(
             file_path=self.config.raster_files.sample_locations,
             readmap_func=pcrfw.nominal,
+            data_type=pcr.Nominal,
         )
         sample_array = pcrfw.pcr2numpy(map=sample_map, mv=MISSING_VALUE_DEFAULT)
         return np.asarray(np.unique(sample_array))
 
+    def __initial_setup_domain(self):
+        """Restrict the simulation domain to the partition and/or the sample locations catchment.
+
+        The cells of the partition of the model are kept and, if clipping to the sample locations
+        catchment is enabled, so are the cells that drain to any sample location, found from the
+        LDD. The clone is then shrunk to the bounding window of the kept cells, the static maps
+        already computed are clipped to it and every other cell is masked out. From here on, the
+        input rasters are read only within the window.
+
+        :raises ValueError: If no cell is left in the simulation domain.
+        """
+        sample_map = None
+        if self.config.raster_files.sample_locations:
+            sample_map = self.__readmap_wrapper(
+                file_path=self.config.raster_files.sample_locations,
+                readmap_func=pcrfw.nominal,
+                data_type=pcr.Nominal,
+            )
+
+        mask = None
+        if self.partition is not None:
+            self.logger.info("Clipping simulation domain to the partition...")
+            mask = np.asarray(self.partition, dtype=bool)
+
+        if self.config.domain.clip_to_samples_catchment and sample_map is not None:
+            self.logger.info("Clipping simulation domain to the sample locations catchment...")
+            catchment = pcr.catchment(self.ldd, pcr.boolean(sample_map))
+            catchment_mask = field_to_array(catchment, pcr.Boolean) == 1
+            mask = catchment_mask if mask is None else mask & catchment_mask
+
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if rows.size == 0:
+            self.logger.error("No cells left in the simulation domain")
+            raise ValueError("No cells left in the simulation domain")
+
+        row_offset, col_offset = int(rows[0]), int(cols[0])
+        num_rows, num_cols = int(rows[-1]) - row_offset + 1, int(cols[-1]) - col_offset + 1
+        window = (
+            slice(row_offset, row_offset + num_rows),
+            slice(col_offset, col_offset + num_cols),
+        )
+
+        # Static maps must be converted before the clone changes
+        dem = field_to_array(self.dem, pcr.Scalar)[window]
+        ldd = field_to_array(self.ldd, pcr.Ldd)[window]
+        slope = field_to_array(self.slope, pcr.Scalar)[window]
+        if sample_map is not None:
+            samples = field_to_array(sample_map, pcr.Nominal)[window]
+
+        full_geometry = RasterGridGeometry.from_clone()
+        self.read_geometry = full_geometry.subset(row_offset, col_offset, num_rows, num_cols)
+        self.read_geometry.set_clone()
+
+        self.domain_mask = array_to_field(mask[window], pcr.Boolean)
+        self.domain_offset = (row_offset, col_offset)
+        self.grid_shape = (full_geometry.rows, full_geometry.cols)
+        self.dem = pcr.ifthen(self.domain_mask, array_to_field(dem, pcr.Scalar))
+        # Cells draining to outside the window become pits
+        self.ldd = pcr.lddrepair(pcr.ifthen(self.domain_mask, array_to_field(ldd, pcr.Ldd)))
+        self.slope = pcr.ifthen(self.domain_mask, array_to_field(slope, pcr.Scalar))
+        if sample_map is not None:
+            self.sample_locations = pcr.ifthen(
+                self.domain_mask, array_to_field(samples, pcr.Nominal)
+            )
+        self.output_raster_base = self.output_raster_base.subset(
+            row_offset, col_offset, num_rows, num_cols
+        )
+
+        self.logger.info(
+            "Simulation domain clipped to %d of %d cells (window of %dx%d cells)",
+            np.count_nonzero(mask),
+            full_geometry.rows * full_geometry.cols,
+            num_rows,
+            num_cols,
+        )
+
+    def __read_window(
+        self,
+        file_path: Union[str, bytes, os.PathLike],
+        conversion_func: Optional[Callable] = None,
+        data_type=None,
+    ) -> Field:
+        """Read the simulation domain window of a raster file, masking cells outside the domain.
+
+        The raster is resampled if the simulation grid is coarser than the raster.
+
+        :param file_path: The path where the data map is located.
+        :type file_path: Union[str, bytes, os.PathLike]
+
+        :param conversion_func: Function to convert the read map to the desired data type. Default is ``None``.
+        :type conversion_func: Optional[Callable]
+
+        :param data_type: The PCRaster data type of the map (e.g. ``pcraster.Scalar``). If ``None``, it is found from the raster, and integer rasters other than PCRaster maps are read as nominal. Default is ``None``.
+
+        :return: The data map read from the file.
+        :rtype: Field
+        """
+        self.logger.debug("Reading domain window of map from '%s'...", file_path)
+        field = read_raster(
+            file_path, self.read_geometry or RasterGridGeometry.from_clone(), data_type
+        )
+        if conversion_func:
+            field = conversion_func(field)
+
+        if self.domain_mask is None:
+            return field
+
+        return pcr.ifthen(self.domain_mask, field)
+
+    def __open_input_cube(self) -> Optional[InputCube]:
+        """Open the input cube of the raster series, if it holds every map of the run.
+
+        :return: The input cube, or ``None`` if the raster files must be read instead.
+        :rtype: Optional[InputCube]
+        """
+        try:
+            input_cube = InputCube(self.config.raster_series.cube)
+        except FileNotFoundError:
+            self.logger.warning(
+                "Input cube '%s' not found, reading the raster series files",
+                self.config.raster_series.cube,
+            )
+            return None
+
+        if not input_cube.covers(
+            {name: getattr(self.config.raster_series, name) for name in INPUT_CUBE_SERIES},
+            self.config.simulation_period.first_step,
+            self.config.simulation_period.last_step,
+            self.read_geometry or RasterGridGeometry.from_clone(),
+        ):
+            self.logger.warning(
+                "Input cube '%s' does not match the run, reading the raster series files",
+                self.config.raster_series.cube,
+            )
+            return None
+
+        self.logger.info("Reading the raster series from input cube '%s'", input_cube.path)
+        return input_cube
+
+    def __read_input_cube(
+        self,
+        files_partial_path: Union[str, bytes, os.PathLike],
+        conversion_func: Optional[Callable] = None,
+    ) -> Field:
+        """Read the map of a raster series for the current step from the input cube.
+
+        :param files_partial_path: The path where the data map is located and prefix combined.
+        :type files_partial_path: Union[str, bytes, os.PathLike]
+
+        :param conversion_func: Function to convert the read map to the desired data type. Default is ``None``.
+        :type conversion_func: Optional[Callable]
+
+        :return: The data map read from the cube.
+        :rtype: Field
+
+        :raises RuntimeError: The data map was missing when the cube was ingested.
+        """
+        name = next(
+            name
+            for name in INPUT_CUBE_SERIES
+            if getattr(self.config.raster_series, name) == files_partial_path
+        )
+        self.logger.debug("Reading '%s' map from input cube...", name)
+        array, data_type = self.input_cube.read(
+            name, self.currentStep, self.read_geometry or RasterGridGeometry.from_clone()
+        )
+        return self.__array_to_domain_field(array, data_type, conversion_func)
+
+    def __get_series_file_name(
+        self, files_partial_path: Union[str, bytes, os.PathLike], timestep: int
+    ) -> str:
+        """Return the file of a map-series for a timestep: a PCRaster map, a GeoTIFF or a VRT.
+
+        The format of each series is found from the first of its files that exists.
+
+        :param files_partial_path: The path where the data map is located and prefix combined.
+        :type files_partial_path: Union[str, bytes, os.PathLike]
+
+        :param timestep: The timestep of the map.
+        :type timestep: int
+
+        :return: The path of the map file (e.g. ``prec0000.001`` or ``prec0000001.tif``).
+        :rtype: str
+        """
+        if files_partial_path not in self.__series_file_extensions:
+            file_path = generate_raster_series_file_name(files_partial_path, timestep)
+            if os.path.exists(file_path):
+                self.__series_file_extensions[files_partial_path] = None
+            else:
+                extension = next(
+                    (
+                        extension
+                        for extension in GDAL_SERIES_FILE_EXTENSIONS
+                        if os.path.exists(
+                            generate_raster_series_file_name(
+                                files_partial_path, timestep, extension
+                            )
+                        )
+                    ),
+                    None,
+                )
+                if not extension:
+                    return file_path
+
+                self.__series_file_extensions[files_partial_path] = extension
+
+        return generate_raster_series_file_name(
+            files_partial_path, timestep, self.__series_file_extensions[files_partial_path]
+        )
+
+    def __is_clone_map(
+        self,
+        file_path: Union[str, bytes, os.PathLike],
+        key: Optional[Union[str, bytes, os.PathLike]] = None,
+    ) -> bool:
+        """Check whether a raster file is a PCRaster map with the grid of the clone.
+
+        Such maps are read by PCRaster. Any other raster, e.g. a GeoTIFF or a PCRaster map of a
+        larger area that contains the clone, is read from the window of the clone with GDAL.
+
+        :param file_path: The path of the raster file.
+        :type file_path: Union[str, bytes, os.PathLike]
+
+        :param key: Key of the result for later calls, e.g. the series of the file, whose files
+            share the same grid. Default is ``None``, the path of the file.
+        :type key: Optional[Union[str, bytes, os.PathLike]]
+
+        :return: ``True`` if the file can be read by PCRaster.
+        :rtype: bool
+        """
+        key = key or file_path
+        if key not in self.__clone_maps:
+            if not is_pcraster_map(file_path):
+                self.__clone_maps[key] = False
+            else:
+                try:
+                    self.__clone_maps[key] = raster_matches_grid(
+                        file_path, RasterGridGeometry.from_clone()
+                    )
+                except RuntimeError:
+                    # Missing files are reported by PCRaster as before
+                    return True
+
+        return self.__clone_maps[key]
+
+    def __read_single_file_series(
+        self,
+        files_partial_path: Union[str, bytes, os.PathLike],
+        conversion_func: Optional[Callable] = None,
+        data_type=None,
+    ) -> Field:
+        """Read the map of the current step from a raster series stored in a single file.
+
+        The series is either a multi-band raster file, a NetCDF file or a manifest of raster
+        files. The file is opened by the first read and kept open for the rest of the run.
+
+        :param files_partial_path: The path of the file.
+        :type files_partial_path: Union[str, bytes, os.PathLike]
+
+        :param conversion_func: Function to convert the read map to the desired data type. Default is ``None``.
+        :type conversion_func: Optional[Callable]
+
+        :param data_type: The PCRaster data type of the map (e.g. ``pcraster.Scalar``). If ``None``, it is found from the raster, and integer rasters other than PCRaster maps are read as nominal. Default is ``None``.
+
+        :return: The data map read from the file. For a manifest of change points, the same map
+            is returned until the next change point.
+        :rtype: Field
+
+        :raises RuntimeError: The file has no map for the step or cannot be read.
+        """
+        if files_partial_path not in self.series_files:
+            self.series_files[files_partial_path] = open_single_file_series(
+                files_partial_path, self.config.simulation_period
+            )
+
+        series_file = self.series_files[files_partial_path]
+        step = self.currentStep
+        hold_last = isinstance(series_file, SeriesManifest) and series_file.hold_last
+        if hold_last:
+            # The map is read again only when the next change point is reached
+            step = series_file.get_change_point(self.currentStep)
+            held_step, held_map = self.__held_maps.get(files_partial_path, (None, None))
+            if held_step == step:
+                return held_map
+
+        self.logger.debug("Reading step %s of series file '%s'...", step, files_partial_path)
+        array, data_type = series_file.read(
+            step, self.read_geometry or RasterGridGeometry.from_clone(), data_type
+        )
+        field = self.__array_to_domain_field(array, data_type, conversion_func)
+        if hold_last:
+            self.__held_maps[files_partial_path] = (step, field)
+
+        return field
+
+    def __apply_forcing_transform(self, series: str, field: Field, current_date) -> Field:
+        """Apply the forcing transform of a climate series, if any, to the map of the current step.
+
+        :param series: The name of the series (``"precipitation"`` or ``"etp"``).
+        :type series: str
+
+        :param field: The map read from the series.
+        :type field: Field
+
+        :param current_date: The date of the current step.
+        :type current_date: datetime
+
+        :return: The transformed map, or the read map if the series has no transform.
+        :rtype: Field
+        """
+        transform = self.config.forcing_transforms.get(series)
+        if not transform:
+            return field
+
+        self.logger.debug("Applying the %s forcing transform...", series)
+        array = transform.apply(
+            field_to_array(field, pcr.Scalar),
+            month=current_date.month,
+            timestep=self.currentStep,
+            series_index=FORCING_TRANSFORM_SERIES.index(series),
+            missing_value=get_missing_value(pcr.Scalar),
+            zone_factors=self.__forcing_zone_factors.get(series),
+            offset=self.domain_offset,
+            grid_shape=self.grid_shape,
+        )
+        return array_to_field(array, pcr.Scalar)
+
+    def __get_landuse_attributes(self, landuse: Field) -> dict:
+        """Look up the attributes of the land use classes of a land use map.
+
+        The attributes are looked up again only when the land use map changes, so they are kept
+        while the map of a previous step is held (a manifest of change points or missing maps).
+
+        :param landuse: The land use map of the current step.
+        :type landuse: Field
+
+        :return: The attribute maps, by lookup table name (e.g. ``"manning"``).
+        :rtype: dict
+
+        :raises RuntimeError: A lookup table was not loaded correctly.
+        """
+        if self.__landuse_attributes and self.__landuse_attributes[0] is landuse:
+            self.logger.debug("Reusing landuse attributes of the previous step")
+            return self.__landuse_attributes[1]
+
+        if self.config.lookuptable_files.landuse_parameters:
+            self.logger.debug("Reading landuse attributes from the landuse parameters table...")
+            attributes = self.__gather_parameters(
+                self.config.lookuptable_files.landuse_parameters,
+                landuse,
+                LANDUSE_PARAMETER_COLUMNS,
+            )
+            self.__landuse_attributes = (landuse, attributes)
+            return attributes
+
+        attributes = {}
+        for name in ("manning", "a_v", "a_o", "a_s", "a_i", "kc_min", "kc_max"):
+            self.logger.debug("Reading landuse attributes: %s...", name)
+            attributes[name] = self.__lookup_wrapper(
+                file_path=getattr(self.config.lookuptable_files, name),
+                lookup_value=landuse,
+                lookup_func=pcrfw.lookupscalar,
+            )
+
+        self.__landuse_attributes = (landuse, attributes)
+        return attributes
+
+    def __gather_parameters(
+        self, table: ParameterTable, class_map: Field, columns: Dict[str, str]
+    ) -> dict:
+        """Gather the parameters of the classes of a class map from a parameter table.
+
+        :param table: The parameter table of the class map.
+        :type table: ParameterTable
+
+        :param class_map: The class map (e.g. land use or soil).
+        :type class_map: Field
+
+        :param columns: The column of each parameter, by parameter name.
+        :type columns: Dict[str, str]
+
+        :return: The parameter maps, by parameter name.
+        :rtype: dict
+
+        :raises ValueError: A class of the map has no row in the table.
+        """
+        missing_value = get_missing_value(pcr.Nominal)
+        parameters = table.gather(
+            field_to_array(class_map, pcr.Nominal),
+            missing_value,
+            get_missing_value(pcr.Scalar),
+        )
+        return {
+            name: array_to_field(parameters[column], pcr.Scalar) for name, column in columns.items()
+        }
+
+    def __array_to_domain_field(
+        self, array: np.ndarray, data_type, conversion_func: Optional[Callable] = None
+    ) -> Field:
+        """Convert a map read into an array to a field, masking cells outside the domain.
+
+        :param array: The map values, with the missing value of the data type at no data cells.
+        :type array: np.ndarray
+
+        :param data_type: The PCRaster data type of the map.
+
+        :param conversion_func: Function to convert the read map to the desired data type. Default is ``None``.
+        :type conversion_func: Optional[Callable]
+
+        :return: The data map.
+        :rtype: Field
+        """
+        field = array_to_field(array, data_type)
+        if conversion_func:
+            field = conversion_func(field)
+
+        if self.domain_mask is None:
+            return field
+
+        return pcr.ifthen(self.domain_mask, field)
+
+    def __prefetch_raster_series(self, current_timestep: int) -> None:
+        """Start reading the input raster series of the current and next timesteps.
+
+        The rasters are read in background threads while the current timestep is computed.
+
+        :param current_timestep: The current timestep.
+        :type current_timestep: int
+        """
+        geometry = self.read_geometry or RasterGridGeometry.from_clone()
+        last_step = min(
+            current_timestep + self.prefetcher.depth, self.config.simulation_period.last_step
+        )
+        for step in range(current_timestep, last_step + 1):
+            for name in INPUT_CUBE_SERIES:
+                files_partial_path = getattr(self.config.raster_series, name)
+                # Series files are read when used, as their open datasets are not shared
+                if is_single_file_series(files_partial_path):
+                    continue
+
+                self.prefetcher.prefetch(
+                    self.__get_series_file_name(files_partial_path, step),
+                    geometry,
+                    INPUT_CUBE_SERIES_DATA_TYPES[name],
+                )
+
+    def __read_prefetched(
+        self,
+        file_path: Union[str, bytes, os.PathLike],
+        conversion_func: Optional[Callable] = None,
+        data_type=None,
+    ) -> Field:
+        """Take a raster read in the background, masking cells outside the simulation domain.
+
+        :param file_path: The path where the data map is located.
+        :type file_path: Union[str, bytes, os.PathLike]
+
+        :param conversion_func: Function to convert the read map to the desired data type. Default is ``None``.
+        :type conversion_func: Optional[Callable]
+
+        :param data_type: The PCRaster data type of the map (e.g. ``pcraster.Scalar``). If ``None``, it is found from the raster, and integer rasters other than PCRaster maps are read as nominal. Default is ``None``.
+
+        :return: The data map read from the file.
+        :rtype: Field
+
+        :raises RuntimeError: The data map could not be read.
+        """
+        self.logger.debug("Taking prefetched map from '%s'...", file_path)
+        array, data_type = self.prefetcher.get(
+            file_path, self.read_geometry or RasterGridGeometry.from_clone(), data_type
+        )
+        return self.__array_to_domain_field(array, data_type, conversion_func)
+
     def __readmap_series_wrapper(
         self,
         files_partial_path: Union[str, bytes, os.PathLike],
         dynamic_readmap_func: Callable,
         conversion_func: Optional[Callable] = None,
         supress_errors: bool = False,
+        data_type=None,
     ) -> Field:
         """Read a map from a raster series for a given step from a specified location.
 
@@ -597,6 +1720,8 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         :param supress_errors: If ``True``, suppresses errors and returns ``None``. Default is ``False``.
         :type supress_errors: Optional[bool]
 
+        :param data_type: The PCRaster data type of the map (e.g. ``pcraster.Scalar``). If ``None``, it is found from the raster, and integer rasters other than PCRaster maps are read as nominal. Default is ``None``.
+
         :return: The data map read from the file.
         :rtype: Field
 
@@ -604,6 +1729,26 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         """
 
         try:
+            if self.input_cube:
+                return self.__read_input_cube(files_partial_path, conversion_func)
+
+            if is_single_file_series(files_partial_path):
+                return self.__read_single_file_series(
+                    files_partial_path, conversion_func, data_type
+                )
+
+            file_path = self.__get_series_file_name(files_partial_path, self.currentStep)
+            if self.prefetcher:
+                return self.__read_prefetched(file_path, conversion_func, data_type)
+
+            # Maps are read with GDAL when the frame cache is enabled, so they can be cached
+            if (
+                self.read_geometry
+                or get_frame_cache()
+                or not self.__is_clone_map(file_path, files_partial_path)
+            ):
+                return self.__read_window(file_path, conversion_func, data_type)
+
             if conversion_func:
                 self.logger.debug("Reading and converting map from '%s'...", files_partial_path)
                 return conversion_func(dynamic_readmap_func(files_partial_path))
@@ -620,6 +1765,7 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         file_path: Union[str, bytes, os.PathLike],
         readmap_func: Callable = pcrfw.readmap,
         conversion_func: Optional[Callable] = None,
+        data_type=None,
     ) -> Field:
         """Read a data map for a given data type from a specified location.
 
@@ -632,6 +1778,8 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         :param conversion_func: Function to convert the read map to the desired data type. Default is ``None``.
         :type conversion_func: Optional[Callable]
 
+        :param data_type: The PCRaster data type of the map (e.g. ``pcraster.Scalar``). If ``None``, it is found from the raster, and integer rasters other than PCRaster maps are read as nominal. Default is ``None``.
+
         :return: The data map read from the file.
         :rtype: Field
 
@@ -639,6 +1787,15 @@ class RainfallRunoffBalanceEnhancedModel(pcrfw.DynamicModel):
         """
 
         try:
+            if readmap_func is not pcr.setclone and (
+                self.read_geometry or get_frame_cache() or not self.__is_clone_map(file_path)
+            ):
+                return self.__read_window(
+                    file_path,
+                    conversion_func or (None if readmap_func is pcrfw.readmap else readmap_func),
+                    data_type,
+                )
+
             if conversion_func:
                 self.logger.debug("Reading and converting map from '%s'...", file_path)
                 return conversion_func(readmap_func(file_path))
@@ -0,0 +1,40 @@
+import numpy as np
+
+__all__ = ["SampleLocations"]
+
+
+class SampleLocations:
+    """Cells of the sample locations of a grid.
+
+    Averages grid values at each sample location, ignoring missing cells, which matches the
+    values reported by the Time Series tables for each location.
+
+    :param samples: The sample location identifier of each cell of the grid.
+    :type samples: np.ndarray
+
+    :param missing_value: The identifier of the cells that are not sample locations.
+    :type missing_value: int
+    """
+
+    def __init__(self, samples: np.ndarray, missing_value: int) -> None:
+        self.is_sample = np.asarray(samples) != missing_value
+        self.ids, self.__index = np.unique(samples[self.is_sample], return_inverse=True)
+
+    def __len__(self) -> int:
+        return self.ids.size
+
+    def average(self, values: np.ndarray) -> np.ndarray:
+        """Average the values of a grid at each sample location, ignoring missing cells.
+
+        :param values: The grid values, with ``NaN`` at missing cells.
+        :type values: np.ndarray
+
+        :return: The average at each sample location, ``NaN`` where all cells are missing.
+        :rtype: np.ndarray
+        """
+        values = values[self.is_sample]
+        is_valid = ~np.isnan(values)
+        sums = np.bincount(self.__index[is_valid], weights=values[is_valid], minlength=len(self))
+        counts = np.bincount(self.__index[is_valid], minlength=len(self))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
@@ -0,0 +1,4 @@
+from ._fingerprint import *
+from ._result_cache import *
+from ._static_map_cache import *
+from ._validation_cache import *
@@ -0,0 +1,193 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+from typing import Optional, Union
+
+__all__ = ["FileHasher", "compute_fingerprint"]
+
+FILE_HASH_CHUNK_SIZE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class FileHasher:
+    """Content hashes of files, memoized by path, size and modification time.
+
+    :param memo_path: JSON file where the hashes are kept between runs. If ``None``, they are
+        kept only in memory. Default is ``None``.
+    :type memo_path: Optional[Union[str, bytes, os.PathLike]]
+    """
+
+    def __init__(self, memo_path: Optional[Union[str, bytes, os.PathLike]] = None) -> None:
+        self.memo_path = str(memo_path) if memo_path else None
+        self.__memo = {}
+        self.__is_memo_changed = False
+        if self.memo_path and os.path.isfile(self.memo_path):
+            try:
+                with open(self.memo_path, mode="r", encoding="utf-8") as f:
+                    self.__memo = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring invalid file hashes memo %s: %s", self.memo_path, e)
+
+    def hash_file(self, file_path: Union[str, bytes, os.PathLike]) -> str:
+        """Return the BLAKE2b hash of the contents of a file.
+
+        :param file_path: The path of the file.
+        :type file_path: Union[str, bytes, os.PathLike]
+
+        :return: The hexadecimal hash.
+        :rtype: str
+        """
+        file_path = os.path.abspath(str(file_path))
+        stat = os.stat(file_path)
+        memo = self.__memo.get(file_path)
+        if memo and memo["size"] == stat.st_size and memo["mtime_ns"] == stat.st_mtime_ns:
+            return memo["hash"]
+
+        digest = hashlib.blake2b(digest_size=32)
+        with open(file_path, mode="rb") as f:
+            for chunk in iter(lambda: f.read(FILE_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        self.__memo[file_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": digest.hexdigest(),
+        }
+        self.__is_memo_changed = True
+        return digest.hexdigest()
+
+    def hash_directory(self, directory_path: Union[str, bytes, os.PathLike]) -> dict:
+        """Return the hashes of the files directly inside a directory.
+
+        :param directory_path: The path of the directory.
+        :type directory_path: Union[str, bytes, os.PathLike]
+
+        :return: The hash of each file indexed by its name.
+        :rtype: dict
+        """
+        directory_path = str(directory_path)
+        return {
+            entry.name: self.hash_file(entry.path)
+            for entry in sorted(os.scandir(directory_path), key=lambda e: e.name)
+            if entry.is_file()
+        }
+
+    def save(self) -> None:
+        """Write the memoized hashes to the memo file, if any changed."""
+        if not self.memo_path or not self.__is_memo_changed:
+            return
+
+        temp_path = f"{self.memo_path}.{os.getpid()}.tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as f:
+            json.dump(self.__memo, f)
+
+        os.replace(temp_path, self.memo_path)
+        self.__is_memo_changed = False
+
+
+def _hash_series_manifest(file_path: str, file_hasher: FileHasher) -> dict:
+    """Return the hashes of a raster series manifest and of the raster files it lists.
+
+    :param file_path: The path of the manifest (or any other JSON file).
+    :type file_path: str
+
+    :param file_hasher: The hasher of the files.
+    :type file_hasher: FileHasher
+
+    :return: The hash of the manifest and, if it lists files, the hash of each listed file
+        indexed by its key, or ``None`` if the file does not exist.
+    :rtype: dict
+    """
+    result = {"file": file_hasher.hash_file(file_path)}
+    try:
+        with open(file_path, mode="r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return result
+
+    files = manifest.get("files") if isinstance(manifest, dict) else None
+    if not isinstance(files, dict):
+        return result
+
+    # Relative paths are relative to the directory of the manifest, as read by SeriesManifest
+    base_dir = os.path.dirname(os.path.abspath(file_path))
+    result["files"] = {}
+    for key, path in files.items():
+        path = os.path.normpath(os.path.join(base_dir, str(path)))
+        result["files"][str(key)] = file_hasher.hash_file(path) if os.path.isfile(path) else None
+
+    return result
+
+
+def compute_fingerprint(
+    settings: dict,
+    value_ranges: Optional[dict] = None,
+    extra: Optional[dict] = None,
+    file_hasher: Optional[FileHasher] = None,
+) -> str:
+    """Return a fingerprint of a model run.
+
+    The fingerprint covers the configuration settings, with every input file or directory
+    (including the file of a ``file.nc:variable`` NetCDF series and the raster files listed by
+    a series manifest) replaced by the hashes of its contents, the valid value ranges of the inputs and any extra
+    information affecting the results. The output directory is ignored, so the same run
+    writing somewhere else has the same fingerprint.
+
+    :param settings: The contents of the configuration file.
+    :type settings: dict
+
+    :param value_ranges: The valid value ranges of the inputs. Default is ``None``.
+    :type value_ranges: Optional[dict]
+
+    :param extra: Other JSON-serializable information affecting the results (e.g. the model
+        version). Default is ``None``.
+    :type extra: Optional[dict]
+
+    :param file_hasher: The hasher of the input files. Default is ``None``, which hashes the
+        files without memoization.
+    :type file_hasher: Optional[FileHasher]
+
+    :return: The hexadecimal fingerprint.
+    :rtype: str
+    """
+    file_hasher = file_hasher or FileHasher()
+    normalized = copy.deepcopy(settings)
+    normalized.get("DIRECTORIES", {}).pop("output", None)
+
+    def normalize(value):
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+
+        if isinstance(value, list):
+            return [normalize(v) for v in value]
+
+        if isinstance(value, str) and value:
+            if os.path.isfile(value):
+                if value.lower().endswith(".json"):
+                    return _hash_series_manifest(value, file_hasher)
+
+                return {"file": file_hasher.hash_file(value)}
+
+            if os.path.isdir(value):
+                return {"directory": file_hasher.hash_directory(value)}
+
+            # Variable of a NetCDF series (e.g. "prec.nc:precip")
+            file_path, _, variable = value.rpartition(":")
+            if file_path and os.path.isfile(file_path):
+                return {"file": file_hasher.hash_file(file_path), "variable": variable}
+
+        return value
+
+    payload = json.dumps(
+        {
+            "settings": normalize(normalized),
+            "value_ranges": value_ranges,
+            "extra": extra,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
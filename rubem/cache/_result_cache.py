@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Optional, Union
+
+from ._fingerprint import FileHasher, compute_fingerprint
+
+__all__ = ["ResultCache"]
+
+RESULT_CACHE_INDEX_FILE_NAME = "index.json"
+RESULT_CACHE_ENTRIES_DIRECTORY_NAME = "entries"
+RESULT_CACHE_FILE_HASHES_FILE_NAME = "file_hashes.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Local store of the output files of model runs, indexed by run fingerprint.
+
+    The store keeps the entries with the most recent accesses within a total size, evicting
+    the least recently used ones.
+
+    :param path: Directory of the store. Created if it does not exist.
+    :type path: Union[str, bytes, os.PathLike]
+
+    :param max_size: Maximum total size of the entries [bytes].
+    :type max_size: int
+
+    :param link_outputs: If ``True``, restored files are hard links to the stored ones when
+        possible, instead of copies. A run writing to an output directory with linked files must
+        call :meth:`detach_outputs` first, or it would overwrite the stored files. Default is
+        ``False``.
+    :type link_outputs: bool, optional
+
+    :raises ValueError: If the maximum size is not positive.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, bytes, os.PathLike],
+        max_size: int,
+        link_outputs: bool = False,
+    ) -> None:
+        self.logger = logging.getLogger(__name__)
+        if max_size <= 0:
+            self.logger.error("Invalid result cache maximum size: %s", max_size)
+            raise ValueError(f"Invalid result cache maximum size: {max_size}")
+
+        self.path = str(path)
+        self.max_size = max_size
+        self.link_outputs = link_outputs
+        os.makedirs(os.path.join(self.path, RESULT_CACHE_ENTRIES_DIRECTORY_NAME), exist_ok=True)
+        self.file_hasher = FileHasher(os.path.join(self.path, RESULT_CACHE_FILE_HASHES_FILE_NAME))
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional["ResultCache"]:
+        """Create the result cache described by the ``result_cache`` application settings.
+
+        :param settings: The application settings of the result cache.
+        :type settings: Optional[dict]
+
+        :return: The result cache, or ``None`` if it is not enabled.
+        :rtype: Optional[ResultCache]
+        """
+        if not settings or not settings.get("enabled"):
+            return None
+
+        path = settings.get("path") or os.path.join(
+            os.path.expanduser("~"), ".cache", "rubem", "results"
+        )
+        return cls(
+            path=os.path.expanduser(path),
+            max_size=int(float(settings.get("max_size_mb", 10240)) * 1024 * 1024),
+            link_outputs=settings.get("link_outputs", False),
+        )
+
+    def fingerprint(
+        self,
+        settings: dict,
+        value_ranges: Optional[dict] = None,
+        extra: Optional[dict] = None,
+    ) -> str:
+        """Return the fingerprint of a model run, memoizing the hashes of its input files.
+
+        See :func:`compute_fingerprint` for the parameters.
+
+        :return: The hexadecimal fingerprint.
+        :rtype: str
+        """
+        fingerprint = compute_fingerprint(settings, value_ranges, extra, self.file_hasher)
+        self.file_hasher.save()
+        return fingerprint
+
+    def get_entry_path(self, fingerprint: str) -> str:
+        """Return the directory of the entry of a fingerprint.
+
+        :param fingerprint: The fingerprint of the model run.
+        :type fingerprint: str
+
+        :return: The directory of the entry.
+        :rtype: str
+        """
+        return os.path.join(self.path, RESULT_CACHE_ENTRIES_DIRECTORY_NAME, fingerprint)
+
+    def restore(self, fingerprint: str, output_path: Union[str, bytes, os.PathLike]) -> bool:
+        """Materialize the output files of a cached model run in a directory.
+
+        :param fingerprint: The fingerprint of the model run.
+        :type fingerprint: str
+
+        :param output_path: The directory where the files are materialized.
+        :type output_path: Union[str, bytes, os.PathLike]
+
+        :return: ``True`` if the run was cached, otherwise ``False``.
+        :rtype: bool
+        """
+        index = self.__read_index()
+        entry_path = self.get_entry_path(fingerprint)
+        if fingerprint not in index or not os.path.isdir(entry_path):
+            return False
+
+        output_path = str(output_path)
+        for root, _, files in os.walk(entry_path):
+            relative_root = os.path.relpath(root, entry_path)
+            os.makedirs(os.path.join(output_path, relative_root), exist_ok=True)
+            for name in files:
+                self.__materialize(
+                    os.path.join(root, name), os.path.join(output_path, relative_root, name)
+                )
+
+        index[fingerprint]["last_access"] = time.time()
+        self.__write_index(index)
+        self.logger.info("Restored cached results %s to %s", fingerprint, output_path)
+        return True
+
+    def detach_outputs(self, output_path: Union[str, bytes, os.PathLike]) -> None:
+        """Replace the hard links in an output directory by copies of their files.
+
+        The output writers truncate and rewrite existing files, so a run writing to a directory
+        where cached results were restored as hard links would otherwise overwrite the stored
+        files of those results.
+
+        :param output_path: The output directory.
+        :type output_path: Union[str, bytes, os.PathLike]
+        """
+        output_path = str(output_path)
+        if not os.path.isdir(output_path):
+            return
+
+        for root, _, files in os.walk(output_path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                if os.path.islink(file_path) or os.stat(file_path).st_nlink < 2:
+                    continue
+
+                temp_path = f"{file_path}.{os.getpid()}.tmp"
+                shutil.copy2(file_path, temp_path)
+                os.replace(temp_path, file_path)
+                self.logger.debug("Detached %s from the result cache", file_path)
+
+    def store(
+        self,
+        fingerprint: str,
+        output_path: Union[str, bytes, os.PathLike],
+        files: list,
+    ) -> None:
+        """Add the output files of a model run to the store, evicting old entries if needed.
+
+        :param fingerprint: The fingerprint of the model run.
+        :type fingerprint: str
+
+        :param output_path: The directory of the output files.
+        :type output_path: Union[str, bytes, os.PathLike]
+
+        :param files: The paths of the output files, relative to ``output_path``.
+        :type files: list
+        """
+        output_path = str(output_path)
+        entry_path = self.get_entry_path(fingerprint)
+        temp_entry_path = f"{entry_path}.{os.getpid()}.tmp"
+        shutil.rmtree(temp_entry_path, ignore_errors=True)
+
+        size = 0
+        for file in files:
+            destination = os.path.join(temp_entry_path, file)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(os.path.join(output_path, file), destination)
+            size += os.path.getsize(destination)
+
+        if size > self.max_size:
+            self.logger.warning(
+                "Results of %s (%d bytes) exceed the result cache size", fingerprint, size
+            )
+            shutil.rmtree(temp_entry_path, ignore_errors=True)
+            return
+
+        shutil.rmtree(entry_path, ignore_errors=True)
+        os.replace(temp_entry_path, entry_path)
+
+        index = self.__read_index()
+        index[fingerprint] = {"size": size, "last_access": time.time()}
+        self.__evict(index, keep=fingerprint)
+        self.__write_index(index)
+        self.logger.info("Stored results %s in the result cache (%d bytes)", fingerprint, size)
+
+    def __evict(self, index: dict, keep: str) -> None:
+        total_size = sum(entry["size"] for entry in index.values())
+        for fingerprint in sorted(index, key=lambda k: index[k]["last_access"]):
+            if total_size <= self.max_size:
+                break
+
+            if fingerprint == keep:
+                continue
+
+            self.logger.debug("Evicting results %s from the result cache", fingerprint)
+            shutil.rmtree(self.get_entry_path(fingerprint), ignore_errors=True)
+            total_size -= index.pop(fingerprint)["size"]
+
+    def __materialize(self, source: str, destination: str) -> None:
+        if os.path.lexists(destination):
+            os.remove(destination)
+
+        if self.link_outputs:
+            try:
+                os.link(source, destination)
+                return
+            except OSError:
+                self.logger.debug("Could not link %s, copying it instead", source)
+
+        shutil.copy2(source, destination)
+
+    def __read_index(self) -> dict:
+        index_path = os.path.join(self.path, RESULT_CACHE_INDEX_FILE_NAME)
+        if not os.path.isfile(index_path):
+            return {}
+
+        try:
+            with open(index_path, mode="r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Ignoring invalid result cache index %s: %s", index_path, e)
+            return {}
+
+    def __write_index(self, index: dict) -> None:
+        index_path = os.path.join(self.path, RESULT_CACHE_INDEX_FILE_NAME)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as f:
+            json.dump(index, f, indent=4)
+
+        os.replace(temp_path, index_path)
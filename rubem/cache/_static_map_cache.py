@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Optional, Union
+
+import numpy as np
+
+from ._fingerprint import FileHasher
+
+__all__ = ["StaticMapCache"]
+
+STATIC_MAP_CACHE_ENTRIES_DIRECTORY_NAME = "entries"
+STATIC_MAP_CACHE_FILE_HASHES_FILE_NAME = "file_hashes.json"
+
+logger = logging.getLogger(__name__)
+
+
+class StaticMapCache:
+    """Local store of static maps derived from the model inputs, such as the LDD and slope.
+
+    Each entry holds a set of maps as NumPy array files (``.npy``), which are memory-mapped when
+    loaded, under a key covering everything the maps are derived from. The store keeps the
+    entries with the most recent accesses within a total size, evicting the least recently used
+    ones.
+
+    :param path: Directory of the store. Created if it does not exist.
+    :type path: Union[str, bytes, os.PathLike]
+
+    :param max_size: Maximum total size of the entries [bytes].
+    :type max_size: int
+
+    :raises ValueError: If the maximum size is not positive.
+    """
+
+    def __init__(self, path: Union[str, bytes, os.PathLike], max_size: int) -> None:
+        self.logger = logging.getLogger(__name__)
+        if max_size <= 0:
+            self.logger.error("Invalid static map cache maximum size: %s", max_size)
+            raise ValueError(f"Invalid static map cache maximum size: {max_size}")
+
+        self.path = str(path)
+        self.max_size = max_size
+        os.makedirs(os.path.join(self.path, STATIC_MAP_CACHE_ENTRIES_DIRECTORY_NAME), exist_ok=True)
+        self.file_hasher = FileHasher(
+            os.path.join(self.path, STATIC_MAP_CACHE_FILE_HASHES_FILE_NAME)
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional["StaticMapCache"]:
+        """Create the static map cache described by the ``static_map_cache`` application settings.
+
+        :param settings: The application settings of the static map cache.
+        :type settings: Optional[dict]
+
+        :return: The static map cache, or ``None`` if it is not enabled.
+        :rtype: Optional[StaticMapCache]
+        """
+        if not settings or not settings.get("enabled"):
+            return None
+
+        path = settings.get("path") or os.path.join(
+            os.path.expanduser("~"), ".cache", "rubem", "static_maps"
+        )
+        return cls(
+            path=os.path.expanduser(path),
+            max_size=int(float(settings.get("max_size_mb", 2048)) * 1024 * 1024),
+        )
+
+    def key(self, files: dict, extra: Optional[dict] = None) -> str:
+        """Return the key of the maps derived from some input files.
+
+        :param files: The paths of the input files the maps are derived from, indexed by name.
+            Empty paths are ignored.
+        :type files: dict
+
+        :param extra: Other JSON-serializable information the maps are derived from (e.g. the
+            grid geometry). Default is ``None``.
+        :type extra: Optional[dict]
+
+        :return: The hexadecimal key.
+        :rtype: str
+        """
+        payload = json.dumps(
+            {
+                "files": {
+                    name: self.file_hasher.hash_file(path) for name, path in files.items() if path
+                },
+                "extra": extra,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        self.file_hasher.save()
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
+
+    def get_entry_path(self, key: str) -> str:
+        """Return the directory of the entry of a key.
+
+        :param key: The key of the maps.
+        :type key: str
+
+        :return: The directory of the entry.
+        :rtype: str
+        """
+        return os.path.join(self.path, STATIC_MAP_CACHE_ENTRIES_DIRECTORY_NAME, key)
+
+    def load(self, key: str, names: list) -> Optional[dict]:
+        """Map the cached maps of a key into memory.
+
+        :param key: The key of the maps.
+        :type key: str
+
+        :param names: The names of the maps.
+        :type names: list[str]
+
+        :return: The read-only maps indexed by name, or ``None`` if any of them is not cached.
+        :rtype: Optional[dict]
+        """
+        entry_path = self.get_entry_path(key)
+        try:
+            maps = {
+                name: np.load(os.path.join(entry_path, f"{name}.npy"), mmap_mode="r")
+                for name in names
+            }
+        except (OSError, ValueError):
+            return None
+
+        os.utime(entry_path)
+        self.logger.debug("Loaded cached static maps %s", key)
+        return maps
+
+    def save(self, key: str, maps: dict) -> None:
+        """Add maps to the store, evicting the least recently used entries beyond the size.
+
+        :param key: The key of the maps.
+        :type key: str
+
+        :param maps: The maps indexed by name.
+        :type maps: dict
+        """
+        entry_path = self.get_entry_path(key)
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+        try:
+            for name, values in maps.items():
+                np.save(os.path.join(temp_path, f"{name}.npy"), np.asarray(values))
+
+            shutil.rmtree(entry_path, ignore_errors=True)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            self.logger.warning("Could not cache static maps %s: %s", key, e)
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return
+
+        self.logger.debug("Cached static maps %s", key)
+        self.__evict(keep=key)
+
+    def __evict(self, keep: str) -> None:
+        entries_path = os.path.join(self.path, STATIC_MAP_CACHE_ENTRIES_DIRECTORY_NAME)
+        entries = []
+        for entry in os.scandir(entries_path):
+            if not entry.is_dir() or entry.name.endswith(".tmp"):
+                continue
+
+            size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+            entries.append((entry.stat().st_mtime, entry.name, size))
+
+        total_size = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            if key == keep:
+                continue
+
+            self.logger.debug("Evicting static maps %s from the static map cache", key)
+            shutil.rmtree(self.get_entry_path(key), ignore_errors=True)
+            total_size -= size
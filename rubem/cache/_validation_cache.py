@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Optional, Union
+
+from ._fingerprint import FileHasher
+
+__all__ = ["ValidationCache"]
+
+VALIDATION_CACHE_RESULTS_FILE_NAME = "validation_results.json"
+VALIDATION_CACHE_FILE_HASHES_FILE_NAME = "file_hashes.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ValidationCache:
+    """Local store of the validation results of the input raster files.
+
+    The result of a file is kept under its path, valid value range and data rules, together
+    with the hash of its contents. The hash is memoized by the size and modification time of
+    the file, so an unchanged file is neither read nor validated again by later runs, and a
+    file with the same contents but a new modification time (e.g. copied again) is only hashed.
+
+    :param path: Directory of the store. Created if it does not exist.
+    :type path: Union[str, bytes, os.PathLike]
+    """
+
+    def __init__(self, path: Union[str, bytes, os.PathLike]) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.path = str(path)
+        os.makedirs(self.path, exist_ok=True)
+
+        self.results_path = os.path.join(self.path, VALIDATION_CACHE_RESULTS_FILE_NAME)
+        self.file_hasher = FileHasher(
+            os.path.join(self.path, VALIDATION_CACHE_FILE_HASHES_FILE_NAME)
+        )
+        self.hits = 0
+        self.misses = 0
+        self.__results = {}
+        self.__is_changed = False
+        if os.path.isfile(self.results_path):
+            try:
+                with open(self.results_path, mode="r", encoding="utf-8") as f:
+                    self.__results = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(
+                    "Ignoring invalid validation results %s: %s", self.results_path, e
+                )
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional["ValidationCache"]:
+        """Create the validation cache described by the ``validation_cache`` application settings.
+
+        :param settings: The application settings of the validation cache.
+        :type settings: Optional[dict]
+
+        :return: The validation cache, or ``None`` if it is not enabled.
+        :rtype: Optional[ValidationCache]
+        """
+        if not settings or not settings.get("enabled"):
+            return None
+
+        path = settings.get("path") or os.path.join(
+            os.path.expanduser("~"), ".cache", "rubem", "validation"
+        )
+        return cls(path=os.path.expanduser(path))
+
+    def __key(self, file_path: str, valid_range, rules) -> str:
+        payload = json.dumps(
+            {
+                "file": file_path,
+                "range": valid_range,
+                "rules": sorted(rule.name for rule in type(rules) if rule in rules),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
+
+    def get(self, file_path: Union[str, bytes, os.PathLike], valid_range, rules) -> Optional[dict]:
+        """Return the cached validation result of a file.
+
+        :param file_path: The path of the raster file.
+        :type file_path: Union[str, bytes, os.PathLike]
+
+        :param valid_range: The valid range of the raster values.
+        :type valid_range: dict[str, float]
+
+        :param rules: The data rules of the raster.
+        :type rules: RasterDataRules
+
+        :return: The result, or ``None`` if the file, its range or rules changed since it was
+            validated, or it was never validated.
+        :rtype: Optional[dict]
+        """
+        file_path = os.path.abspath(str(file_path))
+        entry = self.__results.get(self.__key(file_path, valid_range, rules))
+        try:
+            if entry is not None and entry["hash"] == self.file_hasher.hash_file(file_path):
+                self.hits += 1
+                return entry["result"]
+        except OSError:
+            pass
+
+        self.misses += 1
+        return None
+
+    def put(
+        self, file_path: Union[str, bytes, os.PathLike], valid_range, rules, result: dict
+    ) -> None:
+        """Cache the validation result of a file.
+
+        :param file_path: The path of the raster file.
+        :type file_path: Union[str, bytes, os.PathLike]
+
+        :param valid_range: The valid range of the raster values.
+        :type valid_range: dict[str, float]
+
+        :param rules: The data rules of the raster.
+        :type rules: RasterDataRules
+
+        :param result: The JSON-serializable result of the validation.
+        :type result: dict
+        """
+        file_path = os.path.abspath(str(file_path))
+        try:
+            file_hash = self.file_hasher.hash_file(file_path)
+        except OSError as e:
+            self.logger.warning("Could not cache validation result of %s: %s", file_path, e)
+            return
+
+        self.__results[self.__key(file_path, valid_range, rules)] = {
+            "file": file_path,
+            "hash": file_hash,
+            "result": result,
+        }
+        self.__is_changed = True
+
+    def save(self) -> None:
+        """Write the cached results and file hashes to the store, if any changed."""
+        self.file_hasher.save()
+        if not self.__is_changed:
+            return
+
+        temp_path = f"{self.results_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, mode="w", encoding="utf-8") as f:
+                json.dump(self.__results, f)
+
+            os.replace(temp_path, self.results_path)
+        except OSError as e:
+            self.logger.warning("Could not save validation results %s: %s", self.results_path, e)
+            return
+
+        self.__is_changed = False
+        self.logger.debug("Validation cache: %d hits, %d misses", self.hits, self.misses)
@@ -7,10 +7,16 @@ from typing import Optional
 import humanize
 
 from . import __release__
+from .cache import ResultCache, StaticMapCache, ValidationCache
 from .configuration.app_settings import AppSettings
 from .configuration.data_ranges_settings import DataRangesSettings
-from .core import DynamicFrameworkWrapper
-from .validation.cli_validators import file_path_cli_arg_validator
+from .core import DynamicFrameworkWrapper, ingest
+from .file._frame_cache import configure_frame_cache
+from .file._raster_prefetcher import RasterPrefetcher
+from .validation.cli_validators import (
+    file_path_cli_arg_validator,
+    positive_int_cli_arg_validator,
+)
 from .configuration.model_configuration import ModelConfiguration
 
 logger = logging.getLogger(__name__)
@@ -77,12 +83,60 @@ def main():
         help="disable input files validation before running the model",
         required=False,
     )
+    parser.add_argument(
+        "-p",
+        "--preview-factor",
+        type=positive_int_cli_arg_validator,
+        metavar="N",
+        help="run a quick preview on a grid N times coarser than the clone",
+        required=False,
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=positive_int_cli_arg_validator,
+        metavar="N",
+        help="simulate the independent drainage basins in up to N worker processes",
+        required=False,
+    )
+    parser.add_argument(
+        "--ingest",
+        action="store_true",
+        help="pack the input raster series into the input cube and exit",
+        required=False,
+    )
 
     args = parser.parse_args()
 
     try:
-        model_config = ModelConfiguration(args.configfile, args.skip_inputs_validation)
-        model = DynamicFrameworkWrapper.load(model_config)
+        model_config = ModelConfiguration(
+            args.configfile,
+            args.skip_inputs_validation,
+            preview_factor=args.preview_factor,
+            workers=args.workers,
+            validation_cache=ValidationCache.from_settings(
+                app_settings.get_setting("validation_cache")
+            ),
+        )
+        if args.ingest:
+            print("Ingesting input raster series...")
+            input_cube = ingest(model_config)
+            print(f"Input cube written to '{input_cube.path}'")
+            logger.info("RUBEM successfully finished!")
+            return
+
+        result_cache = ResultCache.from_settings(app_settings.get_setting("result_cache"))
+        static_map_cache = StaticMapCache.from_settings(
+            app_settings.get_setting("static_map_cache")
+        )
+        prefetcher = RasterPrefetcher.from_settings(app_settings.get_setting("prefetch"))
+        configure_frame_cache(app_settings.get_setting("frame_cache"))
+        model = DynamicFrameworkWrapper.load(
+            model_config,
+            result_cache=result_cache,
+            static_map_cache=static_map_cache,
+            prefetcher=prefetcher,
+        )
         model.run()
     except Exception as e:
         logger.critical("RUBEM unexpectedly quit.")
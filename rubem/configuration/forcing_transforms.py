@@ -0,0 +1,182 @@
+import logging
+import os
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FORCING_TRANSFORM_SERIES = ("precipitation", "etp")
+
+FORCING_TRANSFORM_SETTINGS = (
+    "monthly_factors",
+    "monthly_deltas",
+    "zones",
+    "zone_factors",
+    "noise_std",
+    "seed",
+)
+
+
+class ForcingTransform:
+    """
+    Represents a transformation of a climate forcing series applied in memory right after each map is read, such as a climate change scenario.
+
+    The map of each timestep is multiplied by the factor of its calendar month, added to the delta of its month, multiplied by the factor of the zone of each cell and by a seeded random perturbation, in this order. The result is clipped at zero, since the forcing series are non-negative.
+
+    :param monthly_factors: The 12 multiplicative factors of the months, from January to December. Defaults to `None`.
+    :type monthly_factors: Optional[Sequence[float]], optional
+
+    :param monthly_deltas: The 12 additive deltas of the months, from January to December, in the unit of the series. Defaults to `None`.
+    :type monthly_deltas: Optional[Sequence[float]], optional
+
+    :param zones: Path to the nominal map of the zones of ``zone_factors``. Defaults to `None`.
+    :type zones: Optional[Union[str, bytes, os.PathLike]], optional
+
+    :param zone_factors: The multiplicative factor of each zone of ``zones``, by zone id. Cells of other zones are not scaled. Defaults to `None`.
+    :type zone_factors: Optional[Dict[int, float]], optional
+
+    :param noise_std: The standard deviation of the random multiplicative perturbation of each cell, drawn from a normal distribution with mean 1. Defaults to `0.0`, no perturbation.
+    :type noise_std: float, optional
+
+    :param seed: The seed of the random perturbations. The perturbation of a cell depends only on the seed, the series, the timestep and the position of the cell in the grid, so runs with the same seed are reproducible, whether they read the whole grid or a window of it. Defaults to `0`.
+    :type seed: int, optional
+
+    :raises ValueError: If the monthly values are not 12 numbers, the zone factors have no zones map or any factor or standard deviation is negative.
+    """
+
+    def __init__(
+        self,
+        monthly_factors: Optional[Sequence[float]] = None,
+        monthly_deltas: Optional[Sequence[float]] = None,
+        zones: Optional[Union[str, bytes, os.PathLike]] = None,
+        zone_factors: Optional[Dict[int, float]] = None,
+        noise_std: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.logger = logging.getLogger(__name__)
+
+        self.monthly_factors = self.__get_monthly_values(monthly_factors, "monthly_factors", 1.0)
+        self.monthly_deltas = self.__get_monthly_values(monthly_deltas, "monthly_deltas", 0.0)
+        if np.any(self.monthly_factors < 0):
+            self.logger.error("Negative monthly factors: %s", monthly_factors)
+            raise ValueError("Monthly factors must be non-negative")
+
+        if zone_factors and not zones:
+            self.logger.error("Zone factors without a zones map")
+            raise ValueError("Zone factors require a zones map")
+
+        if zones and not os.path.isfile(zones):
+            self.logger.error("Zones map not found: %s", zones)
+            raise FileNotFoundError(f"Zones map not found: {zones}")
+
+        self.zones = zones or None
+        zone_factors = {int(zone): float(factor) for zone, factor in (zone_factors or {}).items()}
+        if any(factor < 0 for factor in zone_factors.values()):
+            self.logger.error("Negative zone factors: %s", zone_factors)
+            raise ValueError("Zone factors must be non-negative")
+
+        self.zone_ids = np.array(sorted(zone_factors), dtype=np.int64)
+        self.zone_factors = np.array(
+            [zone_factors[zone] for zone in self.zone_ids], dtype=np.float32
+        )
+
+        self.noise_std = float(noise_std)
+        if self.noise_std < 0:
+            self.logger.error("Negative noise standard deviation: %s", noise_std)
+            raise ValueError("Noise standard deviation must be non-negative")
+
+        self.seed = int(seed)
+
+    def __get_monthly_values(self, values, name: str, default: float) -> np.ndarray:
+        if values is None:
+            return np.full(12, default, dtype=np.float32)
+
+        if len(values) != 12:
+            self.logger.error("Invalid %s: %s", name, values)
+            raise ValueError(f"{name} must have 12 values, one per month")
+
+        return np.asarray(values, dtype=np.float32)
+
+    def get_zone_factors(self, zones: np.ndarray) -> np.ndarray:
+        """Return the factor of the zone of each cell of a zones map.
+
+        :param zones: The zone id of each cell.
+        :type zones: np.ndarray
+
+        :return: The factor of each cell, ``1.0`` for cells of zones without a factor.
+        :rtype: np.ndarray
+        """
+        factors = np.ones(np.shape(zones), dtype=np.float32)
+        if not len(self.zone_ids):
+            return factors
+
+        index = np.minimum(np.searchsorted(self.zone_ids, zones), len(self.zone_ids) - 1)
+        found = self.zone_ids[index] == zones
+        factors[found] = self.zone_factors[index[found]]
+        return factors
+
+    def apply(
+        self,
+        array: np.ndarray,
+        month: int,
+        timestep: int,
+        series_index: int = 0,
+        missing_value: float = -9999.0,
+        zone_factors: Optional[np.ndarray] = None,
+        offset: Tuple[int, int] = (0, 0),
+        grid_shape: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        """Transform the map of a timestep.
+
+        :param array: The map values, with ``missing_value`` at no data cells.
+        :type array: np.ndarray
+
+        :param month: The calendar month of the timestep, from 1 to 12.
+        :type month: int
+
+        :param timestep: The timestep of the map, used to draw its perturbations.
+        :type timestep: int
+
+        :param series_index: The index of the series, so that series with the same seed have different perturbations. Defaults to `0`.
+        :type series_index: int, optional
+
+        :param missing_value: The value of the no data cells, which are kept. Defaults to `-9999.0`.
+        :type missing_value: float, optional
+
+        :param zone_factors: The factor of each cell, from :meth:`get_zone_factors`. Defaults to `None`.
+        :type zone_factors: Optional[np.ndarray], optional
+
+        :param offset: The ``(row, col)`` offset of the map in the grid, if it is a window of it. Defaults to `(0, 0)`.
+        :type offset: Tuple[int, int], optional
+
+        :param grid_shape: The ``(rows, cols)`` shape of the grid the perturbations are drawn on, so that each cell is perturbed the same whatever the window read. Defaults to `None`, the shape of the map.
+        :type grid_shape: Optional[Tuple[int, int]], optional
+
+        :return: The transformed map values.
+        :rtype: np.ndarray
+        """
+        valid = array != missing_value
+        result = array.astype(np.float32) * self.monthly_factors[month - 1]
+        result += self.monthly_deltas[month - 1]
+
+        if zone_factors is not None:
+            result *= zone_factors
+
+        if self.noise_std:
+            rng = np.random.default_rng([self.seed, series_index, timestep])
+            noise = rng.normal(1.0, self.noise_std, size=grid_shape or result.shape)
+            row, col = offset
+            rows, cols = result.shape
+            result *= noise[row : row + rows, col : col + cols].astype(np.float32)
+
+        np.maximum(result, 0.0, out=result)
+        result[~valid] = missing_value
+        return result
+
+    def __str__(self) -> str:
+        return (
+            f"Monthly factors: {self.monthly_factors.tolist()}\n"
+            f"Monthly deltas: {self.monthly_deltas.tolist()}\n"
+            f"Zones: {self.zones if self.zones else 'Disabled'}\n"
+            f"Zone factors: {dict(zip(self.zone_ids.tolist(), self.zone_factors.tolist()))}\n"
+            f"Noise: std={self.noise_std}, seed={self.seed}"
+        )
@@ -2,9 +2,9 @@ import logging
 import os
 from typing import Optional, Union
 
-from ..configuration.raster_map import RasterMap
+from ..cache import ValidationCache
 from ..configuration.data_ranges_settings import DataRangesSettings
-from ..validation.raster_map_validator import RasterMapValidator
+from ..configuration.input_raster_series import validate_raster_file
 from ..validation.raster_data_rules import RasterDataRules
 
 
@@ -36,6 +36,9 @@ class InputRasterFiles:
     :param validate_input: If ``True``, validates the input raster files. Defaults to ``True``.
     :type validate_input: bool, optional
 
+    :param validation_cache: The store of the validation results of previous runs, so only new or changed files are validated. Defaults to ``None``.
+    :type validation_cache: Optional[ValidationCache], optional
+
     :raises FileNotFoundError: If any of the input raster files does not exist.
     :raises ValueError: If any of the input raster files is empty or has an invalid extension.
     """
@@ -50,11 +53,13 @@ class InputRasterFiles:
         sample_locations: Optional[Union[str, bytes, os.PathLike]] = None,
         ldd: Optional[Union[str, bytes, os.PathLike]] = None,
         validate_input: bool = True,
+        validation_cache: Optional[ValidationCache] = None,
     ) -> None:
         self.logger = logging.getLogger(__name__)
         self.__ranges = DataRangesSettings()
 
         self.problems = []
+        self.__validation_cache = validation_cache
 
         self.dem = dem
         self.clone = clone
@@ -107,22 +112,35 @@ class InputRasterFiles:
             )
 
         for file, valid_range, rules in files:
-            raster = RasterMap(file, valid_range, rules)
-            self.logger.debug(str(raster).replace("\n", ", "))
-
-            validator = RasterMapValidator()
-            valid, errors = validator.validate(raster)
-            if not valid:
+            errors = self.__validate_raster_file(file, valid_range, rules)
+            if errors:
                 self.problems.append(
                     {
                         "description": "Raster file data validation failed.",
-                        "reason": f"Data rules violation(s): {[str(error) for error in errors]}.",
+                        "reason": f"Data rules violation(s): {errors}.",
                         "implication": "This may lead to unexpected results.",
                         "file": file,
                         "blocking": False,
                     }
                 )
 
+        if self.__validation_cache:
+            self.__validation_cache.save()
+
+    def __validate_raster_file(self, file, valid_range, rules) -> list:
+        if self.__validation_cache:
+            result = self.__validation_cache.get(file, valid_range, rules)
+            if result is not None:
+                return result["errors"]
+
+        num_bands, errors = validate_raster_file(file, valid_range, rules)
+        if self.__validation_cache:
+            self.__validation_cache.put(
+                file, valid_range, rules, {"num_bands": num_bands, "errors": errors}
+            )
+
+        return errors
+
     def __str__(self) -> str:
         return (
             f"DEM (PCRaster Map): {self.dem}\n"
@@ -1,21 +1,56 @@
+from concurrent.futures import ProcessPoolExecutor
 import logging
 import os
-from typing import Union
+from typing import Optional, Union
 import re
 
 from ..configuration.raster_map import RasterMap
+from ..cache import ValidationCache
 from ..configuration.data_ranges_settings import DataRangesSettings
+from ..configuration.simulation_period import SimulationPeriod
+from ..file._raster_stack import is_raster_stack
+from ..file._series_files import is_single_file_series, open_single_file_series
+from ..file._series_manifest import SeriesManifest, is_series_manifest
 from ..validation.raster_map_validator import RasterMapValidator
 from ..validation.raster_data_rules import RasterDataRules
 
 RASTER_SERIES_FILENAME_MAX_CHARS = 8
 RASTER_SERIES_FILENAME_EXTENSION_NUM_DIGITS = 3
 
+logger = logging.getLogger(__name__)
+
+
+def validate_raster_file(file, valid_range, rules) -> tuple:
+    """
+    Validate the data of a raster file of a series.
+
+    Defined at module level so it can run in the worker processes of a parallel validation.
+
+    :param file: Path to the raster file.
+    :type file: Union[str, bytes, os.PathLike]
+
+    :param valid_range: The valid range of the raster values.
+    :type valid_range: dict[str, float]
+
+    :param rules: The data rules of the raster.
+    :type rules: RasterDataRules
+
+    :return: The number of bands of the raster and the data rules violations found, as text.
+    :rtype: tuple
+    """
+    raster = RasterMap(file, valid_range, rules)
+    logger.debug(str(raster).replace("\n", ", "))
+
+    valid, errors = RasterMapValidator().validate(raster)
+    return len(raster.bands), [] if valid else [str(error) for error in errors]
+
 
 class InputRasterSeries:
     """
     Represents a set of input data directories and their corresponding filenames prefixes for raster files from its series.
 
+    A series can also be a single multi-band GeoTIFF file (``.tif`` or ``.tiff``) whose band ``n`` holds the map of timestep ``n``, or a NetCDF file (``file.nc`` or ``file.nc:variable``) whose CF time coordinate is mapped to the timesteps of the simulation period, or a JSON manifest (``.json``) listing the file of each timestep or month. Its path is given instead of the directory and its filename prefix is ignored.
+
     :param etp: Path to the directory containing ETP (Evapotranspiration) data.
     :type etp: Union[str, bytes, os.PathLike]
 
@@ -49,9 +84,22 @@ class InputRasterSeries:
     :param validate_input: If True, validates the input data directories and their corresponding filenames prefixes for raster files from its series. Defaults to `True`.
     :type validate_input: bool, optional
 
+    :param simulation_period: The simulation period, required to validate NetCDF series and manifests by month. Defaults to `None`.
+    :type simulation_period: Optional[SimulationPeriod], optional
+
+    :param cube: Path to the directory of the input cube where the series are packed by ``rubem --ingest``. Defaults to `None`.
+    :type cube: Optional[Union[str, bytes, os.PathLike]], optional
+
+    :param validation_workers: Number of processes validating the raster files of the series. The files are validated in parallel if greater than ``1`` and their problems are reported in the same order as by a single process. Defaults to `1`.
+    :type validation_workers: int, optional
+
+    :param validation_cache: The store of the validation results of previous runs, so only new or changed files are validated. Defaults to `None`.
+    :type validation_cache: Optional[ValidationCache], optional
+
     :raises NotADirectoryError: If any of the input data directories does not exist.
-    :raises ValueError: If any of the input data directories is empty or if any of the input data directories contains files with invalid extensions.
+    :raises ValueError: If any of the input data directories is empty or has no filename prefix, or if any of the input data directories contains files with invalid extensions.
     :raises FileNotFoundError: If any of the input data directories does not contain files with the specified prefix.
+    :raises ValueError: If ``validation_workers`` is not a positive integer.
     """
 
     def __init__(
@@ -67,6 +115,10 @@ class InputRasterSeries:
         landuse: Union[str, bytes, os.PathLike],
         landuse_filename_prefix: str,
         validate_input: bool = True,
+        cube: Optional[Union[str, bytes, os.PathLike]] = None,
+        simulation_period: Optional[SimulationPeriod] = None,
+        validation_workers: int = 1,
+        validation_cache: Optional[ValidationCache] = None,
     ) -> None:
         self.logger = logging.getLogger(__name__)
         self.__ranges = DataRangesSettings()
@@ -83,25 +135,47 @@ class InputRasterSeries:
         self.__kp_filename_prefix = kp_filename_prefix
         self.__landuse_dir_path = landuse
         self.__landuse_filename_prefix = landuse_filename_prefix
+        self.__simulation_period = simulation_period
+
+        if not isinstance(validation_workers, int) or validation_workers < 1:
+            self.logger.error("Invalid number of validation workers: %s", validation_workers)
+            raise ValueError(f"Invalid number of validation workers: {validation_workers}")
+
+        self.__workers = validation_workers
+        self.__validation_cache = validation_cache
+
+        for directory, prefix in (
+            (self.__etp_dir_path, self.__etp_filename_prefix),
+            (self.__precipitation_dir_path, self.__precipitation_filename_prefix),
+            (self.__ndvi_dir_path, self.__ndvi_filename_prefix),
+            (self.__kp_dir_path, self.__kp_filename_prefix),
+            (self.__landuse_dir_path, self.__landuse_filename_prefix),
+        ):
+            if not prefix and not is_single_file_series(directory):
+                self.logger.error("Missing filename prefix of raster series: %s", directory)
+                raise ValueError(f"Missing filename prefix of raster series: {directory}")
 
         if validate_input:
             self.__validate_directories()
         else:
             self.logger.warning("Input data directories validation is disabled.")
 
-        self.etp = os.path.abspath(
-            os.path.join(str(self.__etp_dir_path), self.__etp_filename_prefix)
+        self.etp = self.__get_series_path(self.__etp_dir_path, self.__etp_filename_prefix)
+        self.precipitation = self.__get_series_path(
+            self.__precipitation_dir_path, self.__precipitation_filename_prefix
         )
-        self.precipitation = os.path.abspath(
-            os.path.join(str(self.__precipitation_dir_path), self.__precipitation_filename_prefix)
-        )
-        self.ndvi = os.path.abspath(
-            os.path.join(str(self.__ndvi_dir_path), self.__ndvi_filename_prefix)
-        )
-        self.kp = os.path.abspath(os.path.join(str(self.__kp_dir_path), self.__kp_filename_prefix))
-        self.landuse = os.path.abspath(
-            os.path.join(str(self.__landuse_dir_path), self.__landuse_filename_prefix)
+        self.ndvi = self.__get_series_path(self.__ndvi_dir_path, self.__ndvi_filename_prefix)
+        self.kp = self.__get_series_path(self.__kp_dir_path, self.__kp_filename_prefix)
+        self.landuse = self.__get_series_path(
+            self.__landuse_dir_path, self.__landuse_filename_prefix
         )
+        self.cube = os.path.abspath(str(cube)) if cube else None
+
+    def __get_series_path(self, directory, prefix) -> str:
+        if is_single_file_series(directory):
+            return os.path.abspath(str(directory))
+
+        return os.path.abspath(os.path.join(str(directory), prefix))
 
     def __validate_directories(self) -> None:
         directories = [
@@ -137,39 +211,71 @@ class InputRasterSeries:
             ),
         ]
 
-        total_num_files = []
+        # The files of every series are listed first and then validated together, in parallel
+        # if there are several workers, keeping the order of the listing in the results
+        series_files = []
+        tasks = []
         for directory, prefix, valid_range, rules in directories:
-            if not os.path.isdir(directory):
-                raise NotADirectoryError(f"Invalid input data directory: {directory}")
+            if is_single_file_series(directory):
+                files, num_steps = self.__list_series_file(directory)
+            else:
+                if not os.path.isdir(directory):
+                    raise NotADirectoryError(f"Invalid input data directory: {directory}")
 
-            if not os.listdir(directory):
-                raise ValueError(f"Empty input data directory: {directory}")
+                if not os.listdir(directory):
+                    raise ValueError(f"Empty input data directory: {directory}")
 
-            self.__validate_raster_series_filenames_prefixes(prefix)
-            total_num_files.append(
-                self.__validate_files_with_prefix(directory, prefix, valid_range, rules)
-            )
+                self.__validate_raster_series_filenames_prefixes(prefix)
+                files = self.__list_files_with_prefix(directory, prefix)
+                num_steps = len(files)
+
+            # Series may share files with other ranges or rules, so results are kept by task
+            series_files.append((directory, files, num_steps, len(tasks)))
+            tasks.extend((file, valid_range, rules) for file in files)
+
+        results = list(self.__validate_raster_files(tasks))
 
-        common_total_num_files = set(total_num_files)
+        total_num_files = []
+        for directory, files, num_steps, first_task in series_files:
+            for file, (num_bands, errors) in zip(files, results[first_task:]):
+                if errors:
+                    self.problems.append(
+                        {
+                            "description": "Raster file data validation failed.",
+                            "reason": f"Data rules violation(s): {errors}",
+                            "implication": "This may lead to unexpected results.",
+                            "file": file,
+                            "blocking": False,
+                        }
+                    )
+
+            if is_raster_stack(directory):
+                num_steps = results[first_task][0]
+
+            total_num_files.append(num_steps)
+
+        common_total_num_files = set(total_num_files) - {None}
         if len(common_total_num_files) > 1:
             self.logger.warning(
                 "Number of files in one or more input data directories is different. "
                 "This may lead to unexpected results."
             )
 
-    def __validate_files_with_prefix(self, directory, prefix, valid_range, rules) -> int:
+    def __list_files_with_prefix(self, directory, prefix) -> list:
         num_digits = RASTER_SERIES_FILENAME_MAX_CHARS - len(prefix)
-        regex_pattern = rf"^{prefix}[0-9]{{{num_digits}}}\.[0-9]{{{RASTER_SERIES_FILENAME_EXTENSION_NUM_DIGITS}}}$"
+        # PCRaster map-stack files (e.g. prec0000.001) or GDAL files (e.g. prec0000001.tif)
+        regex_pattern = (
+            rf"^{prefix}([0-9]{{{num_digits}}}\.[0-9]{{{RASTER_SERIES_FILENAME_EXTENSION_NUM_DIGITS}}}"
+            rf"|[0-9]{{{num_digits + RASTER_SERIES_FILENAME_EXTENSION_NUM_DIGITS}}}\.(tif|vrt))$"
+        )
         compiled_pattern = re.compile(regex_pattern, re.IGNORECASE)
 
-        counter = 0
         with os.scandir(directory) as it:
-            for entry in it:
-                if entry.is_file() and compiled_pattern.match(entry.name):
-                    self.__validate_raster_file(entry.path, valid_range, rules)
-                    counter += 1
+            files = sorted(
+                entry.path for entry in it if entry.is_file() and compiled_pattern.match(entry.name)
+            )
 
-        if counter == 0:
+        if not files:
             self.logger.error(
                 "No files found with prefix '%s' in directory '%s'", prefix, directory
             )
@@ -179,31 +285,79 @@ class InputRasterSeries:
 
         self.logger.info(
             "Found %d files with prefix '%s' in directory '%s'",
-            counter,
+            len(files),
             prefix,
             directory,
         )
 
-        return counter
-
-    def __validate_raster_file(self, file, valid_range, rules) -> None:
-        raster = RasterMap(file, valid_range, rules)
-        self.logger.debug(str(raster).replace("\n", ", "))
-
-        validator = RasterMapValidator()
-        valid, errors = validator.validate(raster)
-        if not valid:
-            self.problems.append(
-                self.problems.append(
-                    {
-                        "description": "Raster file data validation failed.",
-                        "reason": f"Data rules violation(s): {[str(error) for error in errors]}",
-                        "implication": "This may lead to unexpected results.",
-                        "file": file,
-                        "blocking": False,
-                    }
-                )
+        return files
+
+    def __list_series_file(self, file) -> tuple:
+        if is_series_manifest(file):
+            manifest = SeriesManifest(file, self.__simulation_period)
+            if not manifest.timesteps:
+                raise ValueError(f"No files in series manifest: {file}")
+
+            files = []
+            for timestep in manifest.timesteps:
+                file_path = manifest.get_file(timestep)
+                if not os.path.isfile(file_path):
+                    self.logger.error("File of timestep %s not found: %s", timestep, file_path)
+                    raise FileNotFoundError(f"File of timestep {timestep} not found: {file_path}")
+
+                files.append(file_path)
+
+            # Change points hold their map, so their number is not compared with other series
+            return files, None if manifest.hold_last else len(manifest.timesteps)
+
+        if not is_raster_stack(file):
+            # The data of NetCDF series is checked when read, only its time axis is validated here
+            series_file = open_single_file_series(file, self.__simulation_period)
+            num_steps = len(series_file.timesteps)
+            series_file.close()
+            if not num_steps:
+                raise ValueError(f"No time steps in NetCDF series: {file}")
+
+            return [], num_steps
+
+        # The number of steps of a stack is its number of bands, known once it is validated
+        return [file], None
+
+    def __validate_raster_files(self, tasks: list) -> list:
+        if not self.__validation_cache:
+            return self.__run_validation_tasks(tasks)
+
+        results = [self.__validation_cache.get(*task) for task in tasks]
+        misses = [index for index, result in enumerate(results) if result is None]
+        self.logger.info(
+            "Validating %d of %d raster files, the others are unchanged",
+            len(misses),
+            len(tasks),
+        )
+        for index, (num_bands, errors) in zip(
+            misses, self.__run_validation_tasks([tasks[index] for index in misses])
+        ):
+            results[index] = {"num_bands": num_bands, "errors": errors}
+            self.__validation_cache.put(*tasks[index], results[index])
+
+        self.__validation_cache.save()
+        return [(result["num_bands"], result["errors"]) for result in results]
+
+    def __run_validation_tasks(self, tasks: list) -> list:
+        if self.__workers > 1 and len(tasks) > 1:
+            self.logger.info(
+                "Validating %d raster files with %d workers...", len(tasks), self.__workers
             )
+            with ProcessPoolExecutor(max_workers=min(self.__workers, len(tasks))) as executor:
+                return list(
+                    executor.map(
+                        validate_raster_file,
+                        *zip(*tasks),
+                        chunksize=max(1, len(tasks) // (4 * self.__workers)),
+                    )
+                )
+
+        return [validate_raster_file(*task) for task in tasks]
 
     def __validate_raster_series_filenames_prefixes(self, prefix):
         num_digits = RASTER_SERIES_FILENAME_MAX_CHARS - len(prefix)
@@ -216,5 +370,6 @@ class InputRasterSeries:
             f"Rainfall: {self.__precipitation_dir_path} ({self.__precipitation_filename_prefix})\n"
             f"NDVI: {self.__ndvi_dir_path} ({self.__ndvi_filename_prefix})\n"
             f"Class A Pan Coefficient (Kp): {self.__kp_dir_path} ({self.__kp_filename_prefix})\n"
-            f"Land Use: {self.__landuse_dir_path} ({self.__landuse_filename_prefix})"
+            f"Land Use: {self.__landuse_dir_path} ({self.__landuse_filename_prefix})\n"
+            f"Input Cube: {self.cube if self.cube else 'Disabled'}"
         )
@@ -1,6 +1,27 @@
 import logging
 import os
-from typing import Union
+from typing import Optional, Union
+
+from ..file._parameter_table import ParameterTable
+
+# Columns of the parameter tables, by attribute of the lookup table they replace
+LANDUSE_PARAMETER_COLUMNS = {
+    "a_i": "a_i",
+    "a_o": "a_o",
+    "a_s": "a_s",
+    "a_v": "a_v",
+    "manning": "manning",
+    "kc_min": "k_c_min",
+    "kc_max": "k_c_max",
+}
+SOIL_PARAMETER_COLUMNS = {
+    "bulk_density": "bulk_density",
+    "k_sat": "k_sat",
+    "t_fcap": "t_fcap",
+    "t_sat": "t_sat",
+    "t_wp": "t_wp",
+    "rootzone_depth": "rootzone_depth",
+}
 
 
 class InputTableFiles:
@@ -56,8 +77,14 @@ class InputTableFiles:
     :param validate_input: If True, validates the input lookup table files. Defaults to `True`.
     :type validate_input: bool, optional
 
+    :param landuse_parameters: Path to the CSV table with all the land use parameters by class, replacing the land use lookup tables. Defaults to `None`.
+    :type landuse_parameters: Optional[Union[str, bytes, os.PathLike]], optional
+
+    :param soil_parameters: Path to the CSV table with all the soil parameters by class, replacing the soil lookup tables. Defaults to `None`.
+    :type soil_parameters: Optional[Union[str, bytes, os.PathLike]], optional
+
     :raises FileNotFoundError: If any of the input lookup table files does not exist.
-    :raises ValueError: If any of the input lookup table files is empty.
+    :raises ValueError: If any of the input lookup table files is empty, or if a parameter table is invalid.
     """
 
     def __init__(
@@ -77,6 +104,8 @@ class InputTableFiles:
         kc_min: Union[str, bytes, os.PathLike],
         kc_max: Union[str, bytes, os.PathLike],
         validate_input: bool = True,
+        landuse_parameters: Optional[Union[str, bytes, os.PathLike]] = None,
+        soil_parameters: Optional[Union[str, bytes, os.PathLike]] = None,
     ) -> None:
         self.logger = logging.getLogger(__name__)
 
@@ -94,6 +123,16 @@ class InputTableFiles:
         self.rootzone_depth = rootzone_depth
         self.kc_min = kc_min
         self.kc_max = kc_max
+        self.landuse_parameters = (
+            ParameterTable(landuse_parameters, LANDUSE_PARAMETER_COLUMNS.values())
+            if landuse_parameters
+            else None
+        )
+        self.soil_parameters = (
+            ParameterTable(soil_parameters, SOIL_PARAMETER_COLUMNS.values())
+            if soil_parameters
+            else None
+        )
 
         if validate_input:
             self.__validate_files()
@@ -101,24 +140,13 @@ class InputTableFiles:
             self.logger.warning("Input lookup table files validation is disabled.")
 
     def __validate_files(self) -> None:
-        files = [
-            self.rainy_days,
-            self.a_i,
-            self.a_o,
-            self.a_s,
-            self.a_v,
-            self.manning,
-            self.bulk_density,
-            self.k_sat,
-            self.t_fcap,
-            self.t_sat,
-            self.t_wp,
-            self.rootzone_depth,
-            self.kc_min,
-            self.kc_max,
-        ]
-
-        for file in files:
+        names = ["rainy_days"]
+        if not self.landuse_parameters:
+            names.extend(LANDUSE_PARAMETER_COLUMNS)
+        if not self.soil_parameters:
+            names.extend(SOIL_PARAMETER_COLUMNS)
+
+        for file in (getattr(self, name) for name in names):
             if not os.path.isfile(file):
                 raise FileNotFoundError(f"Invalid input lookuptable file: {file}")
 
@@ -140,5 +168,9 @@ class InputTableFiles:
             f"Wilting Point (T_wp): {self.t_wp}\n"
             f"Rootzone Depth: {self.rootzone_depth}\n"
             f"Min. Crop Coefficient (K_c_min): {self.kc_min}\n"
-            f"Max. Crop Coefficient (K_c_max): {self.kc_max}"
+            f"Max. Crop Coefficient (K_c_max): {self.kc_max}\n"
+            f"Land Use Parameters: "
+            f"{self.landuse_parameters.file_path if self.landuse_parameters else 'Disabled'}\n"
+            f"Soil Parameters: "
+            f"{self.soil_parameters.file_path if self.soil_parameters else 'Disabled'}"
         )
@@ -3,9 +3,15 @@ import json
 import logging
 import os
 import textwrap
-from typing import Union
+from typing import Optional, Union
 
+from ..cache import ValidationCache
 from ..configuration.calibration_parameters import CalibrationParameters
+from ..configuration.forcing_transforms import (
+    FORCING_TRANSFORM_SERIES,
+    FORCING_TRANSFORM_SETTINGS,
+    ForcingTransform,
+)
 from ..configuration.initial_soil_conditions import InitialSoilConditions
 from ..configuration.input_raster_files import InputRasterFiles
 from ..configuration.input_raster_series import InputRasterSeries
@@ -16,6 +22,9 @@ from ..configuration.output_format import OutputFileFormat
 from ..configuration.output_raster_base import OutputRasterBase
 from ..configuration.output_variables import OutputVariables
 from ..configuration.raster_grid_area import RasterGrid
+from ..configuration.replay_cache import ReplayCache
+from ..configuration.routing import Routing
+from ..configuration.simulation_domain import SimulationDomain
 from ..configuration.simulation_period import SimulationPeriod
 
 
@@ -31,6 +40,15 @@ class ModelConfiguration:
     :param validate_input: Whether to validate the input. Defaults to `True`.
     :type validate_input: bool, optional
 
+    :param preview_factor: Overrides the preview factor of the simulation domain settings. Defaults to `None`.
+    :type preview_factor: int, optional
+
+    :param workers: Overrides the number of worker processes of the simulation domain settings. Defaults to `None`.
+    :type workers: int, optional
+
+    :param validation_cache: Store of the validation results of the input raster files by previous runs, so only new or changed files are validated. Defaults to `None`.
+    :type validation_cache: Optional[rubem.cache.ValidationCache], optional
+
     :raises FileNotFoundError: If the specified config file is not found.
     :raises ValueError: If the config file type is not supported.
     :raises json.JSONDecodeError: If the JSON file is not valid.
@@ -39,7 +57,12 @@ class ModelConfiguration:
     """
 
     def __init__(
-        self, config_input: Union[dict, str, bytes, os.PathLike], validate_input: bool = True
+        self,
+        config_input: Union[dict, str, bytes, os.PathLike],
+        validate_input: bool = True,
+        preview_factor: Optional[int] = None,
+        workers: Optional[int] = None,
+        validation_cache: Optional[ValidationCache] = None,
     ):
         self.logger = logging.getLogger(__name__)
         self.problems = []
@@ -73,7 +96,24 @@ class ModelConfiguration:
                     else None
                 ),
             )
-            self.grid = RasterGrid(float(self.__get_setting("GRID", "grid")))
+            self.domain = SimulationDomain(
+                clip_to_samples_catchment=str_to_bool(
+                    self.__get_setting("DOMAIN", "clip_to_samples_catchment", optional=True)
+                ),
+                preview_factor=(
+                    preview_factor
+                    if preview_factor is not None
+                    else int(self.__get_setting("DOMAIN", "preview_factor", optional=True) or 1)
+                ),
+                workers=(
+                    workers
+                    if workers is not None
+                    else int(self.__get_setting("DOMAIN", "workers", optional=True) or 1)
+                ),
+            )
+            self.grid = RasterGrid(
+                float(self.__get_setting("GRID", "grid")) * self.domain.preview_factor
+            )
             self.calibration_parameters = CalibrationParameters(
                 alpha=float(self.__get_setting("CALIBRATION", "alpha")),
                 beta=float(self.__get_setting("CALIBRATION", "b")),
@@ -130,18 +170,32 @@ class ModelConfiguration:
 
             self.raster_series = InputRasterSeries(
                 etp=self.__get_setting("DIRECTORIES", "etp"),
-                etp_filename_prefix=self.__get_setting("FILENAME_PREFIXES", "etp_prefix"),
+                etp_filename_prefix=self.__get_setting(
+                    "FILENAME_PREFIXES", "etp_prefix", optional=True
+                ),
                 precipitation=self.__get_setting("DIRECTORIES", "prec"),
                 precipitation_filename_prefix=self.__get_setting(
-                    "FILENAME_PREFIXES", "prec_prefix"
+                    "FILENAME_PREFIXES", "prec_prefix", optional=True
                 ),
                 ndvi=self.__get_setting("DIRECTORIES", "ndvi"),
-                ndvi_filename_prefix=self.__get_setting("FILENAME_PREFIXES", "ndvi_prefix"),
+                ndvi_filename_prefix=self.__get_setting(
+                    "FILENAME_PREFIXES", "ndvi_prefix", optional=True
+                ),
                 kp=self.__get_setting("DIRECTORIES", "kp"),
-                kp_filename_prefix=self.__get_setting("FILENAME_PREFIXES", "kp_prefix"),
+                kp_filename_prefix=self.__get_setting(
+                    "FILENAME_PREFIXES", "kp_prefix", optional=True
+                ),
                 landuse=self.__get_setting("DIRECTORIES", "landuse"),
-                landuse_filename_prefix=self.__get_setting("FILENAME_PREFIXES", "landuse_prefix"),
+                landuse_filename_prefix=self.__get_setting(
+                    "FILENAME_PREFIXES", "landuse_prefix", optional=True
+                ),
                 validate_input=validate_input,
+                cube=self.__get_setting("DIRECTORIES", "cube", optional=True),
+                simulation_period=self.simulation_period,
+                validation_workers=int(
+                    self.__get_setting("VALIDATION", "workers", optional=True) or 1
+                ),
+                validation_cache=validation_cache,
             )
             self.raster_files = InputRasterFiles(
                 dem=self.__get_setting("RASTERS", "dem"),
@@ -152,25 +206,44 @@ class ModelConfiguration:
                 ldd=self.__get_setting("RASTERS", "ldd", optional=True),
                 sample_locations=self.__get_setting("RASTERS", "samples", optional=True),
                 validate_input=validate_input,
+                validation_cache=validation_cache,
             )
+            landuse_parameters = self.__get_setting("TABLES", "landuse_parameters", optional=True)
+            soil_parameters = self.__get_setting("TABLES", "soil_parameters", optional=True)
             self.lookuptable_files = InputTableFiles(
                 rainy_days=self.__get_setting("TABLES", "rainydays"),
-                a_i=self.__get_setting("TABLES", "a_i"),
-                a_o=self.__get_setting("TABLES", "a_o"),
-                a_s=self.__get_setting("TABLES", "a_s"),
-                a_v=self.__get_setting("TABLES", "a_v"),
-                manning=self.__get_setting("TABLES", "manning"),
-                bulk_density=self.__get_setting("TABLES", "bulk_density"),
-                k_sat=self.__get_setting("TABLES", "k_sat"),
-                t_fcap=self.__get_setting("TABLES", "t_fcap"),
-                t_sat=self.__get_setting("TABLES", "t_sat"),
-                t_wp=self.__get_setting("TABLES", "t_wp"),
-                rootzone_depth=self.__get_setting("TABLES", "rootzone_depth"),
-                kc_min=self.__get_setting("TABLES", "k_c_min"),
-                kc_max=self.__get_setting("TABLES", "k_c_max"),
+                a_i=self.__get_setting("TABLES", "a_i", optional=bool(landuse_parameters)),
+                a_o=self.__get_setting("TABLES", "a_o", optional=bool(landuse_parameters)),
+                a_s=self.__get_setting("TABLES", "a_s", optional=bool(landuse_parameters)),
+                a_v=self.__get_setting("TABLES", "a_v", optional=bool(landuse_parameters)),
+                manning=self.__get_setting("TABLES", "manning", optional=bool(landuse_parameters)),
+                bulk_density=self.__get_setting(
+                    "TABLES", "bulk_density", optional=bool(soil_parameters)
+                ),
+                k_sat=self.__get_setting("TABLES", "k_sat", optional=bool(soil_parameters)),
+                t_fcap=self.__get_setting("TABLES", "t_fcap", optional=bool(soil_parameters)),
+                t_sat=self.__get_setting("TABLES", "t_sat", optional=bool(soil_parameters)),
+                t_wp=self.__get_setting("TABLES", "t_wp", optional=bool(soil_parameters)),
+                rootzone_depth=self.__get_setting(
+                    "TABLES", "rootzone_depth", optional=bool(soil_parameters)
+                ),
+                kc_min=self.__get_setting("TABLES", "k_c_min", optional=bool(landuse_parameters)),
+                kc_max=self.__get_setting("TABLES", "k_c_max", optional=bool(landuse_parameters)),
                 validate_input=validate_input,
+                landuse_parameters=landuse_parameters,
+                soil_parameters=soil_parameters,
             )
             self.output_raster_base = OutputRasterBase(base_raster_path=self.raster_files.dem)
+            self.replay_cache = ReplayCache(
+                groundwater=str_to_bool(
+                    self.__get_setting("REPLAY_CACHE", "groundwater", optional=True)
+                ),
+                routing=self.__get_setting("REPLAY_CACHE", "routing", optional=True),
+            )
+            self.routing = Routing(
+                engine=self.__get_setting("ROUTING", "engine", optional=True) or "pcraster"
+            )
+            self.forcing_transforms = self.__get_forcing_transforms()
         except Exception as e:
             self.logger.error("Failed to load configuration: %s", e)
             raise
@@ -220,6 +293,42 @@ class ModelConfiguration:
                 }
             )
 
+        if self.domain.clip_to_samples_catchment and not self.raster_files.sample_locations:
+            self.problems.append(
+                {
+                    "description": "Simulation domain will not be clipped.",
+                    "reason": "Clipping to the sample locations catchment was enabled but no Sample Locations raster was provided.",
+                    "blocking": False,
+                }
+            )
+
+        if self.replay_cache.routing == "samples" and not self.raster_files.sample_locations:
+            self.problems.append(
+                {
+                    "description": "Accumulated discharge will not be cached.",
+                    "reason": "Routing replay cache at sample locations was enabled but no Sample Locations raster was provided.",
+                    "blocking": False,
+                }
+            )
+
+        if self.domain.is_preview and self.raster_files.ldd:
+            self.problems.append(
+                {
+                    "description": "Local Drain Direction (LDD) raster will not be used.",
+                    "reason": "Preview runs generate the LDD from the resampled DEM.",
+                    "blocking": False,
+                }
+            )
+
+        if self.domain.is_decomposed and self.replay_cache.any_enabled():
+            self.problems.append(
+                {
+                    "description": "Replay cache will not be written.",
+                    "reason": "Runs decomposed across worker processes do not cache replay series.",
+                    "blocking": False,
+                }
+            )
+
         if self.problems:
             print("Configuration problems found:")
             i = 1
@@ -239,6 +348,47 @@ class ModelConfiguration:
             self.logger.error("Error parsing JSON file: %s", e)
             raise
 
+    def __get_forcing_transforms(self) -> dict:
+        unknown_series = set(self.config.get("FORCING_TRANSFORMS", {})) - set(
+            FORCING_TRANSFORM_SERIES
+        )
+        if unknown_series:
+            self.logger.error("Invalid forcing transform series: %s", sorted(unknown_series))
+            raise ValueError(
+                f"Invalid forcing transform series: {', '.join(sorted(unknown_series))}. "
+                f"Supported series are: {', '.join(FORCING_TRANSFORM_SERIES)}"
+            )
+
+        forcing_transforms = {}
+        for series in FORCING_TRANSFORM_SERIES:
+            settings = self.__get_setting("FORCING_TRANSFORMS", series, optional=True)
+            if not settings:
+                continue
+
+            unknown_settings = set(settings) - set(FORCING_TRANSFORM_SETTINGS)
+            if unknown_settings:
+                self.logger.error(
+                    "Invalid %s forcing transform settings: %s", series, sorted(unknown_settings)
+                )
+                raise ValueError(
+                    f"Invalid {series} forcing transform settings: "
+                    f"{', '.join(sorted(unknown_settings))}. "
+                    f"Supported settings are: {', '.join(FORCING_TRANSFORM_SETTINGS)}"
+                )
+
+            forcing_transforms[series] = ForcingTransform(**settings)
+
+        return forcing_transforms
+
+    def __forcing_transforms_str(self) -> str:
+        if not self.forcing_transforms:
+            return "Disabled"
+
+        return "\n".join(
+            series + ":\n" + textwrap.indent(str(transform), "\t")
+            for series, transform in self.forcing_transforms.items()
+        )
+
     def __get_setting(self, section, setting, optional=False):
         try:
             return self.config[section][setting]
@@ -256,6 +406,7 @@ class ModelConfiguration:
         return (
             f"Simulation period: {self.simulation_period}\n"
             f"Grid area: {self.grid}\n"
+            f"Simulation domain: {self.domain}\n"
             f"Raster Series:\n{textwrap.indent(str(self.raster_series), tab)}\n"
             f"Raster files:\n{textwrap.indent(str(self.raster_files), tab)}\n"
             f"Lookuptable files:\n{textwrap.indent(str(self.lookuptable_files), tab)}\n"
@@ -263,6 +414,10 @@ class ModelConfiguration:
             f"Initial soil conditions:\n{textwrap.indent(str(self.initial_soil_conditions), tab)}\n"
             f"Constants:\n{textwrap.indent(str(self.constants), tab)}\n"
             f"Output directory: {self.output_directory}\n"
+            f"Replay cache:\n{textwrap.indent(str(self.replay_cache), tab)}\n"
+            f"Routing:\n{textwrap.indent(str(self.routing), tab)}\n"
+            f"Forcing transforms:\n"
+            f"{textwrap.indent(self.__forcing_transforms_str(), tab)}\n"
             f"Output Raster Series:\n{textwrap.indent(str(self.output_variables), tab)}"
         )
 
@@ -1,3 +1,4 @@
+import copy
 import logging
 import os
 from typing import Union
@@ -13,3 +14,60 @@ class OutputRasterBase:
         self.rows = base_raster.raster.RasterYSize
         self.transformation = base_raster.raster.GetGeoTransform()
         base_raster = None
+
+    def subset(self, row_offset: int, col_offset: int, rows: int, cols: int) -> "OutputRasterBase":
+        """Return the base raster information of a window of this raster.
+
+        :param row_offset: Index of the first row of the window.
+        :type row_offset: int
+
+        :param col_offset: Index of the first column of the window.
+        :type col_offset: int
+
+        :param rows: Number of rows of the window.
+        :type rows: int
+
+        :param cols: Number of columns of the window.
+        :type cols: int
+
+        :return: The base raster information of the window.
+        :rtype: OutputRasterBase
+        """
+        origin_x, pixel_width, rotation_x, origin_y, rotation_y, pixel_height = self.transformation
+        window = copy.copy(self)
+        window.cols = cols
+        window.rows = rows
+        window.transformation = (
+            origin_x + col_offset * pixel_width,
+            pixel_width,
+            rotation_x,
+            origin_y + row_offset * pixel_height,
+            rotation_y,
+            pixel_height,
+        )
+        return window
+
+    def coarsen(self, factor: int) -> "OutputRasterBase":
+        """Return the base raster information of this raster aggregated in blocks of cells.
+
+        Trailing rows and columns that do not fill a whole block are dropped.
+
+        :param factor: Number of cells of this raster along each side of a coarse cell.
+        :type factor: int
+
+        :return: The base raster information of the coarse raster.
+        :rtype: OutputRasterBase
+        """
+        origin_x, pixel_width, rotation_x, origin_y, rotation_y, pixel_height = self.transformation
+        coarse = copy.copy(self)
+        coarse.cols = self.cols // factor
+        coarse.rows = self.rows // factor
+        coarse.transformation = (
+            origin_x,
+            pixel_width * factor,
+            rotation_x,
+            origin_y,
+            rotation_y,
+            pixel_height * factor,
+        )
+        return coarse
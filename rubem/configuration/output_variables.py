@@ -122,6 +122,15 @@ class OutputVariables:
         self.tss = tss
         self.file_formats = output_formats
 
+    def get_variables(self) -> list:
+        """
+        Returns a list of all output variables, enabled or not.
+
+        :return: A list of all output variables.
+        :rtype: list
+        """
+        return [v for k, v in self.__dict__.items() if isinstance(v, dict)]
+
     def get_enabled_raster_series(self) -> list:
         """
         Returns a list of enabled raster series.
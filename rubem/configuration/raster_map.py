@@ -94,7 +94,7 @@ class RasterMap:
             raise ValueError(f"Empty raster file: {file_path}")
 
     def __validate_file_extension(self, file_path):
-        if not str(file_path).endswith((".map", ".tif")) and not bool(
+        if not str(file_path).endswith((".map", ".tif", ".tiff", ".vrt")) and not bool(
             bool(re.search(r"\.[0-9]{3}$", str(os.path.splitext(file_path)[1])))
         ):
             raise ValueError(f"Invalid raster file extension: {file_path}")
@@ -0,0 +1,41 @@
+import logging
+from typing import Optional
+
+REPLAY_ROUTING_MODES = ("grid", "samples")
+
+
+class ReplayCache:
+    """
+    Represents the settings of the model series cached on disk to replay parts of the model.
+
+    :param groundwater: If ``True``, the Recharge (REC), Surface Runoff (SRN) and Lateral Flow (LFW) series are cached, so the baseflow and saturated zone recursion can be replayed with other groundwater parameters (``alpha_gw``, ``bfw_lim``, ``bfw_ini`` and ``s_sat_ini``) without rerunning the model. Defaults to ``False``.
+    :type groundwater: bool, optional
+
+    :param routing: Where the accumulated discharge series is cached, so the routing of the runoff can be replayed with other values of the Flow Direction Factor (``x``): ``"grid"`` for every cell or ``"samples"`` for the average of each sample location. If ``None`` or empty, it is not cached. Defaults to ``None``.
+    :type routing: Optional[str], optional
+
+    :raises ValueError: If ``routing`` is not a supported mode.
+    """
+
+    def __init__(self, groundwater: bool = False, routing: Optional[str] = None) -> None:
+        self.logger = logging.getLogger(__name__)
+
+        if routing and routing not in REPLAY_ROUTING_MODES:
+            self.logger.error("Invalid routing replay cache mode: %s", routing)
+            raise ValueError(
+                f"Invalid routing replay cache mode: {routing}. "
+                f"Supported modes are: {', '.join(REPLAY_ROUTING_MODES)}"
+            )
+
+        self.groundwater = groundwater
+        self.routing = routing or None
+
+    def any_enabled(self) -> bool:
+        """Whether any series is cached."""
+        return self.groundwater or self.routing is not None
+
+    def __str__(self) -> str:
+        return (
+            f"Groundwater: {'Enabled' if self.groundwater else 'Disabled'}\n"
+            f"Routing: {self.routing.capitalize() if self.routing else 'Disabled'}"
+        )
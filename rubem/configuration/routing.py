@@ -0,0 +1,34 @@
+import logging
+
+ROUTING_ENGINES = ("pcraster", "numpy", "batch")
+
+
+class Routing:
+    """
+    Represents the settings of the routing of the runoff over the Local Drain Direction (LDD) network.
+
+    :param engine: The engine that accumulates the discharge over the LDD at each timestep: ``"pcraster"`` traverses the LDD with the ``accuflux`` operation at every timestep and ``"numpy"`` sorts the LDD cells in topological order once, when the model is set up, and accumulates each timestep with a vectorized sweep over that order, and ``"batch"`` defers the routing to the end of the run, accumulating the discharge of every timestep at once over that order and applying the Flow Direction Factor recursion as a vectorized scan. Defaults to ``"pcraster"``.
+    :type engine: str, optional
+
+    :raises ValueError: If ``engine`` is not a supported engine.
+    """
+
+    def __init__(self, engine: str = "pcraster") -> None:
+        self.logger = logging.getLogger(__name__)
+
+        if engine not in ROUTING_ENGINES:
+            self.logger.error("Invalid routing engine: %s", engine)
+            raise ValueError(
+                f"Invalid routing engine: {engine}. "
+                f"Supported engines are: {', '.join(ROUTING_ENGINES)}"
+            )
+
+        self.engine = engine
+
+    @property
+    def is_batch(self) -> bool:
+        """Whether the runoff is routed at the end of the run instead of at each timestep."""
+        return self.engine == "batch"
+
+    def __str__(self) -> str:
+        return f"Engine: {self.engine}"
@@ -0,0 +1,59 @@
+import logging
+
+
+class SimulationDomain:
+    """
+    Represents the settings of the area of the clone that is simulated.
+
+    :param clip_to_samples_catchment: If ``True``, only the cells that drain to any of the sample locations are simulated. The clone is shrunk to the bounding window of their union catchment and the input rasters are read only within that window. Defaults to ``False``.
+    :type clip_to_samples_catchment: bool, optional
+
+    :param preview_factor: If greater than ``1``, the model runs on a coarse grid whose cells aggregate ``preview_factor`` x ``preview_factor`` cells of the clone. Input rasters are resampled while they are read, which is intended for quick preview runs. Defaults to ``1``.
+    :type preview_factor: int, optional
+
+    :param workers: If greater than ``1``, the independent drainage basins of the clone are split into up to ``workers`` partitions, each one simulated in its own process, and their outputs are merged. Defaults to ``1``.
+    :type workers: int, optional
+
+    :raises ValueError: If ``preview_factor`` or ``workers`` is not a positive integer.
+    """
+
+    def __init__(
+        self,
+        clip_to_samples_catchment: bool = False,
+        preview_factor: int = 1,
+        workers: int = 1,
+    ) -> None:
+        self.logger = logging.getLogger(__name__)
+
+        for name, value in (("Preview factor", preview_factor), ("Number of workers", workers)):
+            if not isinstance(value, int) or isinstance(value, bool):
+                self.logger.error("%s must be an integer: %s", name, value)
+                raise ValueError(f"{name} must be an integer: {value}")
+
+            if value < 1:
+                self.logger.error("%s must be positive: %s", name, value)
+                raise ValueError(f"{name} must be positive: {value}")
+
+        self.clip_to_samples_catchment = clip_to_samples_catchment
+        self.preview_factor = preview_factor
+        self.workers = workers
+
+    @property
+    def is_preview(self) -> bool:
+        """Whether the model runs on a coarse preview grid."""
+        return self.preview_factor > 1
+
+    @property
+    def is_decomposed(self) -> bool:
+        """Whether the drainage basins are simulated in several worker processes."""
+        return self.workers > 1
+
+    def __str__(self) -> str:
+        return (
+            "Clip to Sample Locations Catchment: "
+            f"{'Enabled' if self.clip_to_samples_catchment else 'Disabled'}\n"
+            "Preview Factor: "
+            f"{self.preview_factor if self.is_preview else 'Disabled'}\n"
+            "Workers: "
+            f"{self.workers if self.is_decomposed else 'Disabled'}"
+        )
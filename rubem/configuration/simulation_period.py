@@ -61,5 +61,21 @@ class SimulationPeriod:
 
         self.total_steps = self.last_step - self.first_step + 1
 
+    def get_step(self, day: Union[date, datetime]) -> int:
+        """
+        Get the timestep of the month of a date.
+
+        :param day: The date.
+        :type day: Union[date, datetime]
+
+        :return: The timestep whose month contains the date. It may be outside the simulation period.
+        :rtype: int
+        """
+        return (
+            self.first_step
+            + (day.year - self.start_date.year) * 12
+            + (day.month - self.start_date.month)
+        )
+
     def __str__(self) -> str:
         return f"{self.start_date} to {self.end_date}"
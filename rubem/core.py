@@ -1,12 +1,30 @@
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import os
+import tempfile
 import time
 import logging
+from typing import Optional, Union
 
+from dateutil.relativedelta import relativedelta
 import humanize
+import numpy as np
+import pcraster as pcr
 from pcraster.framework import DynamicFramework
 
+from . import __release__
+from ._basin_decomposition import mosaic_partitions, partition_basins
 from ._dynamic_model import RainfallRunoffBalanceEnhancedModel
+from ._sample_locations import SampleLocations
+from .cache import ResultCache, StaticMapCache
+from .configuration.data_ranges_settings import DataRangesSettings
 from .configuration.model_configuration import ModelConfiguration
 from .file._file_convertions import tss2csv
+from .file._file_generators import report_time_series
+from .file._file_readers import RasterGridGeometry, get_missing_value
+from .file._input_cube import INPUT_CUBE_SERIES, InputCube, ingest_raster_series
+from .file._raster_prefetcher import RasterPrefetcher
+from .hooks import StepContext, StepHook
 
 
 class DynamicFrameworkWrapper:
@@ -17,19 +35,68 @@ class DynamicFrameworkWrapper:
     :param model_configuration: The configuration object for the model.
     :type model_configuration: ModelConfiguration
 
+    :param write_outputs: If ``False``, no raster series nor time series files are written. Defaults to ``True``.
+    :type write_outputs: bool, optional
+
+    :param hooks: Hooks run by the model at each timestep. Defaults to ``None``.
+    :type hooks: Optional[list[rubem.hooks.StepHook]], optional
+
+    :param result_cache: Store of the results of previous runs. If the results of an identical run are found, they are restored instead of running the model. Ignored if ``write_outputs`` is ``False`` or there are hooks. Defaults to ``None``.
+    :type result_cache: Optional[rubem.cache.ResultCache], optional
+
+    :param partition: Boolean ``(rows, cols)`` array of the grid cells to be simulated. If ``None``, every cell is simulated. Defaults to ``None``.
+    :type partition: Optional[np.ndarray], optional
+
+    :param static_map_cache: Store of the static maps derived from the inputs by previous runs. Defaults to ``None``.
+    :type static_map_cache: Optional[rubem.cache.StaticMapCache], optional
+
+    :param prefetcher: Reader of the input raster series of the next timesteps in background threads. It is closed when the run ends. Not used by the worker processes of decomposed runs. Defaults to ``None``.
+    :type prefetcher: Optional[rubem.file._raster_prefetcher.RasterPrefetcher], optional
+
+    :param terrain: The ``dem``, ``ldd`` and ``slope`` arrays of the clone, used instead of deriving them again. Defaults to ``None``.
+    :type terrain: Optional[dict], optional
+
     :raises ValueError: If the model configuration is empty.
     """
 
-    def __init__(self, model_configuration: ModelConfiguration) -> None:
+    def __init__(
+        self,
+        model_configuration: ModelConfiguration,
+        write_outputs: bool = True,
+        hooks: Optional[list] = None,
+        result_cache: Optional[ResultCache] = None,
+        partition: Optional[np.ndarray] = None,
+        static_map_cache: Optional[StaticMapCache] = None,
+        prefetcher: Optional[RasterPrefetcher] = None,
+        terrain: Optional[dict] = None,
+    ) -> None:
         self.logger = logging.getLogger(__name__)
         if not model_configuration:
             self.logger.error("Empty model configuration")
             raise ValueError("Empty model configuration")
 
         self.config = model_configuration
+        self.write_outputs = write_outputs
+        # Restoring cached files would skip the hooks and there is nothing to restore without outputs
+        self.result_cache = result_cache if write_outputs and not hooks else None
+        self.static_map_cache = static_map_cache
+        # Hooks must see every cell in a single process, so only file outputs are decomposed
+        self.is_decomposed = (
+            self.config.domain.is_decomposed and write_outputs and not hooks and partition is None
+        )
+        if self.config.domain.is_decomposed and not self.is_decomposed:
+            self.logger.warning("Drainage basins will be simulated in a single process")
 
         self.logger.info("Setting up model...")
-        self.dynamic_model_concept = RainfallRunoffBalanceEnhancedModel(self.config)
+        self.dynamic_model_concept = RainfallRunoffBalanceEnhancedModel(
+            self.config,
+            write_outputs=write_outputs,
+            hooks=hooks,
+            partition=partition,
+            static_map_cache=static_map_cache,
+            prefetcher=prefetcher,
+            terrain=terrain,
+        )
 
         self.logger.info("Setting up dynamic model framework...")
         self.dynamic_model = DynamicFramework(
@@ -48,15 +115,33 @@ class DynamicFrameworkWrapper:
     def run(self) -> None:
         """
         Wrapper of the ``DynamicFramework.run()`` that runs the ``DynamicModelConcept``.
+
+        If there is a result cache with the results of an identical run, they are restored in the
+        output directory instead.
         """
+        fingerprint = None
+        if self.result_cache:
+            fingerprint = self.__get_fingerprint()
+            if self.result_cache.restore(fingerprint, self.config.output_directory.path):
+                self.logger.info("Results of an identical run restored from the result cache")
+                print("Results of an identical run restored from the result cache.")
+                return
+
+            self.result_cache.detach_outputs(self.config.output_directory.path)
+            previous_output_files = self.__list_output_files()
+
         print("Simulation started...")
         t0 = time.time()
         self.logger.info(
             "Started model run for %s cycles...", self.config.simulation_period.total_steps
         )
 
+        basin_totals = None
         try:
-            self.dynamic_model.run()
+            if self.is_decomposed:
+                basin_totals = self.__run_decomposed()
+            else:
+                self.__run_dynamic_model()
             self.logger.info("Simulation finished!")
             print("Simulation finished successfully!")
         except RuntimeError as e:
@@ -67,26 +152,269 @@ class DynamicFrameworkWrapper:
             exec_time = time.time() - t0
             self.logger.info("Elapsed time: %.2fs", exec_time)
             print(f"Elapsed time: {humanize.precisedelta(exec_time, minimum_unit='seconds')}")
-            self.__export_tables_as_csv()
+            if self.write_outputs and not self.is_decomposed:
+                self.__export_tables_as_csv()
+            for store in self.dynamic_model_concept.replay_stores.values():
+                store.flush()
+
+            for hook in self.dynamic_model_concept.hooks:
+                hook.final(self.dynamic_model_concept)
+
+            if self.dynamic_model_concept.prefetcher:
+                self.dynamic_model_concept.prefetcher.close()
+
+            for series_file in self.dynamic_model_concept.series_files.values():
+                series_file.close()
+
+        if self.config.domain.is_preview:
+            self.__report_basin_totals(
+                self.dynamic_model_concept.basin_totals if basin_totals is None else basin_totals
+            )
+
+        if self.result_cache:
+            output_files = self.__list_output_files()
+            self.result_cache.store(
+                fingerprint,
+                self.config.output_directory.path,
+                [f for f, mtime in output_files.items() if previous_output_files.get(f) != mtime],
+            )
 
     @classmethod
-    def load(cls, data):
+    def load(
+        cls,
+        data,
+        result_cache: Optional[ResultCache] = None,
+        static_map_cache: Optional[StaticMapCache] = None,
+        prefetcher: Optional[RasterPrefetcher] = None,
+    ):
         """
         Load the model configuration.
 
         :param data: The model configuration data.
         :type data: Any
 
+        :param result_cache: Store of the results of previous runs. Default is ``None``.
+        :type result_cache: Optional[rubem.cache.ResultCache]
+
+        :param static_map_cache: Store of the static maps derived from the inputs by previous runs. Default is ``None``.
+        :type static_map_cache: Optional[rubem.cache.StaticMapCache]
+
+        :param prefetcher: Reader of the input raster series of the next timesteps in background threads. Default is ``None``.
+        :type prefetcher: Optional[rubem.file._raster_prefetcher.RasterPrefetcher]
+
         :return: The loaded Model object.
         :rtype: ..configuration.model_configuration.ModelConfiguration
 
         :raises ValueError: If the model configuration format is unsupported.
         """
         if isinstance(data, ModelConfiguration):
-            return cls(data)
+            return cls(
+                data,
+                result_cache=result_cache,
+                static_map_cache=static_map_cache,
+                prefetcher=prefetcher,
+            )
         else:
             raise ValueError("Unsupported model configuration format", type(data))
 
+    def __get_fingerprint(self) -> str:
+        """Return the fingerprint of the run for the result cache."""
+        value_ranges = DataRangesSettings()
+        return self.result_cache.fingerprint(
+            settings=self.config.config,
+            value_ranges={"rasters": value_ranges.rasters, "variables": value_ranges.variables},
+            extra={"release": __release__, "preview_factor": self.config.domain.preview_factor},
+        )
+
+    def __list_output_files(self) -> dict:
+        """Return the modification time of each file in the output directory by relative path."""
+        output_path = self.config.output_directory.path
+        return {
+            os.path.relpath(os.path.join(root, name), output_path): os.stat(
+                os.path.join(root, name)
+            ).st_mtime_ns
+            for root, _, files in os.walk(output_path)
+            for name in files
+        }
+
+    def __run_dynamic_model(self) -> None:
+        """Run the model in this process, routing the runoff at the end with the batch engine."""
+        self.dynamic_model.run()
+        if self.config.routing.is_batch:
+            self.dynamic_model_concept.route_discharge_block()
+
+    def __run_decomposed(self) -> Optional[dict]:
+        """Simulate the drainage basins of the clone in several worker processes.
+
+        The basins are split into partitions with balanced numbers of cells, each one simulated
+        in its own process from the terrain of the clone set up here. Each worker writes the
+        series of its window to memory-mapped files in a temporary directory of the output
+        directory, which are then merged and written one timestep at a time as if the whole
+        clone had been simulated in a single run, so the outputs are never held in memory.
+
+        :return: The basin totals of the water balance components, summed over the partitions,
+            ``None`` if there is a single basin, which is simulated in this process.
+        :rtype: Optional[dict]
+        """
+        model = self.dynamic_model_concept
+        missing_value = get_missing_value(pcr.Nominal)
+        basins = model.get_drainage_basins()
+        sample_locations = model.get_sample_locations()
+        if self.config.domain.clip_to_samples_catchment and sample_locations:
+            # Only the basins with sample locations drain to them
+            basins = np.where(
+                np.isin(basins, basins[sample_locations.is_sample]), basins, missing_value
+            )
+
+        partitions = partition_basins(basins, missing_value, self.config.domain.workers)
+        if len(partitions) < 2:
+            self.logger.info("Single drainage basin found, simulating it in a single process")
+            self.is_decomposed = False
+            self.__run_dynamic_model()
+            return None
+
+        self.logger.info(
+            "Simulating %d drainage basins in %d worker processes...",
+            np.unique(basins[basins != missing_value]).size,
+            len(partitions),
+        )
+
+        settings = copy.deepcopy(self.config.config)
+        # Each worker would overwrite the replay series of the others
+        settings.pop("REPLAY_CACHE", None)
+        if self.config.replay_cache.any_enabled():
+            self.logger.warning("Replay cache will not be written by the worker processes")
+
+        value_ranges = DataRangesSettings()
+        enabled = self.config.output_variables.get_enabled_raster_series()
+        enabled += self.config.output_variables.get_enabled_time_series()
+        variables = list(dict.fromkeys(v.get("id") for v in enabled))
+
+        with tempfile.TemporaryDirectory(
+            prefix=".rubem-partitions-", dir=self.config.output_directory.path
+        ) as temp_path:
+            terrain_path = os.path.join(temp_path, "terrain")
+            os.makedirs(terrain_path)
+            for name, values in model.get_terrain().items():
+                np.save(os.path.join(terrain_path, f"{name}.npy"), values)
+
+            with ProcessPoolExecutor(max_workers=len(partitions)) as executor:
+                results = list(
+                    executor.map(
+                        _simulate_partition,
+                        [settings] * len(partitions),
+                        [self.config.domain.preview_factor] * len(partitions),
+                        [{"rasters": value_ranges.rasters, "variables": value_ranges.variables}]
+                        * len(partitions),
+                        [variables] * len(partitions),
+                        partitions,
+                        [os.path.join(temp_path, f"partition{i}") for i in range(len(partitions))],
+                        [terrain_path] * len(partitions),
+                        [self.static_map_cache] * len(partitions),
+                    )
+                )
+
+            partition_rasters = [
+                (
+                    offset,
+                    {
+                        variable: np.load(file_path, mmap_mode="r")
+                        for variable, file_path in raster_files.items()
+                    },
+                )
+                for offset, raster_files, _ in results
+            ]
+
+            window = None
+            extents = [
+                (offset, next(iter(rasters.values())).shape[1:])
+                for offset, rasters in partition_rasters
+                if rasters
+            ]
+            if self.config.domain.clip_to_samples_catchment and sample_locations and extents:
+                row_offset = min(offset[0] for offset, _ in extents)
+                col_offset = min(offset[1] for offset, _ in extents)
+                window = (
+                    row_offset,
+                    col_offset,
+                    max(offset[0] + shape[0] for offset, shape in extents) - row_offset,
+                    max(offset[1] + shape[1] for offset, shape in extents) - col_offset,
+                )
+
+            mosaic_path = os.path.join(temp_path, "mosaic")
+            os.makedirs(mosaic_path)
+            self.__report_decomposed_outputs(
+                mosaic_partitions(basins.shape, partition_rasters, mosaic_path),
+                sample_locations,
+                window,
+            )
+            # The memory-mapped files must be closed before the directory is removed
+            del partition_rasters
+
+        basin_totals = {}
+        for _, _, partition_basin_totals in results:
+            for name, total in (partition_basin_totals or {}).items():
+                basin_totals[name] = basin_totals.get(name, 0.0) + total
+
+        return basin_totals
+
+    def __report_decomposed_outputs(
+        self,
+        rasters: dict,
+        sample_locations: Optional[SampleLocations],
+        window: Optional[tuple] = None,
+    ) -> None:
+        """Write the raster series and time series tables merged from the partitions of a run.
+
+        :param rasters: The ``(steps, rows, cols)`` series of each output variable of the clone,
+            with ``NaN`` at missing cells, indexed by the variable identifier.
+        :type rasters: dict
+
+        :param sample_locations: The sample locations of the clone.
+        :type sample_locations: Optional[SampleLocations]
+
+        :param window: The ``(row_offset, col_offset, rows, cols)`` of the clone covered by the
+            raster series, if the simulation domain was clipped. Default is ``None``.
+        :type window: Optional[tuple]
+        """
+        if sample_locations and self.config.output_variables.tss:
+            self.logger.info("Exporting tables as CSV...")
+            for var in self.config.output_variables.get_enabled_time_series():
+                report_time_series(
+                    values=np.stack([sample_locations.average(v) for v in rasters[var.get("id")]]),
+                    name=var.get("table_filename_prefix"),
+                    outpath=self.config.output_directory.path,
+                    first_step=self.config.simulation_period.first_step,
+                    cols_names=[str(n) for n in sample_locations.ids],
+                )
+        else:
+            self.logger.warning(
+                "Generation of time series was not configured to export time series files."
+            )
+
+        output_raster_base = self.dynamic_model_concept.output_raster_base
+        if window:
+            row_offset, col_offset, rows, cols = window
+            RasterGridGeometry.from_clone().subset(*window).set_clone()
+            output_raster_base = output_raster_base.subset(*window)
+            rasters = {
+                variable: series[:, row_offset : row_offset + rows, col_offset : col_offset + cols]
+                for variable, series in rasters.items()
+            }
+
+        self.logger.info("Exporting variables merged from the worker processes to files")
+        for var in self.config.output_variables.get_enabled_raster_series():
+            self.dynamic_model_concept.report_raster_series(
+                var, rasters[var.get("id")], output_raster_base
+            )
+
+    def __report_basin_totals(self, basin_totals: dict) -> None:
+        """Print the water balance components accumulated over the simulation domain."""
+        print(f"Basin totals (preview factor {self.config.domain.preview_factor}):")
+        for name, total in basin_totals.items():
+            self.logger.info("Basin total of %s: %.6e m3", name, total)
+            print(f"\t{name}: {total:.6e} [m³]")
+
     def __export_tables_as_csv(self) -> None:
         """Converts PCRaster TSS files to Comma-Separated Values (CSV) files."""
         if self.config.raster_files.sample_locations and self.config.output_variables.tss:
@@ -97,3 +425,351 @@ class DynamicFrameworkWrapper:
             self.logger.warning(
                 "Generation of time series was not configured to export time series files."
             )
+
+
+class SimulationResults:
+    """Results of a model run held in memory.
+
+    :param dates: The date of each timestep.
+    :type dates: list
+
+    :param rasters: The ``(steps, rows, cols)`` series of each output variable, with ``NaN`` at
+        missing cells, indexed by the variable identifier (e.g. ``arn``).
+    :type rasters: dict
+
+    :param samples: The ``(steps, len(sample_ids))`` series of each output variable averaged at
+        each sample location, indexed by the variable identifier.
+    :type samples: dict
+
+    :param sample_ids: The identifiers of the sample locations, ``None`` if there are none.
+    :type sample_ids: Optional[np.ndarray]
+
+    :param elapsed_time: The duration of the model run [s].
+    :type elapsed_time: float
+
+    :param offset: The ``(row, col)`` of the clone where the rasters start, which is not the
+        origin if the simulation domain was clipped. Default is ``(0, 0)``.
+    :type offset: tuple, optional
+
+    :param basin_totals: The water balance components accumulated over the simulation domain
+        [m³] in preview runs, indexed by their name. Default is ``None``.
+    :type basin_totals: Optional[dict]
+    """
+
+    def __init__(
+        self,
+        dates: list,
+        rasters: dict,
+        samples: dict,
+        sample_ids: Optional[np.ndarray],
+        elapsed_time: float,
+        offset: tuple = (0, 0),
+        basin_totals: Optional[dict] = None,
+    ) -> None:
+        self.dates = dates
+        self.rasters = rasters
+        self.samples = samples
+        self.sample_ids = sample_ids
+        self.elapsed_time = elapsed_time
+        self.offset = offset
+        self.basin_totals = basin_totals
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.dates)} timesteps, "
+            f"rasters: {', '.join(self.rasters) or 'none'}, "
+            f"samples: {', '.join(self.samples) or 'none'}"
+        )
+
+
+class _ResultsCollector(StepHook):
+    """Collect the output variables of each timestep of a model run into arrays.
+
+    If ``rasters_path`` is set, the raster series are memory-mapped NumPy array files (``.npy``)
+    of that directory, named after their variable, instead of arrays held in memory.
+    """
+
+    def __init__(
+        self,
+        variables: list,
+        steps: int,
+        first_step: int,
+        collect_rasters: bool,
+        rasters_path: Optional[str] = None,
+    ):
+        self.variables = variables
+        self.steps = steps
+        self.first_step = first_step
+        self.collect_rasters = collect_rasters
+        self.rasters_path = rasters_path
+        self.sample_locations = None
+        self.offset = (0, 0)
+        self.basin_totals = None
+        self.rasters = {}
+        self.samples = {}
+
+    def initial(self, model: RainfallRunoffBalanceEnhancedModel) -> None:
+        self.sample_locations = model.sample_index
+        self.offset = model.domain_offset
+
+    def dynamic(self, context: StepContext) -> None:
+        step_index = context.step - self.first_step
+        for variable in self.variables:
+            if variable not in context.fields:
+                # Routed at the end of the run by the batch routing engine
+                continue
+
+            values = context.array(variable)
+
+            if self.collect_rasters:
+                if variable not in self.rasters:
+                    self.rasters[variable] = self.__allocate(variable, values.shape)
+
+                self.rasters[variable][step_index] = values
+
+            if self.sample_locations:
+                if variable not in self.samples:
+                    self.samples[variable] = np.full(
+                        (self.steps, len(self.sample_locations)), np.nan
+                    )
+
+                self.samples[variable][step_index] = context.sample(variable)
+
+    def final(self, model: RainfallRunoffBalanceEnhancedModel) -> None:
+        if model.basin_totals:
+            self.basin_totals = dict(model.basin_totals)
+
+        runoff_id = model.config.output_variables.arn.get("id")
+        if model.runoff_block is not None and runoff_id in self.variables:
+            if self.collect_rasters and self.rasters_path:
+                self.rasters[runoff_id] = self.__allocate(runoff_id, model.runoff_block.shape[1:])
+                self.rasters[runoff_id][:] = model.runoff_block
+            elif self.collect_rasters:
+                self.rasters[runoff_id] = model.runoff_block
+
+            if self.sample_locations:
+                self.samples[runoff_id] = np.stack(
+                    [self.sample_locations.average(values) for values in model.runoff_block]
+                )
+
+    def __allocate(self, variable: str, shape: tuple) -> np.ndarray:
+        if self.rasters_path is None:
+            return np.full((self.steps, *shape), np.nan, dtype=np.float32)
+
+        os.makedirs(self.rasters_path, exist_ok=True)
+        series = np.lib.format.open_memmap(
+            os.path.join(self.rasters_path, f"{variable}.npy"),
+            mode="w+",
+            dtype=np.float32,
+            shape=(self.steps, *shape),
+        )
+        for values in series:
+            values.fill(np.nan)
+
+        return series
+
+
+def simulate(
+    config: Union[ModelConfiguration, dict],
+    overrides: Optional[dict] = None,
+    variables: Optional[list] = None,
+    collect_rasters: bool = True,
+    write_outputs: bool = False,
+    validate_input: bool = False,
+    hooks: Optional[list] = None,
+    static_map_cache: Optional[StaticMapCache] = None,
+) -> SimulationResults:
+    """Run the model and return its output variables as arrays.
+
+    Intended for calibration frameworks and other programs that run the model many times: the
+    results are returned in memory, without writing and parsing output files.
+
+    :param config: The model configuration, or a dictionary with the contents of a
+        configuration file.
+    :type config: Union[ModelConfiguration, dict]
+
+    :param overrides: Settings replacing the ones of ``config``, indexed by section and
+        setting, e.g. ``{"CALIBRATION": {"alpha_gw": 0.8}}``. Default is ``None``.
+    :type overrides: Optional[dict]
+
+    :param variables: Identifiers of the output variables to be returned (e.g. ``["arn"]``).
+        If ``None``, the variables enabled as raster series or time series in ``config``.
+        Default is ``None``.
+    :type variables: Optional[list]
+
+    :param collect_rasters: If ``False``, only the series at the sample locations are
+        returned. Default is ``True``.
+    :type collect_rasters: bool, optional
+
+    :param write_outputs: If ``True``, the output files enabled in ``config`` are also written.
+        Default is ``False``.
+    :type write_outputs: bool, optional
+
+    :param validate_input: Whether to validate the input files when a new configuration is
+        loaded from ``config`` and ``overrides``. Default is ``False``.
+    :type validate_input: bool, optional
+
+    :param hooks: Additional hooks run by the model at each timestep. Default is ``None``.
+    :type hooks: Optional[list[rubem.hooks.StepHook]]
+
+    :param static_map_cache: Store of the static maps derived from the inputs, shared by the
+        runs of an ensemble so that they are derived only once. Default is ``None``.
+    :type static_map_cache: Optional[rubem.cache.StaticMapCache]
+
+    :return: The results of the model run.
+    :rtype: SimulationResults
+
+    :raises ValueError: If a variable is not an output variable of the model.
+    """
+    if isinstance(config, ModelConfiguration) and not overrides:
+        model_config = config
+    else:
+        if isinstance(config, ModelConfiguration):
+            settings = copy.deepcopy(config.config)
+            preview_factor = config.domain.preview_factor
+        else:
+            settings = copy.deepcopy(config)
+            preview_factor = None
+
+        for section, section_overrides in (overrides or {}).items():
+            settings.setdefault(section, {}).update(section_overrides)
+
+        model_config = ModelConfiguration(settings, validate_input, preview_factor=preview_factor)
+
+    output_ids = [v.get("id") for v in model_config.output_variables.get_variables()]
+    if variables is None:
+        enabled = model_config.output_variables.get_enabled_raster_series()
+        enabled += model_config.output_variables.get_enabled_time_series()
+        variables = [v for v in output_ids if v in {e.get("id") for e in enabled}]
+
+    unknown = [v for v in variables if v not in output_ids]
+    if unknown:
+        raise ValueError(f"Unknown output variables: {', '.join(unknown)}")
+
+    return _collect_results(
+        model_config,
+        variables,
+        collect_rasters=collect_rasters,
+        write_outputs=write_outputs,
+        hooks=hooks,
+        static_map_cache=static_map_cache,
+    )
+
+
+def ingest(model_config: ModelConfiguration) -> InputCube:
+    """Pack the input raster series of a configuration into its input cube.
+
+    The maps of every timestep of the simulation period are read on the clone grid and written
+    to the directory set in ``DIRECTORIES.cube``, replacing any previous cube. Later runs with
+    the same series, period and clone read each map as a slice of the cube instead of opening
+    the raster files.
+
+    :param model_config: The model configuration.
+    :type model_config: ModelConfiguration
+
+    :return: The written input cube.
+    :rtype: rubem.file._input_cube.InputCube
+
+    :raises ValueError: If the configuration has no input cube directory.
+    """
+    if not model_config.raster_series.cube:
+        raise ValueError("No input cube directory set in the configuration (DIRECTORIES.cube)")
+
+    pcr.setclone(str(model_config.raster_files.clone))
+    return ingest_raster_series(
+        model_config.raster_series.cube,
+        {name: getattr(model_config.raster_series, name) for name in INPUT_CUBE_SERIES},
+        model_config.simulation_period.first_step,
+        model_config.simulation_period.last_step,
+        RasterGridGeometry.from_clone(),
+        model_config.simulation_period,
+    )
+
+
+def _collect_results(
+    model_config: ModelConfiguration,
+    variables: list,
+    collect_rasters: bool = True,
+    write_outputs: bool = False,
+    hooks: Optional[list] = None,
+    partition: Optional[np.ndarray] = None,
+    static_map_cache: Optional[StaticMapCache] = None,
+    rasters_path: Optional[str] = None,
+    terrain: Optional[dict] = None,
+) -> SimulationResults:
+    """Run the model collecting the output variables of each timestep into arrays."""
+    collector = _ResultsCollector(
+        variables=list(variables),
+        steps=model_config.simulation_period.total_steps,
+        first_step=model_config.simulation_period.first_step,
+        collect_rasters=collect_rasters,
+        rasters_path=rasters_path,
+    )
+    model = DynamicFrameworkWrapper(
+        model_config,
+        write_outputs=write_outputs,
+        hooks=[collector, *(hooks or [])],
+        partition=partition,
+        static_map_cache=static_map_cache,
+        terrain=terrain,
+    )
+
+    t0 = time.time()
+    model.run()
+    elapsed_time = time.time() - t0
+
+    return SimulationResults(
+        dates=[
+            model_config.simulation_period.start_date + relativedelta(months=i)
+            for i in range(model_config.simulation_period.total_steps)
+        ],
+        rasters=collector.rasters,
+        samples=collector.samples,
+        sample_ids=collector.sample_locations.ids if collector.sample_locations else None,
+        elapsed_time=elapsed_time,
+        offset=collector.offset,
+        basin_totals=collector.basin_totals,
+    )
+
+
+def _simulate_partition(
+    settings: dict,
+    preview_factor: int,
+    value_ranges: dict,
+    variables: list,
+    partition: np.ndarray,
+    rasters_path: str,
+    terrain_path: str,
+    static_map_cache: Optional[StaticMapCache] = None,
+) -> tuple:
+    """Simulate a partition of the grid in a worker process of a decomposed run.
+
+    The terrain of the clone is loaded from the ``.npy`` files of ``terrain_path`` and the raster
+    series of the partition window are written to ``.npy`` files of ``rasters_path``.
+
+    :return: The ``(row, col)`` offset of the window of the partition, the file of the raster
+        series of each variable and the basin totals of the partition.
+    :rtype: tuple
+    """
+    _ = DataRangesSettings(value_ranges)
+    model_config = ModelConfiguration(
+        settings, validate_input=False, preview_factor=preview_factor, workers=1
+    )
+    terrain = {
+        name: np.load(os.path.join(terrain_path, f"{name}.npy"), mmap_mode="r")
+        for name in ("dem", "ldd", "slope")
+    }
+    results = _collect_results(
+        model_config,
+        variables,
+        partition=partition,
+        static_map_cache=static_map_cache,
+        rasters_path=rasters_path,
+        terrain=terrain,
+    )
+    raster_files = {}
+    for variable, series in results.rasters.items():
+        series.flush()
+        raster_files[variable] = series.filename
+
+    return results.offset, raster_files, results.basin_totals
@@ -19,3 +19,5 @@
 # Contact: rubem.hydrological@labsid.eng.br
 
 """Common functionality used by Rainfall rUnoff Balance Enhanced Model."""
+
+from ._series_manifest import *
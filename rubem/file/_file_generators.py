@@ -1,7 +1,9 @@
+import csv
 import logging
 import os
 from typing import Optional, Union
 
+import numpy as np
 from osgeo import gdal
 from pcraster._pcraster import Field
 from pcraster.framework import pcr2numpy
@@ -57,6 +59,45 @@ def report(
         )
 
 
+def report_time_series(
+    values: np.ndarray,
+    name: str,
+    outpath: Union[str, bytes, os.PathLike],
+    first_step: int,
+    cols_names: list,
+    missing_value: float = 1e31,
+):
+    """Store a time series table in the Comma-Separated Values (CSV) layout of the converted PCRaster Time Series (*.tss) files.
+
+    :param values: The ``(steps, len(cols_names))`` values of the table, with ``NaN`` at missing values.
+    :type values: np.ndarray
+
+    :param name: Name used as filename. File extension will be added automatically.
+    :type name: str
+
+    :param outpath: Path to store the output
+    :type outpath: Union[str, bytes, os.PathLike]
+
+    :param first_step: Timestep of the first row of the table.
+    :type first_step: int
+
+    :param cols_names: List of strings of aliases for the column names.
+    :type cols_names: list[str]
+
+    :param missing_value: Value written in place of missing values. Default is ``1e31``.
+    :type missing_value: float, optional
+    """
+    out_csv = os.path.abspath(os.path.join(str(outpath), f"{name}.csv"))
+    values = np.where(np.isnan(values), missing_value, values)
+
+    with open(file=out_csv, mode="w", encoding="utf8", newline="") as csvfile:
+        writer = csv.writer(csvfile, delimiter=";")
+        writer.writerow(["0", *cols_names])
+        writer.writerows(
+            [str(first_step + i), *[f"{v:g}" for v in row]] for i, row in enumerate(values)
+        )
+
+
 def __report(
     variable: Field,
     outpath: Union[str, bytes, os.PathLike],
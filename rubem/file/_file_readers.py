@@ -0,0 +1,557 @@
+from collections import OrderedDict
+import logging
+import os
+import re
+import threading
+from typing import Optional, Union
+
+import numpy as np
+from osgeo import gdal
+import pcraster as pcr
+from pcraster._pcraster import Field
+
+from ._frame_cache import cached_read
+
+logger = logging.getLogger(__name__)
+
+_open_datasets = threading.local()
+
+PCRASTER_VALUE_SCALES = {
+    "VS_BOOLEAN": pcr.Boolean,
+    "VS_NOMINAL": pcr.Nominal,
+    "VS_ORDINAL": pcr.Ordinal,
+    "VS_SCALAR": pcr.Scalar,
+    "VS_DIRECTION": pcr.Directional,
+    "VS_LDD": pcr.Ldd,
+}
+
+PCRASTER_MAP_FILE_NAME_PATTERN = re.compile(r"\.(map|[0-9]{3})$", re.IGNORECASE)
+GDAL_SERIES_FILE_EXTENSIONS = (".tif", ".vrt")
+
+RASTER_DATASET_CACHE_SIZE = 16
+
+RASTER_SERIES_FILENAME_TOTAL_CHARS = 11
+RASTER_SERIES_FILENAME_EXTENSION_POSITION = 8
+
+
+class RasterGridGeometry:
+    """Georeferencing of a north-up raster grid.
+
+    :param rows: Number of rows of the grid.
+    :type rows: int
+
+    :param cols: Number of columns of the grid.
+    :type cols: int
+
+    :param cell_size: Length of the side of a grid cell.
+    :type cell_size: float
+
+    :param west: X coordinate of the western edge of the grid.
+    :type west: float
+
+    :param north: Y coordinate of the northern edge of the grid.
+    :type north: float
+
+    :raises ValueError: If the grid has no cells or an invalid cell size.
+    """
+
+    def __init__(self, rows: int, cols: int, cell_size: float, west: float, north: float) -> None:
+        if rows <= 0 or cols <= 0:
+            raise ValueError(f"Invalid grid dimensions: {rows}x{cols}")
+
+        if cell_size <= 0:
+            raise ValueError(f"Invalid grid cell size: {cell_size}")
+
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self.cell_size = float(cell_size)
+        self.west = float(west)
+        self.north = float(north)
+
+    @classmethod
+    def from_clone(cls) -> "RasterGridGeometry":
+        """Return the geometry of the current PCRaster clone.
+
+        :return: The geometry of the current clone.
+        :rtype: RasterGridGeometry
+        """
+        clone = pcr.clone()
+        return cls(clone.nrRows(), clone.nrCols(), clone.cellSize(), clone.west(), clone.north())
+
+    def set_clone(self) -> None:
+        """Set this geometry as the current PCRaster clone."""
+        pcr.setclone(self.rows, self.cols, self.cell_size, self.west, self.north)
+
+    def subset(
+        self, row_offset: int, col_offset: int, rows: int, cols: int
+    ) -> "RasterGridGeometry":
+        """Return the geometry of a window of this grid.
+
+        :param row_offset: Index of the first row of the window.
+        :type row_offset: int
+
+        :param col_offset: Index of the first column of the window.
+        :type col_offset: int
+
+        :param rows: Number of rows of the window.
+        :type rows: int
+
+        :param cols: Number of columns of the window.
+        :type cols: int
+
+        :return: The geometry of the window.
+        :rtype: RasterGridGeometry
+
+        :raises ValueError: If the window is not contained in the grid.
+        """
+        if (
+            row_offset < 0
+            or col_offset < 0
+            or row_offset + rows > self.rows
+            or col_offset + cols > self.cols
+        ):
+            raise ValueError(
+                f"Window ({row_offset}, {col_offset}, {rows}, {cols}) "
+                f"is outside the {self.rows}x{self.cols} grid"
+            )
+
+        return RasterGridGeometry(
+            rows=rows,
+            cols=cols,
+            cell_size=self.cell_size,
+            west=self.west + col_offset * self.cell_size,
+            north=self.north - row_offset * self.cell_size,
+        )
+
+    def coarsen(self, factor: int) -> "RasterGridGeometry":
+        """Return the geometry of this grid aggregated in blocks of ``factor`` x ``factor`` cells.
+
+        Trailing rows and columns that do not fill a whole block are dropped.
+
+        :param factor: Number of cells of this grid along each side of a coarse cell.
+        :type factor: int
+
+        :return: The coarse grid geometry.
+        :rtype: RasterGridGeometry
+
+        :raises ValueError: If the factor is not positive or larger than the grid.
+        """
+        if factor < 1:
+            raise ValueError(f"Invalid coarsening factor: {factor}")
+
+        return RasterGridGeometry(
+            rows=self.rows // factor,
+            cols=self.cols // factor,
+            cell_size=self.cell_size * factor,
+            west=self.west,
+            north=self.north,
+        )
+
+    def get_geotransform(self) -> tuple:
+        """Return the GDAL affine geotransform of the grid.
+
+        :return: The GDAL geotransform ``(west, cell_size, 0, north, 0, -cell_size)``.
+        :rtype: tuple
+        """
+        return (self.west, self.cell_size, 0.0, self.north, 0.0, -self.cell_size)
+
+    def get_window_in(self, geotransform: tuple, raster_cols: int, raster_rows: int) -> tuple:
+        """Return the pixel window covered by this grid in a raster.
+
+        The grid cell size must be a whole multiple of the raster cell size. When it is larger,
+        the window spans more pixels than the grid has cells.
+
+        :param geotransform: GDAL geotransform of the raster.
+        :type geotransform: tuple
+
+        :param raster_cols: Number of columns of the raster.
+        :type raster_cols: int
+
+        :param raster_rows: Number of rows of the raster.
+        :type raster_rows: int
+
+        :return: The window as ``(col_offset, row_offset, cols, rows)`` in raster pixels.
+        :rtype: tuple
+
+        :raises ValueError: If the raster is rotated, has a cell size that does not divide the
+            grid cell size, is not aligned to the grid or does not cover the grid.
+        """
+        origin_x, pixel_width, rotation_x, origin_y, rotation_y, pixel_height = geotransform
+        if rotation_x or rotation_y:
+            raise ValueError("Rotated rasters are not supported")
+
+        if not np.isclose(pixel_width, -pixel_height):
+            raise ValueError(f"Raster cells are not square ({pixel_width}, {-pixel_height})")
+
+        factor = self.cell_size / pixel_width
+        if factor < 1 - 1e-9 or not np.isclose(factor, round(factor)):
+            raise ValueError(
+                f"Raster cell size ({pixel_width}) does not divide "
+                f"the grid cell size ({self.cell_size})"
+            )
+
+        factor = int(round(factor))
+        col_offset = (self.west - origin_x) / pixel_width
+        row_offset = (origin_y - self.north) / pixel_width
+        if not np.isclose(col_offset, round(col_offset)) or not np.isclose(
+            row_offset, round(row_offset)
+        ):
+            raise ValueError("Raster is not aligned to the grid")
+
+        col_offset = int(round(col_offset))
+        row_offset = int(round(row_offset))
+        cols = self.cols * factor
+        rows = self.rows * factor
+        if (
+            col_offset < 0
+            or row_offset < 0
+            or col_offset + cols > raster_cols
+            or row_offset + rows > raster_rows
+        ):
+            raise ValueError("Raster does not cover the grid")
+
+        return col_offset, row_offset, cols, rows
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RasterGridGeometry):
+            return NotImplemented
+
+        return (
+            self.rows == other.rows
+            and self.cols == other.cols
+            and np.isclose(self.cell_size, other.cell_size)
+            and np.isclose(self.west, other.west)
+            and np.isclose(self.north, other.north)
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.rows}x{self.cols} cells of {self.cell_size} "
+            f"from (west={self.west}, north={self.north})"
+        )
+
+
+def generate_raster_series_file_name(
+    files_partial_path: Union[str, bytes, os.PathLike],
+    timestep: int,
+    extension: Optional[str] = None,
+) -> str:
+    """Return the file name of a raster series map for a given timestep.
+
+    Follows the PCRaster map-stack convention (e.g. ``prec0000.001``), the same used by
+    ``DynamicModel.readmap``.
+
+    :param files_partial_path: The path where the series is located and prefix combined.
+    :type files_partial_path: Union[str, bytes, os.PathLike]
+
+    :param timestep: The timestep of the map.
+    :type timestep: int
+
+    :param extension: If given (e.g. ``".tif"``), the name of a GeoTIFF series file, without the
+        dot of the map-stack name and with this extension (e.g. ``prec0000001.tif``). Default is
+        ``None``.
+    :type extension: Optional[str]
+
+    :return: The path of the map of the series for the timestep.
+    :rtype: str
+
+    :raises ValueError: If the timestep is negative or does not fit the file name.
+    """
+    if timestep < 0:
+        raise ValueError(f"Invalid timestep: {timestep}")
+
+    head, prefix = os.path.split(str(files_partial_path))
+    number = str(timestep)
+    num_zeros = RASTER_SERIES_FILENAME_TOTAL_CHARS - len(prefix) - len(number)
+    if num_zeros < 0:
+        raise ValueError(f"Timestep {timestep} does not fit the '{prefix}' series file names")
+
+    name = f"{prefix}{'0' * num_zeros}{number}"
+    if extension:
+        return os.path.join(head, f"{name}{extension}")
+
+    name = (
+        f"{name[:RASTER_SERIES_FILENAME_EXTENSION_POSITION]}."
+        f"{name[RASTER_SERIES_FILENAME_EXTENSION_POSITION:]}"
+    )
+    return os.path.join(head, name)
+
+
+def is_pcraster_map(file_path: Union[str, bytes, os.PathLike]) -> bool:
+    """Check whether a raster file is a PCRaster map, by its extension.
+
+    :param file_path: The path of the raster file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :return: ``True`` for ``.map`` files and map-stack files (e.g. ``prec0000.001``).
+    :rtype: bool
+    """
+    return PCRASTER_MAP_FILE_NAME_PATTERN.search(str(file_path)) is not None
+
+
+def get_missing_value(data_type) -> Union[int, float]:
+    """Return the value used to represent missing values in arrays of a PCRaster data type.
+
+    :param data_type: The PCRaster data type (e.g. ``pcraster.Scalar``).
+
+    :return: The missing value for arrays of the data type.
+    :rtype: Union[int, float]
+    """
+    if data_type in (pcr.Boolean, pcr.Ldd):
+        return 255
+
+    if data_type in (pcr.Nominal, pcr.Ordinal):
+        return np.iinfo(np.int32).min
+
+    return -9999.0
+
+
+def field_to_array(field: Field, data_type) -> np.ndarray:
+    """Convert a PCRaster field to an array using the missing value of its data type.
+
+    :param field: The field to be converted.
+    :type field: Field
+
+    :param data_type: The PCRaster data type of the field (e.g. ``pcraster.Scalar``).
+
+    :return: The field values.
+    :rtype: np.ndarray
+    """
+    return pcr.pcr2numpy(field, get_missing_value(data_type))
+
+
+def array_to_field(array: np.ndarray, data_type) -> Field:
+    """Convert an array with the missing value of a data type to a field on the current clone.
+
+    :param array: The values to be converted.
+    :type array: np.ndarray
+
+    :param data_type: The PCRaster data type of the field (e.g. ``pcraster.Scalar``).
+
+    :return: The field with the array values.
+    :rtype: Field
+    """
+    if data_type in (pcr.Scalar, pcr.Directional):
+        array = np.asarray(array, dtype=np.float32)
+    else:
+        array = np.asarray(array, dtype=np.int32)
+
+    return pcr.numpy2pcr(data_type, array, get_missing_value(data_type))
+
+
+def read_raster(
+    file_path: Union[str, bytes, os.PathLike],
+    geometry: RasterGridGeometry,
+    data_type=None,
+) -> Field:
+    """Read the window of a raster file covered by a grid using GDAL.
+
+    Only the pixels inside the grid window are read from the file, so the grid may be a
+    subset of the raster extent. If the grid is coarser than the raster, the pixels are
+    aggregated while reading (average for scalar data, mode for classified data), using the
+    raster overviews when available.
+
+    :param file_path: The path of the raster file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param geometry: The grid to be read. Must be aligned to the raster.
+    :type geometry: RasterGridGeometry
+
+    :param data_type: The PCRaster data type of the result. If ``None``, the value scale of the
+        raster (PCRaster maps) or its data type is used. Default is ``None``.
+
+    :return: The raster values on the grid. The grid must be the current clone.
+    :rtype: Field
+
+    :raises RuntimeError: If the raster cannot be read.
+    :raises ValueError: If the raster does not match the grid.
+    """
+    array, data_type = read_raster_array(file_path, geometry, data_type)
+    return array_to_field(array, data_type)
+
+
+def read_raster_array(
+    file_path: Union[str, bytes, os.PathLike],
+    geometry: RasterGridGeometry,
+    data_type=None,
+) -> tuple:
+    """Read the window of a raster file covered by a grid using GDAL into an array.
+
+    Same as :func:`read_raster`, but does not need the grid to be the current clone, so it can
+    be called from any thread.
+
+    :param file_path: The path of the raster file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param geometry: The grid to be read. Must be aligned to the raster.
+    :type geometry: RasterGridGeometry
+
+    :param data_type: The PCRaster data type of the result. If ``None``, the value scale of the
+        raster (PCRaster maps) or its data type is used. Default is ``None``.
+
+    :return: The raster values on the grid, with the missing value of the data type at no data
+        cells, and the data type.
+    :rtype: tuple
+
+    :raises RuntimeError: If the raster cannot be read.
+    :raises ValueError: If the raster does not match the grid.
+    """
+    return cached_read(
+        file_path,
+        1,
+        geometry,
+        data_type,
+        lambda: read_dataset_band(open_raster_dataset(file_path), 1, geometry, data_type),
+    )
+
+
+def open_raster_dataset(file_path: Union[str, bytes, os.PathLike]) -> gdal.Dataset:
+    """Open a raster file for reading, reusing the datasets recently opened by the thread.
+
+    Keeping the datasets open lets the reads of windows of the same large raster (e.g. a
+    regional mosaic or VRT shared by several catchments) reuse its parsed header and the blocks
+    already decoded by GDAL. A dataset is opened again if its file was modified. GDAL datasets
+    must not be shared between threads, so each thread keeps its own datasets.
+
+    :param file_path: The path of the raster file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :return: The open dataset.
+    :rtype: gdal.Dataset
+
+    :raises RuntimeError: If the raster cannot be opened.
+    """
+    gdal.UseExceptions()
+
+    file_path = os.path.abspath(str(file_path))
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        raise RuntimeError(f"{file_path}: No such file or directory") from e
+
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+    datasets = getattr(_open_datasets, "datasets", None)
+    if datasets is None:
+        datasets = _open_datasets.datasets = OrderedDict()
+
+    dataset = datasets.get(key)
+    if dataset is None:
+        dataset = gdal.OpenEx(file_path, gdal.OF_RASTER | gdal.OF_READONLY)
+        for cached_key in [k for k in datasets if k[0] == file_path]:
+            del datasets[cached_key]
+
+        datasets[key] = dataset
+        while len(datasets) > RASTER_DATASET_CACHE_SIZE:
+            datasets.popitem(last=False)
+    else:
+        datasets.move_to_end(key)
+
+    return dataset
+
+
+def raster_matches_grid(
+    file_path: Union[str, bytes, os.PathLike], geometry: RasterGridGeometry
+) -> bool:
+    """Check whether a raster file has exactly the cells of a grid.
+
+    :param file_path: The path of the raster file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param geometry: The grid.
+    :type geometry: RasterGridGeometry
+
+    :return: ``True`` if the raster has the dimensions and georeferencing of the grid.
+    :rtype: bool
+
+    :raises RuntimeError: If the raster cannot be opened.
+    """
+    dataset = open_raster_dataset(file_path)
+    return (
+        dataset.RasterXSize == geometry.cols
+        and dataset.RasterYSize == geometry.rows
+        and np.allclose(dataset.GetGeoTransform(), geometry.get_geotransform())
+    )
+
+
+def read_dataset_band(
+    dataset: gdal.Dataset,
+    band_number: int,
+    geometry: RasterGridGeometry,
+    data_type=None,
+) -> tuple:
+    """Read the window of a band of an open GDAL dataset covered by a grid into an array.
+
+    See :func:`read_raster_array`.
+
+    :param dataset: The open raster dataset.
+    :type dataset: gdal.Dataset
+
+    :param band_number: The number of the band, starting at ``1``.
+    :type band_number: int
+
+    :param geometry: The grid to be read. Must be aligned to the raster.
+    :type geometry: RasterGridGeometry
+
+    :param data_type: The PCRaster data type of the result. If ``None``, the value scale of the
+        raster (PCRaster maps) or its data type is used. Default is ``None``.
+
+    :return: The raster values on the grid, with the missing value of the data type at no data
+        cells, and the data type.
+    :rtype: tuple
+
+    :raises RuntimeError: If the band cannot be read.
+    :raises ValueError: If the raster does not match the grid.
+    """
+    band = dataset.GetRasterBand(band_number)
+    window = geometry.get_window_in(
+        dataset.GetGeoTransform(), dataset.RasterXSize, dataset.RasterYSize
+    )
+    no_data_value = band.GetNoDataValue()
+
+    if data_type is None:
+        data_type = PCRASTER_VALUE_SCALES.get(band.GetMetadataItem("PCRASTER_VALUESCALE"))
+
+    if data_type is None:
+        is_floating = gdal.GetDataTypeName(band.DataType).startswith("Float")
+        data_type = pcr.Scalar if is_floating else pcr.Nominal
+
+    array = band.ReadAsArray(
+        *window,
+        buf_xsize=geometry.cols,
+        buf_ysize=geometry.rows,
+        resample_alg=(
+            gdal.GRIORA_Average if data_type in (pcr.Scalar, pcr.Directional) else gdal.GRIORA_Mode
+        ),
+    )
+
+    return mask_no_data(array, no_data_value, data_type), data_type
+
+
+def mask_no_data(array: np.ndarray, no_data_value: Optional[float], data_type) -> np.ndarray:
+    """Return a copy of a raster array with the no data cells set to the missing value of a data type.
+
+    :param array: The raster values.
+    :type array: np.ndarray
+
+    :param no_data_value: The no data value of the raster, if any.
+    :type no_data_value: Optional[float]
+
+    :param data_type: The PCRaster data type of the result (e.g. ``pcraster.Scalar``).
+
+    :return: The raster values with the array type used for the PCRaster data type.
+    :rtype: np.ndarray
+    """
+    if no_data_value is None:
+        no_data_cells = np.zeros(array.shape, dtype=bool)
+    elif np.isnan(no_data_value):
+        no_data_cells = np.isnan(array)
+    else:
+        no_data_cells = array == no_data_value
+
+    if np.issubdtype(array.dtype, np.floating):
+        no_data_cells |= np.isnan(array)
+        array = np.where(no_data_cells, 0, array)
+
+    array = array.astype(np.float32 if data_type in (pcr.Scalar, pcr.Directional) else np.int32)
+    array[no_data_cells] = get_missing_value(data_type)
+    return array
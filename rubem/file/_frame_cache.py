@@ -0,0 +1,203 @@
+from collections import OrderedDict
+import logging
+import os
+import threading
+from typing import Callable, Hashable, Optional, Union
+import zlib
+
+import numpy as np
+
+__all__ = ["FrameCache", "cached_read", "configure_frame_cache", "get_frame_cache"]
+
+logger = logging.getLogger(__name__)
+
+_frame_cache = None
+
+
+class FrameCache:
+    """Process-wide cache of decoded raster frames, compressed in memory.
+
+    Calibration and ensemble runs read the same input maps over and over. The frames read from
+    the raster files are kept compressed with zlib, a fast lossless codec of the standard
+    library, so the later runs of the same process decompress them from memory instead of
+    reading and decoding the files again. When the compressed frames exceed the memory budget,
+    the least recently used ones are evicted.
+
+    A frame is identified by its file, its modification time and size, the band and the grid
+    read, so a modified file is read again.
+
+    :param max_memory: Maximum size of the compressed frames [bytes]. Default is 1 GiB.
+    :type max_memory: int, optional
+
+    :param level: The zlib compression level, from 1 (fastest) to 9 (smallest). Default is ``1``.
+    :type level: int, optional
+
+    :raises ValueError: If the memory budget is not positive or the level is invalid.
+    """
+
+    def __init__(self, max_memory: int = 1024 * 1024 * 1024, level: int = 1) -> None:
+        self.logger = logging.getLogger(__name__)
+        if max_memory < 1:
+            self.logger.error("Invalid frame cache memory limit: %s", max_memory)
+            raise ValueError(f"Invalid frame cache memory limit: {max_memory}")
+
+        if not 1 <= level <= 9:
+            self.logger.error("Invalid frame cache compression level: %s", level)
+            raise ValueError(f"Invalid frame cache compression level: {level}")
+
+        self.max_memory = max_memory
+        self.level = level
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.__frames = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional["FrameCache"]:
+        """Create the cache described by the ``frame_cache`` application settings.
+
+        :param settings: The application settings of the cache.
+        :type settings: Optional[dict]
+
+        :return: The cache, or ``None`` if it is not enabled.
+        :rtype: Optional[FrameCache]
+        """
+        if not settings or not settings.get("enabled"):
+            return None
+
+        return cls(
+            max_memory=int(float(settings.get("max_memory_mb", 1024)) * 1024 * 1024),
+            level=int(settings.get("level", 1)),
+        )
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        """Return a cached frame.
+
+        :param key: The key of the frame.
+        :type key: tuple
+
+        :return: The read-only frame values and its data type, or ``None`` if it is not cached.
+        :rtype: Optional[tuple]
+        """
+        with self.__lock:
+            entry = self.__frames.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.__frames.move_to_end(key)
+            self.hits += 1
+
+        data, dtype, shape, data_type = entry
+        return np.frombuffer(zlib.decompress(data), dtype=dtype).reshape(shape), data_type
+
+    def put(self, key: tuple, array: np.ndarray, data_type) -> None:
+        """Compress and cache a frame, evicting the least recently used ones over the budget.
+
+        Frames larger than the whole budget are not cached.
+
+        :param key: The key of the frame.
+        :type key: tuple
+
+        :param array: The frame values.
+        :type array: np.ndarray
+
+        :param data_type: The PCRaster data type of the frame.
+        """
+        array = np.ascontiguousarray(array)
+        data = zlib.compress(array.tobytes(), self.level)
+        if len(data) > self.max_memory:
+            return
+
+        with self.__lock:
+            previous = self.__frames.pop(key, None)
+            if previous is not None:
+                self.memory -= len(previous[0])
+
+            self.__frames[key] = (data, array.dtype, array.shape, data_type)
+            self.memory += len(data)
+            while self.memory > self.max_memory:
+                _, evicted = self.__frames.popitem(last=False)
+                self.memory -= len(evicted[0])
+
+    def clear(self) -> None:
+        """Remove all the frames."""
+        with self.__lock:
+            self.__frames.clear()
+            self.memory = 0
+
+    def __len__(self) -> int:
+        return len(self.__frames)
+
+
+def configure_frame_cache(settings: Optional[dict]) -> Optional[FrameCache]:
+    """Set up the frame cache of the process from the ``frame_cache`` application settings.
+
+    :param settings: The application settings of the cache.
+    :type settings: Optional[dict]
+
+    :return: The cache, or ``None`` if it is not enabled.
+    :rtype: Optional[FrameCache]
+    """
+    global _frame_cache
+    _frame_cache = FrameCache.from_settings(settings)
+    return _frame_cache
+
+
+def get_frame_cache() -> Optional[FrameCache]:
+    """Return the frame cache of the process.
+
+    :return: The cache, or ``None`` if it is not enabled.
+    :rtype: Optional[FrameCache]
+    """
+    return _frame_cache
+
+
+def cached_read(
+    file_path: Union[str, bytes, os.PathLike],
+    band: Hashable,
+    geometry,
+    data_type,
+    read_func: Callable[[], tuple],
+) -> tuple:
+    """Read a frame through the frame cache of the process, if it is enabled.
+
+    :param file_path: The path of the raster file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param band: The band of the file (e.g. its number, or the variable and slice of a
+        NetCDF file).
+    :type band: Hashable
+
+    :param geometry: The grid read.
+    :type geometry: RasterGridGeometry
+
+    :param data_type: The PCRaster data type requested.
+
+    :param read_func: Function reading the frame, returning its values and data type.
+    :type read_func: Callable[[], tuple]
+
+    :return: The frame values and its data type.
+    :rtype: tuple
+
+    :raises RuntimeError: If the file does not exist or cannot be read.
+    """
+    cache = _frame_cache
+    if cache is None:
+        return read_func()
+
+    file_path = os.path.abspath(str(file_path))
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        raise RuntimeError(f"{file_path}: No such file or directory") from e
+
+    key = (file_path, stat.st_mtime_ns, stat.st_size, band, str(geometry), str(data_type))
+    frame = cache.get(key)
+    if frame is not None:
+        return frame
+
+    array, read_data_type = read_func()
+    cache.put(key, array, read_data_type)
+    return array, read_data_type
@@ -0,0 +1,284 @@
+import json
+import logging
+import os
+import shutil
+from typing import Dict, Union
+
+import numpy as np
+import pcraster as pcr
+
+from ._file_readers import (
+    GDAL_SERIES_FILE_EXTENSIONS,
+    PCRASTER_VALUE_SCALES,
+    RasterGridGeometry,
+    generate_raster_series_file_name,
+    get_missing_value,
+    read_raster_array,
+)
+from ._series_files import is_single_file_series, open_single_file_series
+
+__all__ = ["INPUT_CUBE_SERIES", "INPUT_CUBE_SERIES_DATA_TYPES", "InputCube", "ingest_raster_series"]
+
+INPUT_CUBE_SERIES = ("ndvi", "landuse", "precipitation", "etp", "kp")
+# Integer rasters of continuous variables (e.g. scaled NDVI) must not be read as nominal
+INPUT_CUBE_SERIES_DATA_TYPES = {
+    "ndvi": pcr.Scalar,
+    "landuse": pcr.Nominal,
+    "precipitation": pcr.Scalar,
+    "etp": pcr.Scalar,
+    "kp": pcr.Scalar,
+}
+INPUT_CUBE_METADATA_FILE_NAME = "metadata.json"
+INPUT_CUBE_FORMAT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class InputCube:
+    """Input raster series packed into one memory-mapped array per series.
+
+    Each series is stored as a time-major ``(steps, rows, cols)`` NumPy array file, so the map
+    of a timestep is a contiguous block of the file and is read as a slice of the memory-mapped
+    array, without opening one raster file per timestep.
+
+    :param path: The directory of the cube, written by :func:`ingest_raster_series`.
+    :type path: Union[str, bytes, os.PathLike]
+
+    :raises FileNotFoundError: If the directory does not contain a cube.
+    :raises ValueError: If the cube was written in an unsupported format.
+    """
+
+    def __init__(self, path: Union[str, bytes, os.PathLike]) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.path = os.path.abspath(str(path))
+
+        metadata_path = os.path.join(self.path, INPUT_CUBE_METADATA_FILE_NAME)
+        if not os.path.isfile(metadata_path):
+            self.logger.error("Input cube not found: %s", self.path)
+            raise FileNotFoundError(f"Input cube not found: {self.path}")
+
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        if metadata.get("version") != INPUT_CUBE_FORMAT_VERSION:
+            self.logger.error("Unsupported input cube format: %s", metadata.get("version"))
+            raise ValueError(f"Unsupported input cube format: {metadata.get('version')}")
+
+        self.geometry = RasterGridGeometry(*metadata["geometry"])
+        self.first_step = metadata["first_step"]
+        self.last_step = metadata["last_step"]
+        self.series = metadata["series"]
+        self.__arrays = {}
+
+    def covers(
+        self,
+        series: Dict[str, str],
+        first_step: int,
+        last_step: int,
+        geometry: RasterGridGeometry,
+    ) -> bool:
+        """Check whether the cube holds the given series for a period and grid.
+
+        The input files are not checked, so the cube must be ingested again after they change.
+
+        :param series: The path and file name prefix of each series, by series name.
+        :type series: Dict[str, str]
+
+        :param first_step: The first timestep to be read.
+        :type first_step: int
+
+        :param last_step: The last timestep to be read.
+        :type last_step: int
+
+        :param geometry: The grid to be read. Must be a window of the cube grid with the same
+            cell size.
+        :type geometry: RasterGridGeometry
+
+        :return: ``True`` if every map to be read is in the cube.
+        :rtype: bool
+        """
+        if first_step < self.first_step or last_step > self.last_step:
+            return False
+
+        for name, files_partial_path in series.items():
+            stored = self.series.get(name)
+            if not stored or stored["path"] != os.path.abspath(str(files_partial_path)):
+                return False
+
+        try:
+            window = geometry.get_window_in(
+                self.geometry.get_geotransform(), self.geometry.cols, self.geometry.rows
+            )
+        except ValueError:
+            return False
+
+        return window[2:] == (geometry.cols, geometry.rows)
+
+    def read(self, name: str, timestep: int, geometry: RasterGridGeometry) -> tuple:
+        """Return the map of a series for a timestep as a view of the memory-mapped array.
+
+        :param name: The name of the series (e.g. ``"precipitation"``).
+        :type name: str
+
+        :param timestep: The timestep of the map.
+        :type timestep: int
+
+        :param geometry: The grid to be read. Must be covered by the cube (see :meth:`covers`).
+        :type geometry: RasterGridGeometry
+
+        :return: The read-only map values, with the missing value of the data type at no data
+            cells, and the data type.
+        :rtype: tuple
+
+        :raises RuntimeError: If the map was missing when the series was ingested.
+        """
+        stored = self.series[name]
+        if timestep in stored["missing_steps"]:
+            raise RuntimeError(
+                f"Map of timestep {timestep} of '{stored['path']}' was missing "
+                "when the input cube was ingested"
+            )
+
+        if name not in self.__arrays:
+            self.__arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+        col_offset, row_offset, cols, rows = geometry.get_window_in(
+            self.geometry.get_geotransform(), self.geometry.cols, self.geometry.rows
+        )
+        array = self.__arrays[name][
+            timestep - self.first_step,
+            row_offset : row_offset + rows,
+            col_offset : col_offset + cols,
+        ]
+        return array, PCRASTER_VALUE_SCALES[stored["value_scale"]]
+
+
+def ingest_raster_series(
+    path: Union[str, bytes, os.PathLike],
+    series: Dict[str, str],
+    first_step: int,
+    last_step: int,
+    geometry: RasterGridGeometry,
+    simulation_period=None,
+) -> InputCube:
+    """Pack raster series into an input cube, replacing any cube in the directory.
+
+    Missing maps are recorded, so reading them from the cube fails like reading the files.
+    Series stored in a single file (multi-band raster or NetCDF) or listed in a manifest are
+    packed too.
+
+    :param path: The directory of the cube.
+    :type path: Union[str, bytes, os.PathLike]
+
+    :param series: The path and file name prefix of each series, by series name.
+    :type series: Dict[str, str]
+
+    :param first_step: The first timestep to be packed.
+    :type first_step: int
+
+    :param last_step: The last timestep to be packed.
+    :type last_step: int
+
+    :param geometry: The grid of the cube, usually the clone.
+    :type geometry: RasterGridGeometry
+
+    :param simulation_period: The simulation period, required to map the dates of NetCDF series
+        and manifests to timesteps. Default is ``None``.
+    :type simulation_period: Optional[rubem.configuration.simulation_period.SimulationPeriod]
+
+    :return: The written cube.
+    :rtype: InputCube
+
+    :raises ValueError: If the period is empty or a series has no maps in it.
+    """
+    if last_step < first_step:
+        raise ValueError(f"Invalid input cube period: {first_step} to {last_step}")
+
+    path = os.path.abspath(str(path))
+    temp_path = f"{path}.tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+
+    value_scales = {data_type: name for name, data_type in PCRASTER_VALUE_SCALES.items()}
+    shape = (last_step - first_step + 1, geometry.rows, geometry.cols)
+    metadata = {
+        "version": INPUT_CUBE_FORMAT_VERSION,
+        "geometry": [
+            geometry.rows,
+            geometry.cols,
+            geometry.cell_size,
+            geometry.west,
+            geometry.north,
+        ],
+        "first_step": first_step,
+        "last_step": last_step,
+        "series": {},
+    }
+
+    try:
+        for name, files_partial_path in series.items():
+            logger.info("Ingesting '%s' series from '%s'...", name, files_partial_path)
+            cube = None
+            data_type = INPUT_CUBE_SERIES_DATA_TYPES.get(name)
+            missing_steps = []
+            series_file = (
+                open_single_file_series(files_partial_path, simulation_period)
+                if is_single_file_series(files_partial_path)
+                else None
+            )
+            for index, timestep in enumerate(range(first_step, last_step + 1)):
+                try:
+                    if series_file:
+                        array, data_type = series_file.read(timestep, geometry, data_type)
+                    else:
+                        file_path = generate_raster_series_file_name(files_partial_path, timestep)
+                        for extension in GDAL_SERIES_FILE_EXTENSIONS:
+                            gdal_file_path = generate_raster_series_file_name(
+                                files_partial_path, timestep, extension
+                            )
+                            if not os.path.exists(file_path) and os.path.exists(gdal_file_path):
+                                file_path = gdal_file_path
+                        array, data_type = read_raster_array(file_path, geometry, data_type)
+                except RuntimeError as e:
+                    logger.warning("Map not found, recorded as missing: %s", e)
+                    missing_steps.append(timestep)
+                    continue
+
+                if cube is None:
+                    cube = np.lib.format.open_memmap(
+                        os.path.join(temp_path, f"{name}.npy"),
+                        mode="w+",
+                        dtype=array.dtype,
+                        shape=shape,
+                    )
+
+                cube[index] = array
+
+            if series_file:
+                series_file.close()
+
+            if cube is None:
+                raise ValueError(f"No maps of the '{name}' series found: {files_partial_path}")
+
+            cube[[step - first_step for step in missing_steps]] = get_missing_value(data_type)
+            cube.flush()
+            del cube
+            metadata["series"][name] = {
+                "path": os.path.abspath(str(files_partial_path)),
+                "value_scale": value_scales[data_type],
+                "missing_steps": missing_steps,
+            }
+
+        with open(
+            os.path.join(temp_path, INPUT_CUBE_METADATA_FILE_NAME), "w", encoding="utf-8"
+        ) as f:
+            json.dump(metadata, f, indent=2)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temp_path, path)
+    except BaseException:
+        shutil.rmtree(temp_path, ignore_errors=True)
+        raise
+
+    logger.info("Input cube written to '%s'", path)
+    return InputCube(path)
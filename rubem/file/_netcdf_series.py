@@ -0,0 +1,225 @@
+from datetime import timedelta
+import logging
+import os
+import re
+from typing import Optional, Union
+
+from dateutil import parser as date_parser
+import numpy as np
+from osgeo import gdal
+
+from ._file_readers import RasterGridGeometry, read_dataset_band
+from ._frame_cache import cached_read
+
+__all__ = ["NetCDFSeries", "decode_cf_times", "is_netcdf_series"]
+
+NETCDF_SERIES_PATTERN = re.compile(r"^(?P<path>.+\.nc4?)(?::(?P<variable>\w+))?$", re.IGNORECASE)
+CF_TIME_UNITS_PATTERN = re.compile(
+    r"^\s*(?P<unit>days|hours|minutes|seconds)\s+since\s+(?P<origin>.+?)\s*$", re.IGNORECASE
+)
+CF_STANDARD_CALENDARS = ("standard", "gregorian", "proleptic_gregorian")
+
+logger = logging.getLogger(__name__)
+
+
+def is_netcdf_series(files_partial_path: Union[str, bytes, os.PathLike]) -> bool:
+    """Check whether a raster series is a variable of a NetCDF file instead of a map-series.
+
+    :param files_partial_path: The path of the series. A NetCDF file is given as
+        ``path/file.nc`` or ``path/file.nc:variable``.
+    :type files_partial_path: Union[str, bytes, os.PathLike]
+
+    :return: ``True`` if the series is a NetCDF file.
+    :rtype: bool
+    """
+    return NETCDF_SERIES_PATTERN.match(str(files_partial_path)) is not None
+
+
+def decode_cf_times(values, units: str, calendar: Optional[str] = None) -> list:
+    """Decode the values of a CF time coordinate into dates.
+
+    :param values: The values of the time coordinate.
+
+    :param units: The ``units`` attribute of the coordinate (e.g. ``"days since 1900-01-01"``).
+    :type units: str
+
+    :param calendar: The ``calendar`` attribute of the coordinate. Default is ``None``, the
+        standard calendar.
+    :type calendar: Optional[str]
+
+    :return: The dates of the values.
+    :rtype: list[datetime]
+
+    :raises ValueError: If the units or the calendar are not supported.
+    """
+    if calendar and calendar.lower() not in CF_STANDARD_CALENDARS:
+        raise ValueError(f"Unsupported NetCDF time calendar: {calendar}")
+
+    match = CF_TIME_UNITS_PATTERN.match(units or "")
+    if not match:
+        raise ValueError(f"Unsupported NetCDF time units: {units}")
+
+    origin = date_parser.parse(match.group("origin"), ignoretz=True)
+    unit = match.group("unit").lower()
+    return [origin + timedelta(**{unit: float(value)}) for value in np.ravel(values)]
+
+
+class NetCDFSeries:
+    """Raster series stored as a variable of a NetCDF file, read with the GDAL multidimensional API.
+
+    The CF time coordinate of the variable is mapped to the timesteps of the simulation period:
+    the slice of each month holds the map of the timestep of that month. The file is opened once
+    and kept open, and each slice is read only when it is used, through GDAL's block cache of the
+    file chunks, so no intermediate files are written.
+
+    :param file_path: The path of the NetCDF file, optionally followed by ``:variable``. If the
+        variable is not given, the file must have a single variable with time and two spatial
+        dimensions.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param simulation_period: The simulation period whose timesteps are read.
+    :type simulation_period: rubem.configuration.simulation_period.SimulationPeriod
+
+    :raises RuntimeError: If the file cannot be opened.
+    :raises ValueError: If the variable is not found or has no time and spatial dimensions, if
+        its time coordinate cannot be decoded or if a month has more than one slice.
+    """
+
+    def __init__(self, file_path: Union[str, bytes, os.PathLike], simulation_period) -> None:
+        self.logger = logging.getLogger(__name__)
+
+        match = NETCDF_SERIES_PATTERN.match(str(file_path))
+        if not match:
+            raise ValueError(f"Invalid NetCDF series path: {file_path}")
+
+        self.file_path = os.path.abspath(match.group("path"))
+        gdal.UseExceptions()
+        self.logger.debug("Opening NetCDF series: %s", self.file_path)
+        self.__dataset = gdal.OpenEx(self.file_path, gdal.OF_MULTIDIM_RASTER)
+        root_group = self.__dataset.GetRootGroup()
+
+        self.variable = match.group("variable") or self.__find_variable(root_group)
+        array = root_group.OpenMDArray(self.variable)
+        if array is None:
+            self.logger.error("Variable '%s' not found in %s", self.variable, self.file_path)
+            raise ValueError(f"Variable '{self.variable}' not found in {self.file_path}")
+
+        dimensions = array.GetDimensions()
+        time_index = self.__find_dimension(dimensions, "TEMPORAL", ("time", "t"))
+        y_index = self.__find_dimension(dimensions, "HORIZONTAL_Y", ("lat", "latitude", "y"))
+        x_index = self.__find_dimension(dimensions, "HORIZONTAL_X", ("lon", "longitude", "x"))
+        if len(dimensions) != 3 or None in (time_index, y_index, x_index):
+            self.logger.error("Variable '%s' must have time, y and x dimensions", self.variable)
+            raise ValueError(f"Variable '{self.variable}' must have time, y and x dimensions")
+
+        time = dimensions[time_index].GetIndexingVariable()
+        if time is None:
+            self.logger.error("Time dimension of '%s' has no coordinate", self.variable)
+            raise ValueError(f"Time dimension of '{self.variable}' has no coordinate")
+
+        units = time.GetAttribute("units")
+        calendar = time.GetAttribute("calendar")
+        dates = decode_cf_times(
+            time.ReadAsArray(),
+            units.ReadAsString() if units else None,
+            calendar.ReadAsString() if calendar else None,
+        )
+
+        self.__bands = {}
+        for band_number, day in enumerate(dates, start=1):
+            timestep = simulation_period.get_step(day)
+            if timestep in self.__bands:
+                self.logger.error("More than one slice for %s in %s", day, self.file_path)
+                raise ValueError(
+                    f"More than one slice for {day.strftime('%m/%Y')} in {self.file_path}"
+                )
+            self.__bands[timestep] = band_number
+
+        if array.GetScale() not in (None, 1.0) or array.GetOffset() not in (None, 0.0):
+            array = array.GetUnscaled()
+
+        # Classic rasters are north-up, so rows are flipped when latitudes increase
+        latitudes = dimensions[y_index].GetIndexingVariable()
+        if latitudes is not None:
+            values = latitudes.ReadAsArray()
+            if len(values) > 1 and values[1] > values[0]:
+                array = array.GetView(
+                    "[" + ",".join("::-1" if i == y_index else ":" for i in range(3)) + "]"
+                )
+
+        self.__array = array
+        self.dataset = array.AsClassicDataset(x_index, y_index)
+
+    def __find_variable(self, root_group) -> str:
+        candidates = [
+            name
+            for name in root_group.GetMDArrayNames()
+            if len(root_group.OpenMDArray(name).GetDimensions()) == 3
+        ]
+        if len(candidates) != 1:
+            self.logger.error("Ambiguous NetCDF series variable: %s", candidates)
+            raise ValueError(
+                f"Variable of {self.file_path} must be given as 'file.nc:variable', "
+                f"found: {candidates}"
+            )
+
+        return candidates[0]
+
+    @staticmethod
+    def __find_dimension(dimensions, dimension_type: str, names: tuple) -> Optional[int]:
+        for index, dimension in enumerate(dimensions):
+            if dimension.GetType() == dimension_type:
+                return index
+
+        for index, dimension in enumerate(dimensions):
+            if dimension.GetName().lower() in names:
+                return index
+
+        return None
+
+    @property
+    def timesteps(self) -> list:
+        """The timesteps with a slice in the file."""
+        return sorted(self.__bands)
+
+    def read(self, timestep: int, geometry: RasterGridGeometry, data_type=None) -> tuple:
+        """Read the window of the slice of a timestep covered by a grid into an array.
+
+        :param timestep: The timestep of the map.
+        :type timestep: int
+
+        :param geometry: The grid to be read. Must be aligned to the raster.
+        :type geometry: RasterGridGeometry
+
+        :param data_type: The PCRaster data type of the result. If ``None``, the data type of the
+            variable is used. Default is ``None``.
+
+        :return: The raster values on the grid, with the missing value of the data type at no
+            data cells, and the data type.
+        :rtype: tuple
+
+        :raises RuntimeError: If the file has no slice for the timestep or it cannot be read.
+        :raises ValueError: If the raster does not match the grid.
+        """
+        if self.dataset is None:
+            raise RuntimeError(f"{self.file_path}: NetCDF series is closed")
+
+        if timestep not in self.__bands:
+            raise RuntimeError(
+                f"{self.file_path}: No '{self.variable}' slice for timestep {timestep}"
+            )
+
+        band_number = self.__bands[timestep]
+        return cached_read(
+            self.file_path,
+            (self.variable, band_number),
+            geometry,
+            data_type,
+            lambda: read_dataset_band(self.dataset, band_number, geometry, data_type),
+        )
+
+    def close(self) -> None:
+        """Close the NetCDF file."""
+        self.dataset = None
+        self.__array = None
+        self.__dataset = None
@@ -0,0 +1,120 @@
+import logging
+import os
+from typing import Sequence, Union
+
+import numpy as np
+
+__all__ = ["ParameterTable"]
+
+PARAMETER_TABLE_CLASS_COLUMN = "class"
+
+logger = logging.getLogger(__name__)
+
+
+class ParameterTable:
+    """Columnar table of the parameters of the classes of a class map (e.g. land use or soil).
+
+    The table is a CSV file with a header row, a ``class`` column with the class id and one
+    column per parameter, so all the parameters of a class map are read from one file and
+    gathered in a single pass over the map, instead of one lookup table file and one map scan
+    per parameter.
+
+    .. code-block:: text
+
+        class,a_i,a_o,a_s,a_v,manning,k_c_min,k_c_max
+        1,0.0,0.0,0.1,0.9,0.6,0.8,1.1
+        2,0.9,0.0,0.1,0.0,0.012,0.1,0.3
+
+    :param file_path: The path of the CSV file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param columns: The parameter columns required in the table.
+    :type columns: Sequence[str]
+
+    :raises FileNotFoundError: If the file does not exist.
+    :raises ValueError: If the table has no rows, lacks a required column or has repeated or
+        non-integer class ids.
+    """
+
+    def __init__(self, file_path: Union[str, bytes, os.PathLike], columns: Sequence[str]) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.file_path = os.path.abspath(str(file_path))
+        self.columns = tuple(columns)
+
+        if not os.path.isfile(self.file_path):
+            self.logger.error("Parameter table not found: %s", self.file_path)
+            raise FileNotFoundError(f"Parameter table not found: {self.file_path}")
+
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            table = np.atleast_1d(
+                np.genfromtxt(f, delimiter=",", names=True, dtype=np.float64, autostrip=True)
+            )
+
+        names = table.dtype.names or ()
+        missing_columns = [
+            name for name in (PARAMETER_TABLE_CLASS_COLUMN, *self.columns) if name not in names
+        ]
+        if missing_columns:
+            self.logger.error("Missing columns %s in %s", missing_columns, self.file_path)
+            raise ValueError(f"Missing columns {missing_columns} in {self.file_path}")
+
+        if not table.size:
+            raise ValueError(f"Empty parameter table: {self.file_path}")
+
+        classes = table[PARAMETER_TABLE_CLASS_COLUMN]
+        if not np.all(np.isfinite(classes)) or np.any(classes != np.round(classes)):
+            raise ValueError(f"Class ids must be integers in {self.file_path}")
+
+        order = np.argsort(classes, kind="stable")
+        self.classes = classes[order].astype(np.int64)
+        if np.any(np.diff(self.classes) == 0):
+            repeated = np.unique(self.classes[1:][np.diff(self.classes) == 0])
+            raise ValueError(f"Repeated classes {repeated.tolist()} in {self.file_path}")
+
+        self.values = np.empty(
+            len(self.classes), dtype=[(name, np.float32) for name in self.columns]
+        )
+        for name in self.columns:
+            self.values[name] = table[name][order]
+
+        self.logger.debug(
+            "Read %d classes with %d parameters from %s",
+            len(self.classes),
+            len(self.columns),
+            self.file_path,
+        )
+
+    def gather(self, class_map: np.ndarray, missing_value, fill_value: float) -> np.ndarray:
+        """Gather the parameters of the class of each cell of a map.
+
+        :param class_map: The class id of each cell.
+        :type class_map: np.ndarray
+
+        :param missing_value: The value of the cells without a class in ``class_map``.
+
+        :param fill_value: The value of the parameters of the cells without a class.
+        :type fill_value: float
+
+        :return: A structured array with the shape of the map and one field per parameter.
+        :rtype: np.ndarray
+
+        :raises ValueError: If a class of the map has no row in the table.
+        """
+        class_map = np.asarray(class_map)
+        valid = class_map != missing_value
+        if np.issubdtype(class_map.dtype, np.floating):
+            valid &= ~np.isnan(class_map)
+
+        cell_classes = class_map[valid]
+        index = np.searchsorted(self.classes, cell_classes)
+        found = self.classes[np.minimum(index, len(self.classes) - 1)] == cell_classes
+        if not np.all(found):
+            missing_classes = np.unique(cell_classes[~found])
+            self.logger.error("Classes %s not found in %s", missing_classes, self.file_path)
+            raise ValueError(
+                f"Classes {missing_classes.tolist()} of the map have no row in {self.file_path}"
+            )
+
+        result = np.full(class_map.shape, fill_value, dtype=self.values.dtype)
+        result[valid] = self.values[index]
+        return result
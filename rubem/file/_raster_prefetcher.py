@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import threading
+from typing import Optional, Union
+
+from ._file_readers import RasterGridGeometry, read_raster_array
+
+__all__ = ["RasterPrefetcher"]
+
+logger = logging.getLogger(__name__)
+
+
+class RasterPrefetcher:
+    """Reads raster files ahead of their use in background threads.
+
+    The files are read with GDAL, which does not hold the Python interpreter while it reads and
+    decodes, so the model can compute a timestep while the rasters of the next ones are read.
+
+    :param depth: Number of timesteps read ahead. Default is ``1``.
+    :type depth: int, optional
+
+    :param max_memory: Maximum size of the rasters read ahead and not used yet [bytes]. Reads
+        beyond it are left to be done when the raster is used. Default is 256 MiB.
+    :type max_memory: int, optional
+
+    :param workers: Number of background threads. Default is ``2``.
+    :type workers: int, optional
+
+    :raises ValueError: If any setting is not positive.
+    """
+
+    def __init__(self, depth: int = 1, max_memory: int = 256 * 1024 * 1024, workers: int = 2):
+        self.logger = logging.getLogger(__name__)
+        for name, value in (("depth", depth), ("memory limit", max_memory), ("workers", workers)):
+            if value < 1:
+                self.logger.error("Invalid prefetch %s: %s", name, value)
+                raise ValueError(f"Invalid prefetch {name}: {value}")
+
+        self.depth = depth
+        self.max_memory = max_memory
+        self.workers = workers
+        self.__executor = None
+        self.__pending = {}
+        self.__pending_memory = 0
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> Optional["RasterPrefetcher"]:
+        """Create the prefetcher described by the ``prefetch`` application settings.
+
+        :param settings: The application settings of the prefetcher.
+        :type settings: Optional[dict]
+
+        :return: The prefetcher, or ``None`` if it is not enabled.
+        :rtype: Optional[RasterPrefetcher]
+        """
+        if not settings or not settings.get("enabled"):
+            return None
+
+        return cls(
+            depth=int(settings.get("depth", 1)),
+            max_memory=int(float(settings.get("max_memory_mb", 256)) * 1024 * 1024),
+            workers=int(settings.get("workers", 2)),
+        )
+
+    def prefetch(
+        self,
+        file_path: Union[str, bytes, os.PathLike],
+        geometry: RasterGridGeometry,
+        data_type=None,
+    ) -> bool:
+        """Start reading a raster in the background, unless it is already being read.
+
+        :param file_path: The path of the raster file.
+        :type file_path: Union[str, bytes, os.PathLike]
+
+        :param geometry: The grid to be read.
+        :type geometry: RasterGridGeometry
+
+        :param data_type: The PCRaster data type of the result. If ``None``, the data type of the
+            raster is used. Default is ``None``.
+
+        :return: ``True`` if the raster is being read, ``False`` if the memory limit was reached.
+        :rtype: bool
+        """
+        key = (str(file_path), str(geometry), str(data_type))
+        # Arrays are 4 bytes per cell for every data type
+        size = geometry.rows * geometry.cols * 4
+        with self.__lock:
+            if key in self.__pending:
+                return True
+
+            if self.__pending_memory + size > self.max_memory:
+                return False
+
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="rubem-prefetch"
+                )
+
+            self.__pending[key] = (
+                self.__executor.submit(read_raster_array, str(file_path), geometry, data_type),
+                size,
+            )
+            self.__pending_memory += size
+
+        return True
+
+    def get(
+        self,
+        file_path: Union[str, bytes, os.PathLike],
+        geometry: RasterGridGeometry,
+        data_type=None,
+    ) -> tuple:
+        """Return a raster read in the background, or read it now if it was not prefetched.
+
+        See :func:`rubem.file._file_readers.read_raster_array` for the parameters.
+
+        :return: The raster values on the grid and the data type.
+        :rtype: tuple
+
+        :raises RuntimeError: If the raster cannot be read.
+        """
+        key = (str(file_path), str(geometry), str(data_type))
+        with self.__lock:
+            future, size = self.__pending.pop(key, (None, 0))
+            self.__pending_memory -= size
+
+        if future is None:
+            return read_raster_array(file_path, geometry, data_type)
+
+        return future.result()
+
+    def close(self) -> None:
+        """Discard the rasters read ahead and stop the background threads."""
+        with self.__lock:
+            for future, _ in self.__pending.values():
+                future.cancel()
+
+            self.__pending.clear()
+            self.__pending_memory = 0
+            executor, self.__executor = self.__executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,89 @@
+import logging
+import os
+from typing import Union
+
+from osgeo import gdal
+
+from ._file_readers import RasterGridGeometry, read_dataset_band
+from ._frame_cache import cached_read
+
+__all__ = ["RASTER_STACK_EXTENSIONS", "RasterStack", "is_raster_stack"]
+
+RASTER_STACK_EXTENSIONS = (".tif", ".tiff")
+
+logger = logging.getLogger(__name__)
+
+
+def is_raster_stack(files_partial_path: Union[str, bytes, os.PathLike]) -> bool:
+    """Check whether a raster series is a multi-band raster file instead of a map-series.
+
+    :param files_partial_path: The path of the series, either the directory and file name
+        prefix of a map-series or the path of a multi-band raster file.
+    :type files_partial_path: Union[str, bytes, os.PathLike]
+
+    :return: ``True`` if the series is a multi-band raster file.
+    :rtype: bool
+    """
+    return str(files_partial_path).lower().endswith(RASTER_STACK_EXTENSIONS)
+
+
+class RasterStack:
+    """Raster series stored as the bands of a single multi-band raster file (e.g. GeoTIFF).
+
+    Band ``n`` holds the map of timestep ``n``, like the ``prefix0000.00n`` file of a
+    map-series. The file is opened once and kept open, so the blocks already decoded by GDAL are
+    reused by later reads instead of opening a file per timestep.
+
+    :param file_path: The path of the raster file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :raises RuntimeError: If the raster file cannot be opened.
+    """
+
+    def __init__(self, file_path: Union[str, bytes, os.PathLike]) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.file_path = os.path.abspath(str(file_path))
+
+        gdal.UseExceptions()
+        self.logger.debug("Opening raster stack: %s", self.file_path)
+        self.dataset = gdal.OpenEx(self.file_path, gdal.OF_RASTER | gdal.OF_READONLY)
+        self.band_count = self.dataset.RasterCount
+
+    def read(self, timestep: int, geometry: RasterGridGeometry, data_type=None) -> tuple:
+        """Read the window of the band of a timestep covered by a grid into an array.
+
+        :param timestep: The timestep of the map.
+        :type timestep: int
+
+        :param geometry: The grid to be read. Must be aligned to the raster.
+        :type geometry: RasterGridGeometry
+
+        :param data_type: The PCRaster data type of the result. If ``None``, the data type of the
+            band is used. Default is ``None``.
+
+        :return: The raster values on the grid, with the missing value of the data type at no
+            data cells, and the data type.
+        :rtype: tuple
+
+        :raises RuntimeError: If the file has no band for the timestep or it cannot be read.
+        :raises ValueError: If the raster does not match the grid.
+        """
+        if self.dataset is None:
+            raise RuntimeError(f"{self.file_path}: Raster stack is closed")
+
+        if not 1 <= timestep <= self.band_count:
+            raise RuntimeError(
+                f"{self.file_path}: No band for timestep {timestep} ({self.band_count} bands)"
+            )
+
+        return cached_read(
+            self.file_path,
+            timestep,
+            geometry,
+            data_type,
+            lambda: read_dataset_band(self.dataset, timestep, geometry, data_type),
+        )
+
+    def close(self) -> None:
+        """Close the raster file."""
+        self.dataset = None
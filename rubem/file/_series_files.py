@@ -0,0 +1,50 @@
+import os
+from typing import Union
+
+from ._netcdf_series import NetCDFSeries, is_netcdf_series
+from ._raster_stack import RasterStack, is_raster_stack
+from ._series_manifest import SeriesManifest, is_series_manifest
+
+__all__ = ["is_single_file_series", "open_single_file_series"]
+
+
+def is_single_file_series(files_partial_path: Union[str, bytes, os.PathLike]) -> bool:
+    """Check whether a raster series is stored in a single file instead of a map-series.
+
+    :param files_partial_path: The path of the series.
+    :type files_partial_path: Union[str, bytes, os.PathLike]
+
+    :return: ``True`` if the series is a multi-band raster file, a NetCDF file or a manifest.
+    :rtype: bool
+    """
+    return (
+        is_raster_stack(files_partial_path)
+        or is_netcdf_series(files_partial_path)
+        or is_series_manifest(files_partial_path)
+    )
+
+
+def open_single_file_series(
+    files_partial_path: Union[str, bytes, os.PathLike], simulation_period
+) -> Union[RasterStack, NetCDFSeries, SeriesManifest]:
+    """Open a raster series stored in a single file.
+
+    :param files_partial_path: The path of the series.
+    :type files_partial_path: Union[str, bytes, os.PathLike]
+
+    :param simulation_period: The simulation period, used to map dates to timesteps.
+    :type simulation_period: rubem.configuration.simulation_period.SimulationPeriod
+
+    :return: The open series.
+    :rtype: Union[RasterStack, NetCDFSeries, SeriesManifest]
+
+    :raises RuntimeError: If the file cannot be opened.
+    :raises ValueError: If the file does not hold a raster series.
+    """
+    if is_series_manifest(files_partial_path):
+        return SeriesManifest(files_partial_path, simulation_period)
+
+    if is_netcdf_series(files_partial_path):
+        return NetCDFSeries(files_partial_path, simulation_period)
+
+    return RasterStack(files_partial_path)
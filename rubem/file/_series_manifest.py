@@ -0,0 +1,240 @@
+from bisect import bisect_right
+import json
+import logging
+import os
+import re
+from typing import Dict, Optional, Union
+
+from dateutil import parser as date_parser
+
+from ._file_readers import GDAL_SERIES_FILE_EXTENSIONS, RasterGridGeometry, read_raster_array
+
+__all__ = ["SeriesManifest", "is_series_manifest", "write_series_manifest"]
+
+SERIES_MANIFEST_EXTENSION = ".json"
+SERIES_MANIFEST_FORMAT_VERSION = 1
+TIMESTEP_KEY_PATTERN = re.compile(r"^\d+$")
+
+logger = logging.getLogger(__name__)
+
+
+def is_series_manifest(files_partial_path: Union[str, bytes, os.PathLike]) -> bool:
+    """Check whether a raster series is given by a manifest file instead of a map-series.
+
+    :param files_partial_path: The path of the series.
+    :type files_partial_path: Union[str, bytes, os.PathLike]
+
+    :return: ``True`` if the series is a manifest file.
+    :rtype: bool
+    """
+    return str(files_partial_path).lower().endswith(SERIES_MANIFEST_EXTENSION)
+
+
+class SeriesManifest:
+    """Raster series whose maps are listed in a JSON manifest, by timestep or by month.
+
+    The manifest maps each timestep (e.g. ``"1200"``) or month (e.g. ``"2000-01"``) to the path
+    of its raster file, so the files can have any name and the series is not limited to the
+    999 timesteps of the map-series file names. The map of a timestep is found in the manifest
+    without listing the directories of the files.
+
+    .. code-block:: json
+
+        {"version": 1, "files": {"2000-01": "prec/jan2000.tif", "2000-02": "prec/feb2000.tif"}}
+
+    Relative paths are relative to the directory of the manifest. With ``"hold_last": true``,
+    the manifest lists change points only: each file holds the map from its timestep until the
+    timestep of the next file, e.g. a land use map valid for a whole year or a static map.
+
+    :param file_path: The path of the manifest file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param simulation_period: The simulation period, required to map months to timesteps.
+    :type simulation_period: Optional[rubem.configuration.simulation_period.SimulationPeriod]
+
+    :raises FileNotFoundError: If the manifest file does not exist.
+    :raises ValueError: If the manifest is invalid or lists more than one file for a timestep.
+    """
+
+    def __init__(self, file_path: Union[str, bytes, os.PathLike], simulation_period=None) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.file_path = os.path.abspath(str(file_path))
+
+        if not os.path.isfile(self.file_path):
+            self.logger.error("Series manifest not found: %s", self.file_path)
+            raise FileNotFoundError(f"Series manifest not found: {self.file_path}")
+
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != SERIES_MANIFEST_FORMAT_VERSION:
+            self.logger.error("Unsupported series manifest format: %s", manifest.get("version"))
+            raise ValueError(f"Unsupported series manifest format: {manifest.get('version')}")
+
+        base_dir = os.path.dirname(self.file_path)
+        self.files = {}
+        for key, path in manifest.get("files", {}).items():
+            timestep = self.__get_timestep(str(key), simulation_period)
+            if timestep in self.files:
+                self.logger.error("More than one file for timestep %s", timestep)
+                raise ValueError(f"More than one file for timestep {timestep} in {self.file_path}")
+
+            self.files[timestep] = os.path.normpath(os.path.join(base_dir, str(path)))
+
+        self.hold_last = bool(manifest.get("hold_last", False))
+        self.__change_points = sorted(self.files)
+
+    def __get_timestep(self, key: str, simulation_period) -> int:
+        if TIMESTEP_KEY_PATTERN.match(key):
+            return int(key)
+
+        if simulation_period is None:
+            raise ValueError(f"Manifest month '{key}' requires the simulation period")
+
+        try:
+            day = date_parser.isoparse(key)
+        except ValueError:
+            self.logger.error("Invalid series manifest key: %s", key)
+            raise ValueError(f"Invalid series manifest key: {key}") from None
+
+        return simulation_period.get_step(day)
+
+    @property
+    def timesteps(self) -> list:
+        """The timesteps with a file in the manifest."""
+        return list(self.__change_points)
+
+    def get_change_point(self, timestep: int) -> int:
+        """Return the timestep of the file holding the map of a timestep.
+
+        :param timestep: The timestep of the map.
+        :type timestep: int
+
+        :return: The timestep itself, or the last change point up to it if the manifest holds
+            the last file.
+        :rtype: int
+
+        :raises RuntimeError: If the manifest has no file for the timestep.
+        """
+        if self.hold_last:
+            index = bisect_right(self.__change_points, timestep)
+            if index:
+                return self.__change_points[index - 1]
+        elif timestep in self.files:
+            return timestep
+
+        raise RuntimeError(f"{self.file_path}: No file for timestep {timestep}")
+
+    def get_file(self, timestep: int) -> str:
+        """Return the path of the raster file of a timestep.
+
+        :param timestep: The timestep of the map.
+        :type timestep: int
+
+        :return: The path of the file.
+        :rtype: str
+
+        :raises RuntimeError: If the manifest has no file for the timestep.
+        """
+        return self.files[self.get_change_point(timestep)]
+
+    def read(self, timestep: int, geometry: RasterGridGeometry, data_type=None) -> tuple:
+        """Read the window of the raster of a timestep covered by a grid into an array.
+
+        :param timestep: The timestep of the map.
+        :type timestep: int
+
+        :param geometry: The grid to be read. Must be aligned to the raster.
+        :type geometry: RasterGridGeometry
+
+        :param data_type: The PCRaster data type of the result. If ``None``, the data type of the
+            raster is used. Default is ``None``.
+
+        :return: The raster values on the grid, with the missing value of the data type at no
+            data cells, and the data type.
+        :rtype: tuple
+
+        :raises RuntimeError: If the manifest has no file for the timestep or it cannot be read.
+        :raises ValueError: If the raster does not match the grid.
+        """
+        return read_raster_array(self.get_file(timestep), geometry, data_type)
+
+    def close(self) -> None:
+        """Nothing to close, the raster files are kept open by the dataset cache."""
+
+
+def write_series_manifest(
+    file_path: Union[str, bytes, os.PathLike],
+    files_partial_path: Optional[Union[str, bytes, os.PathLike]] = None,
+    files: Optional[Dict[Union[int, str], str]] = None,
+    simulation_period=None,
+    hold_last: bool = False,
+) -> SeriesManifest:
+    """Write the manifest of a raster series.
+
+    Either the files are given, by timestep or month, or the directory of a map-series is
+    listed once to find its PCRaster (e.g. ``prec0000.001``) or GDAL (e.g.
+    ``prec0000001.tif``) files.
+
+    :param file_path: The path of the manifest file.
+    :type file_path: Union[str, bytes, os.PathLike]
+
+    :param files_partial_path: The path where the map-series is located and prefix combined.
+        Default is ``None``.
+    :type files_partial_path: Optional[Union[str, bytes, os.PathLike]]
+
+    :param files: The path of the file of each timestep or month. Default is ``None``.
+    :type files: Optional[Dict[Union[int, str], str]]
+
+    :param simulation_period: The simulation period, required to map months to timesteps.
+        Default is ``None``.
+    :type simulation_period: Optional[rubem.configuration.simulation_period.SimulationPeriod]
+
+    :param hold_last: If ``True``, the files are change points holding their map until the
+        next one. Default is ``False``.
+    :type hold_last: bool
+
+    :return: The written manifest.
+    :rtype: SeriesManifest
+
+    :raises ValueError: If neither or both the series and the files are given, or if the
+        map-series has no files.
+    """
+    if (files_partial_path is None) == (files is None):
+        raise ValueError("Either the map-series or its files must be given")
+
+    file_path = os.path.abspath(str(file_path))
+    if files is None:
+        directory, prefix = os.path.split(os.path.abspath(str(files_partial_path)))
+        extensions = "|".join(re.escape(extension) for extension in GDAL_SERIES_FILE_EXTENSIONS)
+        pattern = re.compile(
+            rf"^{re.escape(prefix)}(?P<head>\d+)(?:\.(?P<tail>\d{{3}})|{extensions})$",
+            re.IGNORECASE,
+        )
+
+        files = {}
+        with os.scandir(directory) as it:
+            for entry in it:
+                match = pattern.match(entry.name)
+                if entry.is_file() and match:
+                    files[int(match.group("head") + (match.group("tail") or ""))] = entry.path
+
+        if not files:
+            raise ValueError(f"No files found for map-series: {files_partial_path}")
+
+        logger.info("Found %d files of map-series '%s'", len(files), files_partial_path)
+
+    base_dir = os.path.dirname(file_path)
+    manifest = {
+        "version": SERIES_MANIFEST_FORMAT_VERSION,
+        "hold_last": hold_last,
+        "files": {
+            str(key): os.path.relpath(os.path.abspath(str(path)), base_dir)
+            for key, path in sorted(files.items(), key=lambda item: str(item[0]).zfill(16))
+        },
+    }
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info("Series manifest written to '%s'", file_path)
+    return SeriesManifest(file_path, simulation_period)
@@ -0,0 +1,132 @@
+"""Hooks to run custom code at each timestep of the model.
+
+A hook is an instance of a :class:`StepHook` subclass registered with the model, e.g. through
+:func:`rubem.core.simulate` or :class:`rubem.core.DynamicFrameworkWrapper`. At each timestep,
+it receives a :class:`StepContext` that exposes the fluxes and the state of the model as
+NumPy arrays sharing memory with the model maps, so diagnostics such as basin aggregates or
+values at custom locations can be computed without writing output maps to disk.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pcraster as pcr
+
+from ._sample_locations import SampleLocations
+
+__all__ = ["StepContext", "StepHook"]
+
+
+class StepContext:
+    """Fluxes and state of the model at a timestep.
+
+    The fields are indexed by the identifiers of the output variables (``itp``, ``bfw``,
+    ``srn``, ``eta``, ``lfw``, ``rec``, ``smc``, ``rnf`` and ``arn``) and by:
+
+    - ``prec``: Precipitation [mm];
+    - ``etp``: Potential Evapotranspiration [mm];
+    - ``sat_zone_storage``: Water content at the saturated zone [mm];
+    - ``acc``: Accumulated discharge before the routing smoothing [m³/s].
+
+    :param step: The timestep.
+    :type step: int
+
+    :param date: The date of the timestep.
+    :type date: datetime
+
+    :param fields: The fields of the timestep indexed by their identifier.
+    :type fields: dict
+
+    :param sample_locations: The sample locations of the simulation domain, if any. Default is
+        ``None``.
+    :type sample_locations: Optional[SampleLocations]
+    """
+
+    def __init__(
+        self,
+        step: int,
+        date: datetime,
+        fields: dict,
+        sample_locations: Optional[SampleLocations] = None,
+    ) -> None:
+        self.step = step
+        self.date = date
+        self.fields = fields
+        self.sample_locations = sample_locations
+        self.__arrays = {}
+
+    def array(self, name: str) -> np.ndarray:
+        """Return the values of a field as an array sharing memory with the model map.
+
+        Missing cells are ``NaN``. The array is only valid during the current timestep, and
+        changing its values changes the model map: for state variables (``smc``, ``bfw``,
+        ``sat_zone_storage`` and ``arn``), the changes are carried to the next timestep.
+        Uniform (non-spatial) fields are converted to a spatial copy, whose changes are not
+        carried to the model.
+
+        :param name: The identifier of the field.
+        :type name: str
+
+        :return: The ``(rows, cols)`` values of the field.
+        :rtype: np.ndarray
+
+        :raises KeyError: If there is no field with the identifier.
+        """
+        array = self.__arrays.get(name)
+        if array is None:
+            field = self.fields[name]
+            if not field.isSpatial():
+                field = pcr.spatial(field)
+                self.fields[name] = field
+
+            array = pcr.pcr_as_numpy(field)
+            self.__arrays[name] = array
+
+        return array
+
+    def sample(self, name: str) -> np.ndarray:
+        """Return the average of a field at each sample location.
+
+        :param name: The identifier of the field.
+        :type name: str
+
+        :return: The average at each sample location, following ``sample_locations.ids``.
+        :rtype: np.ndarray
+
+        :raises ValueError: If the model has no sample locations.
+        """
+        if self.sample_locations is None:
+            raise ValueError("No sample locations in the simulation domain")
+
+        return self.sample_locations.average(self.array(name))
+
+
+class StepHook:
+    """Base class of the hooks run by the model.
+
+    Subclasses override the methods of the events they handle. Hooks run in the order they are
+    registered, after the fluxes of a timestep are computed and before the output files of the
+    timestep are written.
+    """
+
+    def initial(self, model) -> None:
+        """Called once, at the end of the initial section of the model.
+
+        :param model: The model.
+        :type model: RainfallRunoffBalanceEnhancedModel
+        """
+
+    def dynamic(self, context: StepContext) -> None:
+        """Called at each timestep.
+
+        :param context: The fluxes and state of the model at the timestep.
+        :type context: StepContext
+        """
+
+    def final(self, model) -> None:
+        """Called once, after the last timestep, even if the model run failed.
+
+        :param model: The model.
+        :type model: RainfallRunoffBalanceEnhancedModel
+        """
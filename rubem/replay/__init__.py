@@ -0,0 +1,3 @@
+from ._groundwater import *
+from ._routing import *
+from ._store import *
@@ -0,0 +1,105 @@
+import logging
+
+import numpy as np
+
+from ._store import ReplayStore
+
+__all__ = ["GroundwaterReplay"]
+
+logger = logging.getLogger(__name__)
+
+
+class GroundwaterReplay:
+    """Replay of the baseflow and saturated zone storage recursion from cached series.
+
+    In the model, the soil moisture balance does not depend on the baseflow nor on the
+    saturated zone storage, so the Recharge (REC), Surface Runoff (SRN) and Lateral Flow (LFW)
+    series of a run stay valid for any groundwater parameters. This class evaluates only the
+    groundwater recursion of ``Soil.get_baseflow`` and ``Soil.get_actual_water_cont_sat_zone``
+    on those series, which is orders of magnitude faster than rerunning the model and can be
+    called repeatedly to calibrate ``alpha_gw``, ``bfw_lim``, ``bfw_ini`` and ``s_sat_ini``.
+
+    :param store: Store with the ``rec``, ``srn`` and ``lfw`` series of a model run.
+    :type store: ReplayStore
+
+    :raises KeyError: If the store does not contain the required series.
+    """
+
+    REQUIRED_VARIABLES = ("rec", "srn", "lfw")
+
+    def __init__(self, store: ReplayStore) -> None:
+        self.logger = logging.getLogger(__name__)
+        missing = [v for v in self.REQUIRED_VARIABLES if v not in store.variables]
+        if missing:
+            self.logger.error("Replay store misses the series: %s", ", ".join(missing))
+            raise KeyError(f"Replay store misses the series: {', '.join(missing)}")
+
+        self.store = store
+
+    def run(
+        self,
+        alpha_gw: float,
+        baseflow_limit: float,
+        initial_baseflow: float,
+        initial_saturated_zone_storage: float,
+    ) -> dict:
+        """Evaluate the groundwater recursion for a set of parameters.
+
+        :param alpha_gw: Baseflow Recession Coefficient [-].
+        :type alpha_gw: float
+
+        :param baseflow_limit: Baseflow Threshold [mm].
+        :type baseflow_limit: float
+
+        :param initial_baseflow: Initial Baseflow [mm].
+        :type initial_baseflow: float
+
+        :param initial_saturated_zone_storage: Initial Saturated Zone Storage [mm].
+        :type initial_saturated_zone_storage: float
+
+        :return: The ``(steps, rows, cols)`` series of Baseflow (``bfw``), Saturated Zone
+            Storage (``sat_zone_storage``) and Total Runoff (``rnf``) [mm].
+        :rtype: dict
+        """
+        recharge = self.store.read("rec")
+        recession = np.float32(np.exp(-alpha_gw))
+
+        baseflow = np.empty(recharge.shape, dtype=np.float32)
+        storage = np.empty(recharge.shape, dtype=np.float32)
+        previous_baseflow = np.full(self.store.shape, initial_baseflow, dtype=np.float32)
+        previous_storage = np.full(
+            self.store.shape, initial_saturated_zone_storage, dtype=np.float32
+        )
+
+        for t in range(self.store.steps):
+            current_recharge = recharge[t]
+            np.multiply(previous_baseflow, recession, out=baseflow[t])
+            baseflow[t] += (1 - recession) * current_recharge
+            baseflow[t] *= previous_storage > baseflow_limit
+            np.add(previous_storage, current_recharge, out=storage[t])
+            storage[t] -= baseflow[t]
+            previous_baseflow = baseflow[t]
+            previous_storage = storage[t]
+
+        runoff = self.store.read("srn") + self.store.read("lfw") + baseflow
+
+        return {"bfw": baseflow, "sat_zone_storage": storage, "rnf": runoff}
+
+    def run_from_metadata(self, **overrides) -> dict:
+        """Evaluate the groundwater recursion with the parameters of the cached run.
+
+        :param overrides: Parameters of :meth:`run` replacing the ones of the cached run.
+
+        :return: The same series as :meth:`run`.
+        :rtype: dict
+
+        :raises KeyError: If a parameter is neither stored nor overridden.
+        """
+        parameters = dict(self.store.metadata.get("groundwater", {}))
+        parameters.update(overrides)
+        return self.run(
+            alpha_gw=parameters["alpha_gw"],
+            baseflow_limit=parameters["baseflow_limit"],
+            initial_baseflow=parameters["initial_baseflow"],
+            initial_saturated_zone_storage=parameters["initial_saturated_zone_storage"],
+        )
@@ -0,0 +1,160 @@
+import logging
+import math
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from ._store import ReplayStore
+
+__all__ = ["RoutingReplay", "nash_sutcliffe_efficiency"]
+
+logger = logging.getLogger(__name__)
+
+GOLDEN_RATIO_CONJUGATE = (math.sqrt(5) - 1) / 2
+
+
+def nash_sutcliffe_efficiency(simulated: np.ndarray, observed: np.ndarray) -> float:
+    """Return the Nash-Sutcliffe Efficiency (NSE) of simulated flows.
+
+    The efficiency is computed for each location (last axes) over the timesteps (first axis)
+    with observations, and averaged over the locations with at least two observations.
+
+    :param simulated: The ``(steps, *shape)`` simulated flows.
+    :type simulated: np.ndarray
+
+    :param observed: The ``(steps, *shape)`` observed flows, with ``NaN`` where missing.
+    :type observed: np.ndarray
+
+    :return: The average efficiency, ``NaN`` if no location can be evaluated.
+    :rtype: float
+    """
+    observed = np.asarray(observed, dtype=np.float64)
+    valid = ~np.isnan(observed) & ~np.isnan(simulated)
+    counts = valid.sum(axis=0)
+    obs = np.where(valid, observed, 0.0)
+    sim = np.where(valid, simulated, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = obs.sum(axis=0) / counts
+        residual = ((sim - obs) ** 2).sum(axis=0)
+        variance = (np.where(valid, obs - mean, 0.0) ** 2).sum(axis=0)
+        efficiency = 1 - residual / variance
+
+    efficiency = efficiency[(counts > 1) & (variance > 0)]
+    return float(efficiency.mean()) if efficiency.size else math.nan
+
+
+class RoutingReplay:
+    """Replay of the routing of the runoff from the cached accumulated discharge.
+
+    The Accumulated Total Runoff (ARN) is the last step of the model,
+    ``arn(t) = x * arn(t - 1) + (1 - x) * acc(t)``, where ``acc`` is the accumulated discharge
+    [m³/s] and nothing upstream depends on the Flow Direction Factor ``x``. This class evaluates
+    only that recursion on the cached ``acc`` series, for any number of ``x`` values at once,
+    and calibrates ``x`` against observed flows.
+
+    :param store: Store with the ``acc`` series of a model run.
+    :type store: ReplayStore
+
+    :raises KeyError: If the store does not contain the accumulated discharge series.
+    """
+
+    def __init__(self, store: ReplayStore) -> None:
+        self.logger = logging.getLogger(__name__)
+        if "acc" not in store.variables:
+            self.logger.error("Replay store misses the accumulated discharge series")
+            raise KeyError("Replay store misses the accumulated discharge series")
+
+        self.store = store
+
+    @property
+    def sample_ids(self) -> Optional[list]:
+        """Identifiers of the sample locations of the series, ``None`` for grid series."""
+        return self.store.metadata.get("routing", {}).get("sample_ids")
+
+    def run(self, x: Union[float, np.ndarray]) -> np.ndarray:
+        """Evaluate the routing recursion for one or many Flow Direction Factors.
+
+        :param x: A Flow Direction Factor or a 1D array of them.
+        :type x: Union[float, np.ndarray]
+
+        :return: The Accumulated Total Runoff [m³/s] with shape ``(steps, *shape)`` for a single
+            factor or ``(len(x), steps, *shape)`` for an array of factors.
+        :rtype: np.ndarray
+
+        :raises ValueError: If any factor is outside ``[0, 1]``.
+        """
+        factors = np.asarray(x, dtype=np.float32)
+        if factors.ndim > 1 or np.any((factors < 0) | (factors > 1)):
+            raise ValueError(f"Invalid Flow Direction Factor: {x}")
+
+        accumulated = self.store.read("acc")
+        weights = factors.reshape(factors.shape + (1,) * len(self.store.shape))
+        previous = np.zeros(factors.shape + self.store.shape, dtype=np.float32)
+        runoff = np.empty((self.store.steps,) + previous.shape, dtype=np.float32)
+        for t in range(self.store.steps):
+            np.multiply(weights, previous, out=runoff[t])
+            runoff[t] += (1 - weights) * accumulated[t]
+            previous = runoff[t]
+
+        # Factors first, then timesteps
+        return np.moveaxis(runoff, 0, factors.ndim)
+
+    def calibrate(
+        self,
+        observed: np.ndarray,
+        bounds: tuple = (0.0, 1.0),
+        tolerance: float = 1e-4,
+        objective: Callable = nash_sutcliffe_efficiency,
+    ) -> tuple:
+        """Find the Flow Direction Factor that maximizes the agreement with observed flows.
+
+        Uses a golden-section search, so ``objective`` is assumed unimodal in ``bounds``.
+
+        :param observed: The ``(steps, *shape)`` observed flows [m³/s], with ``NaN`` where
+            missing. For sample series, the columns follow :attr:`sample_ids`.
+        :type observed: np.ndarray
+
+        :param bounds: The interval of the search. Default is ``(0.0, 1.0)``.
+        :type bounds: tuple
+
+        :param tolerance: The width of the final interval. Default is ``1e-4``.
+        :type tolerance: float
+
+        :param objective: Function of ``(simulated, observed)`` to be maximized. Default is
+            :func:`nash_sutcliffe_efficiency`.
+        :type objective: Callable
+
+        :return: The best factor and its objective value.
+        :rtype: tuple
+
+        :raises ValueError: If the observed flows do not match the series shape.
+        """
+        observed = np.asarray(observed)
+        if observed.shape != (self.store.steps, *self.store.shape):
+            raise ValueError(
+                f"Observed flows shape {observed.shape} does not match "
+                f"the series shape {(self.store.steps, *self.store.shape)}"
+            )
+
+        def score(x):
+            return objective(self.run(x), observed)
+
+        lower, upper = bounds
+        inner_lower = upper - GOLDEN_RATIO_CONJUGATE * (upper - lower)
+        inner_upper = lower + GOLDEN_RATIO_CONJUGATE * (upper - lower)
+        score_lower, score_upper = score(inner_lower), score(inner_upper)
+        while upper - lower > tolerance:
+            if score_lower >= score_upper:
+                upper, inner_upper, score_upper = inner_upper, inner_lower, score_lower
+                inner_lower = upper - GOLDEN_RATIO_CONJUGATE * (upper - lower)
+                score_lower = score(inner_lower)
+            else:
+                lower, inner_lower, score_lower = inner_lower, inner_upper, score_upper
+                inner_upper = lower + GOLDEN_RATIO_CONJUGATE * (upper - lower)
+                score_upper = score(inner_upper)
+
+        best = (lower + upper) / 2
+        best_score = score(best)
+        self.logger.info("Calibrated Flow Direction Factor: %f (objective: %f)", best, best_score)
+        return best, best_score
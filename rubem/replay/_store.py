@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+from typing import Optional, Union
+
+import numpy as np
+
+__all__ = ["ReplayStore"]
+
+REPLAY_METADATA_FILE_NAME = "metadata.json"
+REPLAY_SERIES_FILE_EXTENSION = ".npy"
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayStore:
+    """Model series cached on disk to replay parts of the model.
+
+    Each variable is stored as a ``(steps, *shape)`` float32 NumPy array file, with ``NaN`` at
+    missing cells, that is memory-mapped when read. The shape is ``(rows, cols)`` for grid
+    series or ``(samples,)`` for series at sample locations. The ``metadata.json`` file of the
+    store describes the series and the model run that produced them.
+
+    :param path: Directory of an existing store.
+    :type path: Union[str, bytes, os.PathLike]
+
+    :raises FileNotFoundError: If the directory does not contain a store.
+    """
+
+    def __init__(self, path: Union[str, bytes, os.PathLike]) -> None:
+        self.path = str(path)
+        metadata_path = os.path.join(self.path, REPLAY_METADATA_FILE_NAME)
+        if not os.path.isfile(metadata_path):
+            logger.error("Replay store not found: %s", self.path)
+            raise FileNotFoundError(f"Replay store not found: {self.path}")
+
+        with open(metadata_path, mode="r", encoding="utf-8") as f:
+            self.metadata = json.load(f)
+
+        self.__series = {}
+
+    @classmethod
+    def create(
+        cls,
+        path: Union[str, bytes, os.PathLike],
+        variables: list,
+        steps: int,
+        shape: tuple,
+        metadata: Optional[dict] = None,
+    ) -> "ReplayStore":
+        """Create an empty store, replacing the series of the same variables in the directory.
+
+        :param path: Directory of the store. Created if it does not exist.
+        :type path: Union[str, bytes, os.PathLike]
+
+        :param variables: Identifiers of the cached variables (e.g. ``rec``).
+        :type variables: list
+
+        :param steps: Number of timesteps of the series.
+        :type steps: int
+
+        :param shape: Shape of the values at each timestep, ``(rows, cols)`` for a grid.
+        :type shape: tuple
+
+        :param metadata: Additional information about the model run. Default is ``None``.
+        :type metadata: Optional[dict]
+
+        :return: The store opened for writing.
+        :rtype: ReplayStore
+
+        :raises ValueError: If there are no variables, steps or cells.
+        """
+        if not variables:
+            raise ValueError("No variables to cache")
+
+        if steps < 1 or len(shape) not in (1, 2) or min(shape) < 1:
+            raise ValueError(f"Invalid series size: {steps} steps of {shape} cells")
+
+        path = str(path)
+        os.makedirs(path, exist_ok=True)
+        store_metadata = dict(metadata or {})
+        store_metadata.update(
+            {"variables": list(variables), "steps": int(steps), "shape": [int(n) for n in shape]}
+        )
+        with open(os.path.join(path, REPLAY_METADATA_FILE_NAME), mode="w", encoding="utf-8") as f:
+            json.dump(store_metadata, f, indent=4)
+
+        store = cls(path)
+        for variable in variables:
+            series = np.lib.format.open_memmap(
+                store.get_series_path(variable),
+                mode="w+",
+                dtype=np.float32,
+                shape=(steps, *shape),
+            )
+            series[:] = np.nan
+            store.__series[variable] = series
+
+        logger.debug("Replay store created at %s for %s", path, ", ".join(variables))
+        return store
+
+    @property
+    def variables(self) -> list:
+        """Identifiers of the cached variables."""
+        return self.metadata["variables"]
+
+    @property
+    def steps(self) -> int:
+        """Number of timesteps of the series."""
+        return self.metadata["steps"]
+
+    @property
+    def shape(self) -> tuple:
+        """Shape of the values at each timestep."""
+        return tuple(self.metadata["shape"])
+
+    def get_series_path(self, variable: str) -> str:
+        """Return the path of the file of a variable series.
+
+        :param variable: Identifier of the variable.
+        :type variable: str
+
+        :return: The path of the series file.
+        :rtype: str
+        """
+        return os.path.join(self.path, f"{variable}{REPLAY_SERIES_FILE_EXTENSION}")
+
+    def write(self, variable: str, step_index: int, values: np.ndarray) -> None:
+        """Write the values of a variable at a timestep.
+
+        :param variable: Identifier of the variable.
+        :type variable: str
+
+        :param step_index: Zero-based index of the timestep.
+        :type step_index: int
+
+        :param values: The values, with ``NaN`` at missing cells.
+        :type values: np.ndarray
+
+        :raises KeyError: If the store was not created with the variable.
+        """
+        series = self.__series.get(variable)
+        if series is None or series.mode != "r+":
+            raise KeyError(f"Variable not writable in the replay store: {variable}")
+
+        series[step_index] = values
+
+    def read(self, variable: str) -> np.ndarray:
+        """Return the memory-mapped series of a variable.
+
+        :param variable: Identifier of the variable.
+        :type variable: str
+
+        :return: The read-only ``(steps, *shape)`` series.
+        :rtype: np.ndarray
+
+        :raises KeyError: If the variable is not cached in the store.
+        """
+        if variable not in self.variables:
+            raise KeyError(f"Variable not cached in the replay store: {variable}")
+
+        series = self.__series.get(variable)
+        if series is None:
+            series = np.load(self.get_series_path(variable), mmap_mode="r")
+            self.__series[variable] = series
+
+        return series
+
+    def flush(self) -> None:
+        """Write the pending changes of the series to disk."""
+        for series in self.__series.values():
+            if isinstance(series, np.memmap) and series.mode == "r+":
+                series.flush()
@@ -0,0 +1,2 @@
+from ._flow_network import *
+from ._runoff import *
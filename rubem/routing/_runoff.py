@@ -0,0 +1,45 @@
+from typing import Union
+
+import numpy as np
+
+__all__ = ["smooth_runoff"]
+
+
+def smooth_runoff(
+    accumulated: np.ndarray, x: float, initial: Union[float, np.ndarray] = 0.0
+) -> np.ndarray:
+    """Apply the Flow Direction Factor recursion to a whole series of accumulated discharge.
+
+    Evaluates ``arn(t) = x * arn(t - 1) + (1 - x) * acc(t)`` for every timestep at once as a
+    parallel prefix scan: after ``ceil(log2(steps))`` vectorized passes, each timestep holds
+    the discharge of every previous timestep weighted by the powers of ``x``.
+
+    :param accumulated: The ``(steps, ...)`` accumulated discharge [m³/s], with ``NaN`` at
+        missing cells.
+    :type accumulated: np.ndarray
+
+    :param x: The Flow Direction Factor, in ``[0, 1]``.
+    :type x: float
+
+    :param initial: The runoff before the first timestep, e.g. the last timestep of the previous
+        series when a long series is smoothed in chunks. Default is ``0.0``.
+    :type initial: Union[float, np.ndarray]
+
+    :return: The ``(steps, ...)`` Accumulated Total Runoff [m³/s].
+    :rtype: np.ndarray
+
+    :raises ValueError: If ``x`` is outside ``[0, 1]``.
+    """
+    if not 0 <= x <= 1:
+        raise ValueError(f"Invalid Flow Direction Factor: {x}")
+
+    runoff = (1 - x) * np.asarray(accumulated, dtype=np.float64)
+    if runoff.shape[0]:
+        runoff[0] += x * initial
+
+    shift = 1
+    while shift < runoff.shape[0]:
+        runoff[shift:] = runoff[shift:] + x**shift * runoff[:-shift]
+        shift *= 2
+
+    return runoff
@@ -30,3 +30,17 @@ def file_path_cli_arg_validator(path: str):
         )
 
     return path
+
+
+def positive_int_cli_arg_validator(value: str):
+    try:
+        number = int(value)
+    except ValueError as e:
+        logger.error("Specified value %s is not an integer", value)
+        raise argparse.ArgumentTypeError(f'Specified value "{value}" is not an integer.') from e
+
+    if number < 1:
+        logger.error("Specified value %s is not a positive integer", value)
+        raise argparse.ArgumentTypeError(f'Specified value "{value}" is not a positive integer.')
+
+    return number
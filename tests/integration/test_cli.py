@@ -91,12 +91,12 @@ class TestCliApp:
     @pytest.mark.integration
     def test_cli_app_help_ext(self):
         result = subprocess.check_output(["python", "rubem", "--help"])
-        assert b"usage: rubem [-h] -c CONFIGFILE [-V] [-s]" in result
+        assert b"usage: rubem [-h] -c CONFIGFILE [-V] [-s] [-p N] [-w N] [--ingest]" in result
 
     @pytest.mark.integration
     def test_cli_app_help_short(self):
         result = subprocess.check_output(["python", "rubem", "-h"])
-        assert b"usage: rubem [-h] -c CONFIGFILE [-V] [-s]" in result
+        assert b"usage: rubem [-h] -c CONFIGFILE [-V] [-s] [-p N] [-w N] [--ingest]" in result
 
     @pytest.mark.integration
     def test_cli_app_version_ext(self):
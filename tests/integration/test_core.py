@@ -0,0 +1,375 @@
+import copy
+import os
+import tempfile
+
+from osgeo import gdal
+import numpy as np
+import pytest
+
+import pcraster as pcr
+
+from rubem import _dynamic_model
+from rubem.cache import StaticMapCache
+from rubem.configuration.model_configuration import ModelConfiguration
+from rubem.core import DynamicFrameworkWrapper, simulate
+from rubem.file._file_readers import field_to_array
+from rubem.replay import ReplayStore
+from tests.utils import compare_rasters, compare_csv
+from tests.integration.test_cli import TestCliApp
+
+
+class TestSimulate:
+
+    test_data_result_dir = TestCliApp.test_data_result_dir
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_simulate_returns_arrays(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_config = copy.deepcopy(TestCliApp.config)
+            test_config["DIRECTORIES"]["output"] = temp_dir
+
+            results = simulate(test_config, variables=["rnf", "arn"])
+
+            assert len(results.dates) == 2
+            assert not os.path.exists(os.path.join(temp_dir, "arn00000.001"))
+            assert results.sample_ids is not None
+            for variable in ["rnf", "arn"]:
+                assert results.samples[variable].shape == (2, len(results.sample_ids))
+                for step in range(2):
+                    expected = gdal.Open(
+                        os.path.join(self.test_data_result_dir, f"{variable}00000.00{step + 1}")
+                    ).ReadAsArray()
+                    actual = results.rasters[variable][step]
+                    is_valid = ~np.isnan(actual)
+                    assert np.allclose(actual[is_valid], expected[is_valid], atol=1e-5)
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_simulate_overrides(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_config = copy.deepcopy(TestCliApp.config)
+            test_config["DIRECTORIES"]["output"] = temp_dir
+
+            base = simulate(test_config, variables=["arn"], collect_rasters=False)
+            routed = simulate(
+                test_config,
+                overrides={"CALIBRATION": {"x": 0.9}},
+                variables=["arn"],
+                collect_rasters=False,
+            )
+
+            assert not base.rasters
+            assert not np.allclose(base.samples["arn"], routed.samples["arn"])
+
+
+class TestIntegerRasters:
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_simulate_int16_geotiff_dem(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # SRTM DEMs are distributed as Int16 GeoTIFF files
+            dem = os.path.join(temp_dir, "dem.tif")
+            gdal.Translate(
+                dem,
+                TestCliApp.config["RASTERS"]["dem"],
+                format="GTiff",
+                outputType=gdal.GDT_Int16,
+                noData=-32768,
+            )
+            test_config = copy.deepcopy(TestCliApp.config)
+            test_config["DIRECTORIES"]["output"] = temp_dir
+            test_config["RASTERS"]["dem"] = dem
+            del test_config["RASTERS"]["ldd"]
+
+            results = simulate(test_config, variables=["rnf"])
+
+            assert np.any(np.isfinite(results.rasters["rnf"]))
+
+
+class TestSimulationDomain:
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_clip_to_samples_catchment_matches_full_grid(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_config = copy.deepcopy(TestCliApp.config)
+            test_config["DIRECTORIES"]["output"] = temp_dir
+
+            full = simulate(test_config, variables=["arn"])
+            test_config["DOMAIN"] = {"clip_to_samples_catchment": True}
+            clipped = simulate(test_config, variables=["arn"])
+
+            np.testing.assert_array_equal(clipped.sample_ids, full.sample_ids)
+            np.testing.assert_allclose(clipped.samples["arn"], full.samples["arn"], rtol=1e-5)
+
+            # The cells of the catchment keep the values of the full grid
+            row_offset, col_offset = clipped.offset
+            steps, rows, cols = clipped.rasters["arn"].shape
+            window = full.rasters["arn"][
+                :, row_offset : row_offset + rows, col_offset : col_offset + cols
+            ]
+            assert window.shape == (steps, rows, cols)
+            is_valid = ~np.isnan(clipped.rasters["arn"])
+            assert np.any(is_valid)
+            np.testing.assert_allclose(
+                clipped.rasters["arn"][is_valid], window[is_valid], rtol=1e-5
+            )
+
+
+class TestPreviewRun:
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_preview_run_coarsens_grid(self):
+        variables = {
+            "itp": "Interception",
+            "eta": "Actual Evapotranspiration",
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_config = copy.deepcopy(TestCliApp.config)
+            test_config["DIRECTORIES"]["output"] = temp_dir
+            full = simulate(test_config, variables=list(variables))
+            test_config["DOMAIN"] = {"preview_factor": 2}
+            preview = simulate(test_config, variables=list(variables), write_outputs=True)
+
+            _, rows, cols = full.rasters["itp"].shape
+            assert preview.rasters["itp"].shape == (2, rows // 2, cols // 2)
+            dataset = gdal.Open(os.path.join(temp_dir, "itp00000.001"))
+            assert (dataset.RasterYSize, dataset.RasterXSize) == (rows // 2, cols // 2)
+            assert dataset.GetGeoTransform()[1] == 2 * float(test_config["GRID"]["grid"])
+
+            assert preview.basin_totals
+            assert all(np.isfinite(total) for total in preview.basin_totals.values())
+            cell_area = float(test_config["GRID"]["grid"]) ** 2
+            for variable, name in variables.items():
+                # Depths [mm] over the cells of the full grid, as volumes [m3]
+                full_total = np.nansum(full.rasters[variable]) * cell_area * 0.001
+                assert preview.basin_totals[name] == pytest.approx(full_total, rel=0.2)
+
+
+class TestRoutingEngines:
+
+    def run_engine(self, output_dir, engine):
+        test_config = copy.deepcopy(TestCliApp.config)
+        test_config["DIRECTORIES"]["output"] = output_dir
+        test_config["ROUTING"] = {"engine": engine}
+        return simulate(test_config, variables=["arn"])
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    @pytest.mark.parametrize("engine", ["numpy", "batch"])
+    def test_routing_engine_matches_pcraster(self, engine, monkeypatch):
+        # Route each timestep of the batch engine in its own chunk
+        monkeypatch.setattr(_dynamic_model, "ROUTING_CHUNK_BYTES", 1)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            expected = self.run_engine(temp_dir, "pcraster")
+            actual = self.run_engine(temp_dir, engine)
+
+            np.testing.assert_array_equal(
+                np.isnan(actual.rasters["arn"]), np.isnan(expected.rasters["arn"])
+            )
+            is_valid = ~np.isnan(expected.rasters["arn"])
+            assert np.allclose(
+                actual.rasters["arn"][is_valid], expected.rasters["arn"][is_valid], rtol=1e-5
+            )
+            assert np.allclose(actual.samples["arn"], expected.samples["arn"], rtol=1e-5)
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_batch_engine_outputs_match_pcraster(self, monkeypatch):
+        monkeypatch.setattr(_dynamic_model, "ROUTING_CHUNK_BYTES", 1)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dirs = {}
+            for engine in ["pcraster", "batch"]:
+                output_dirs[engine] = os.path.join(temp_dir, engine)
+                os.makedirs(output_dirs[engine])
+                test_config = copy.deepcopy(TestCliApp.config)
+                test_config["DIRECTORIES"]["output"] = output_dirs[engine]
+                test_config["ROUTING"] = {"engine": engine}
+                test_config["REPLAY_CACHE"] = {"routing": "grid"}
+                DynamicFrameworkWrapper(
+                    ModelConfiguration(test_config, validate_input=False), write_outputs=True
+                ).run()
+
+            for step in range(2):
+                raster_file = f"arn00000.00{step + 1}"
+                assert compare_rasters(
+                    os.path.join(output_dirs["batch"], raster_file),
+                    os.path.join(output_dirs["pcraster"], raster_file),
+                    tolerance=1e-4,
+                )
+
+            assert compare_csv(
+                os.path.join(output_dirs["batch"], "tss_arn.csv"),
+                os.path.join(output_dirs["pcraster"], "tss_arn.csv"),
+                tolerance=1e-4,
+            )
+            accumulated = {
+                engine: ReplayStore(os.path.join(path, "replay", "routing")).read("acc")
+                for engine, path in output_dirs.items()
+            }
+            np.testing.assert_allclose(
+                accumulated["batch"], accumulated["pcraster"], rtol=1e-5, equal_nan=True
+            )
+
+
+class TestDecomposedRun:
+
+    test_data_result_dir = TestCliApp.test_data_result_dir
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    @pytest.mark.parametrize(
+        "forcing_transforms",
+        [None, {"precipitation": {"noise_std": 0.2, "seed": 7}}],
+    )
+    def test_run_decomposed_matches_single_process(self, forcing_transforms):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dirs = {}
+            models = {}
+            for workers in [1, 2]:
+                output_dirs[workers] = os.path.join(temp_dir, f"workers{workers}")
+                os.makedirs(output_dirs[workers])
+                test_config = copy.deepcopy(TestCliApp.config)
+                test_config["DIRECTORIES"]["output"] = output_dirs[workers]
+                test_config["DOMAIN"] = {"workers": workers}
+                if forcing_transforms:
+                    test_config["FORCING_TRANSFORMS"] = forcing_transforms
+
+                models[workers] = DynamicFrameworkWrapper(
+                    ModelConfiguration(test_config, validate_input=False), write_outputs=True
+                )
+                models[workers].run()
+
+            # A single drainage basin would be simulated in this process
+            assert models[2].is_decomposed
+            assert not [f for f in os.listdir(output_dirs[2]) if f.startswith(".rubem-partitions-")]
+            for variable in ["rnf", "arn"]:
+                for step in range(2):
+                    raster_file = f"{variable}00000.00{step + 1}"
+                    assert compare_rasters(
+                        os.path.join(output_dirs[2], raster_file),
+                        os.path.join(output_dirs[1], raster_file),
+                    )
+                    if not forcing_transforms:
+                        assert compare_rasters(
+                            os.path.join(output_dirs[2], raster_file),
+                            os.path.join(self.test_data_result_dir, raster_file),
+                        )
+
+                table_file = f"tss_{variable}.csv"
+                assert compare_csv(
+                    os.path.join(output_dirs[2], table_file),
+                    os.path.join(output_dirs[1], table_file),
+                )
+
+
+class TestStaticMapCache:
+
+    static_maps = [
+        "ndvi_max",
+        "ndvi_min",
+        "min_reflectances_simple_ratio",
+        "max_reflectances_simple_ratio",
+        "soil_hydraulic_conductivity_coef",
+        "soil_bulk_density",
+        "soil_rootzone_depth",
+        "soil_moist_content_sat_point",
+        "soil_moistute_content_wilting_point",
+        "soil_moisture_content_field_capacity",
+    ]
+
+    def run_model(self, test_config, static_map_cache=None):
+        model = DynamicFrameworkWrapper(
+            ModelConfiguration(test_config, validate_input=False),
+            write_outputs=False,
+            static_map_cache=static_map_cache,
+        )
+        model.run()
+        return {
+            name: field_to_array(getattr(model.dynamic_model_concept, name), pcr.Scalar)
+            for name in self.static_maps
+        }
+
+    def get_keys(self, static_map_cache, monkeypatch):
+        keys = {}
+        key = static_map_cache.key
+
+        def record_key(files, extra=None):
+            keys[extra["name"]] = key(files, extra=extra)
+            return keys[extra["name"]]
+
+        monkeypatch.setattr(static_map_cache, "key", record_key)
+        return keys
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_static_map_cache_loads_derived_maps(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_config = copy.deepcopy(TestCliApp.config)
+            test_config["DIRECTORIES"]["output"] = temp_dir
+            static_map_cache = StaticMapCache(os.path.join(temp_dir, "cache"), max_size=10**9)
+
+            derived = self.run_model(test_config)
+            _ = self.run_model(test_config, static_map_cache)
+            loaded = []
+            load = static_map_cache.load
+
+            def record_load(key, names):
+                loaded.append(load(key, names) is not None)
+                return loaded[-1]
+
+            monkeypatch.setattr(static_map_cache, "load", record_load)
+            cached = self.run_model(test_config, static_map_cache)
+
+            # The terrain, NDVI and soil groups
+            assert loaded == [True, True, True]
+            for name in self.static_maps:
+                np.testing.assert_array_equal(cached[name], derived[name])
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_static_map_cache_key_covers_soil_tables(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_config = copy.deepcopy(TestCliApp.config)
+            test_config["DIRECTORIES"]["output"] = temp_dir
+            static_map_cache = StaticMapCache(os.path.join(temp_dir, "cache"), max_size=10**9)
+            keys = self.get_keys(static_map_cache, monkeypatch)
+            _ = self.run_model(test_config, static_map_cache)
+            base_keys = dict(keys)
+
+            # A lookup table with a different wilting point for the first soil class
+            t_wp = np.loadtxt(test_config["TABLES"]["t_wp"])
+            t_wp[0, 1] += 0.01
+            test_config["TABLES"]["t_wp"] = os.path.join(temp_dir, "Tw.txt")
+            np.savetxt(test_config["TABLES"]["t_wp"], t_wp, fmt=["%d", "%g"])
+            _ = self.run_model(test_config, static_map_cache)
+
+            assert keys["soil"] != base_keys["soil"]
+            assert keys["NDVI"] == base_keys["NDVI"]
+            assert keys["terrain"] == base_keys["terrain"]
+
+            # The same soil parameters, from a single table
+            columns = ["bulk_density", "k_sat", "t_fcap", "t_sat", "t_wp", "rootzone_depth"]
+            tables = [np.loadtxt(test_config["TABLES"].pop(column)) for column in columns]
+            parameters = np.column_stack([tables[0][:, 0], *[table[:, 1] for table in tables]])
+            soil_keys = []
+            for file_name in ["soil.csv", "new_soil.csv"]:
+                test_config["TABLES"]["soil_parameters"] = os.path.join(temp_dir, file_name)
+                np.savetxt(
+                    test_config["TABLES"]["soil_parameters"],
+                    parameters,
+                    fmt=["%d"] + ["%g"] * len(columns),
+                    delimiter=",",
+                    header=",".join(["class", *columns]),
+                    comments="",
+                )
+                _ = self.run_model(test_config, static_map_cache)
+                soil_keys.append(keys["soil"])
+                # A different bulk density for the first soil class
+                parameters[0, 1] += 0.01
+
+            assert soil_keys[0] != soil_keys[1]
+            assert keys["NDVI"] == base_keys["NDVI"]
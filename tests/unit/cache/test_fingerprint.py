@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from rubem.cache import FileHasher, compute_fingerprint
+
+
+@pytest.fixture
+def settings(tmp_path):
+    (tmp_path / "dem.map").write_bytes(b"dem")
+    (tmp_path / "rain").mkdir()
+    (tmp_path / "rain" / "prec0000.001").write_bytes(b"1")
+    return {
+        "RASTERS": {"dem": str(tmp_path / "dem.map")},
+        "DIRECTORIES": {"prec": str(tmp_path / "rain"), "output": str(tmp_path / "out")},
+        "CALIBRATION": {"x": 0.5},
+    }
+
+
+class TestComputeFingerprint:
+
+    @pytest.mark.unit
+    def test_fingerprint_is_stable(self, settings):
+        assert compute_fingerprint(settings) == compute_fingerprint(
+            dict(reversed(settings.items()))
+        )
+
+    @pytest.mark.unit
+    def test_fingerprint_ignores_output_directory(self, settings):
+        fingerprint = compute_fingerprint(settings)
+        settings["DIRECTORIES"]["output"] = "/elsewhere"
+        assert compute_fingerprint(settings) == fingerprint
+
+    @pytest.mark.unit
+    def test_fingerprint_ignores_input_location(self, settings, tmp_path):
+        fingerprint = compute_fingerprint(settings)
+        os.rename(tmp_path / "dem.map", tmp_path / "moved.map")
+        settings["RASTERS"]["dem"] = str(tmp_path / "moved.map")
+        assert compute_fingerprint(settings) == fingerprint
+
+    @pytest.mark.unit
+    def test_fingerprint_changes(self, settings, tmp_path):
+        fingerprint = compute_fingerprint(settings)
+        assert compute_fingerprint(settings, value_ranges={"x": 1}) != fingerprint
+        assert compute_fingerprint(settings, extra={"release": "1"}) != fingerprint
+
+        (tmp_path / "rain" / "prec0000.002").write_bytes(b"2")
+        assert compute_fingerprint(settings) != fingerprint
+
+        changed = compute_fingerprint(settings)
+        settings["CALIBRATION"]["x"] = 0.6
+        assert compute_fingerprint(settings) != changed
+
+    @pytest.mark.unit
+    def test_fingerprint_hashes_netcdf_series_variable(self, settings, tmp_path):
+        (tmp_path / "prec.nc").write_bytes(b"netcdf")
+        settings["DIRECTORIES"]["prec"] = f"{tmp_path / 'prec.nc'}:precip"
+        fingerprint = compute_fingerprint(settings)
+
+        (tmp_path / "prec.nc").write_bytes(b"new netcdf")
+        changed = compute_fingerprint(settings)
+        assert changed != fingerprint
+
+        settings["DIRECTORIES"]["prec"] = f"{tmp_path / 'prec.nc'}:pr"
+        assert compute_fingerprint(settings) != changed
+
+    @pytest.mark.unit
+    def test_fingerprint_hashes_series_manifest_files(self, settings, tmp_path):
+        (tmp_path / "maps").mkdir()
+        (tmp_path / "maps" / "jan2000.tif").write_bytes(b"jan")
+        (tmp_path / "prec.json").write_text(
+            json.dumps({"version": 1, "files": {"2000-01": "maps/jan2000.tif"}})
+        )
+        settings["DIRECTORIES"]["prec"] = str(tmp_path / "prec.json")
+        fingerprint = compute_fingerprint(settings)
+
+        (tmp_path / "maps" / "jan2000.tif").write_bytes(b"new jan")
+        assert compute_fingerprint(settings) != fingerprint
+
+
+class TestFileHasher:
+
+    @pytest.mark.unit
+    def test_file_hasher_memo(self, tmp_path):
+        file_path = tmp_path / "a.txt"
+        file_path.write_bytes(b"content")
+        memo_path = tmp_path / "memo.json"
+
+        hasher = FileHasher(memo_path)
+        digest = hasher.hash_file(file_path)
+        hasher.save()
+        assert memo_path.is_file()
+
+        assert FileHasher(memo_path).hash_file(file_path) == digest
+        file_path.write_bytes(b"other content")
+        assert FileHasher(memo_path).hash_file(file_path) != digest
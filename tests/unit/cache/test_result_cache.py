@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from rubem.cache import ResultCache
+
+
+def write_outputs(path, name, size):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, name), mode="wb") as f:
+        f.write(b"x" * size)
+
+
+class TestResultCache:
+
+    @pytest.mark.unit
+    def test_result_cache_store_and_restore(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_size=1000)
+        write_outputs(tmp_path / "run", "arn00000.001", 10)
+        write_outputs(tmp_path / "run" / "replay", "acc.npy", 5)
+
+        assert not cache.restore("a", tmp_path / "restored")
+        cache.store("a", tmp_path / "run", ["arn00000.001", os.path.join("replay", "acc.npy")])
+
+        assert cache.restore("a", tmp_path / "restored")
+        assert (tmp_path / "restored" / "arn00000.001").read_bytes() == b"x" * 10
+        assert (tmp_path / "restored" / "replay" / "acc.npy").is_file()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("link_outputs, links", [(True, 2), (False, 1)])
+    def test_result_cache_link_outputs(self, tmp_path, link_outputs, links):
+        cache = ResultCache(tmp_path / "cache", max_size=1000, link_outputs=link_outputs)
+        write_outputs(tmp_path / "run", "arn00000.001", 10)
+        cache.store("a", tmp_path / "run", ["arn00000.001"])
+
+        cache.restore("a", tmp_path / "restored")
+        assert os.stat(tmp_path / "restored" / "arn00000.001").st_nlink == links
+
+    @pytest.mark.unit
+    def test_result_cache_run_after_linked_restore(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_size=1000, link_outputs=True)
+        write_outputs(tmp_path / "run", "arn00000.001", 10)
+        cache.store("a", tmp_path / "run", ["arn00000.001"])
+        assert cache.restore("a", tmp_path / "output")
+
+        # A different run in the same output directory rewrites the file in place
+        cache.detach_outputs(tmp_path / "output")
+        with open(tmp_path / "output" / "arn00000.001", mode="w", encoding="utf-8") as f:
+            f.write("other run")
+        cache.store("b", tmp_path / "output", ["arn00000.001"])
+
+        assert cache.restore("a", tmp_path / "output")
+        assert (tmp_path / "output" / "arn00000.001").read_bytes() == b"x" * 10
+        assert cache.restore("b", tmp_path / "restored")
+        assert (tmp_path / "restored" / "arn00000.001").read_text() == "other run"
+
+    @pytest.mark.unit
+    def test_result_cache_copies_outputs_by_default(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_size=1000)
+        write_outputs(tmp_path / "run", "arn00000.001", 10)
+        cache.store("a", tmp_path / "run", ["arn00000.001"])
+
+        cache.restore("a", tmp_path / "output")
+        with open(tmp_path / "output" / "arn00000.001", mode="w", encoding="utf-8") as f:
+            f.write("other run")
+
+        assert cache.restore("a", tmp_path / "restored")
+        assert (tmp_path / "restored" / "arn00000.001").read_bytes() == b"x" * 10
+
+    @pytest.mark.unit
+    def test_result_cache_evicts_least_recently_used(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_size=25)
+        for fingerprint in ["a", "b"]:
+            write_outputs(tmp_path / fingerprint, "out", 10)
+            cache.store(fingerprint, tmp_path / fingerprint, ["out"])
+
+        assert cache.restore("a", tmp_path / "restored")
+        write_outputs(tmp_path / "c", "out", 10)
+        cache.store("c", tmp_path / "c", ["out"])
+
+        assert cache.restore("a", tmp_path / "restored")
+        assert not cache.restore("b", tmp_path / "restored")
+        assert cache.restore("c", tmp_path / "restored")
+        assert not os.path.exists(cache.get_entry_path("b"))
+
+    @pytest.mark.unit
+    def test_result_cache_skips_oversized_results(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_size=5)
+        write_outputs(tmp_path / "run", "out", 10)
+        cache.store("a", tmp_path / "run", ["out"])
+        assert not cache.restore("a", tmp_path / "restored")
+
+    @pytest.mark.unit
+    def test_result_cache_bad_args(self, tmp_path):
+        with pytest.raises(ValueError):
+            _ = ResultCache(tmp_path, max_size=0)
+
+    @pytest.mark.unit
+    def test_result_cache_from_settings(self, tmp_path):
+        assert ResultCache.from_settings(None) is None
+        assert ResultCache.from_settings({"enabled": False}) is None
+
+        cache = ResultCache.from_settings(
+            {"enabled": True, "path": str(tmp_path), "max_size_mb": 1, "link_outputs": False}
+        )
+        assert cache.path == str(tmp_path)
+        assert cache.max_size == 1024 * 1024
+        assert not cache.link_outputs
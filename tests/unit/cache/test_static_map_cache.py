@@ -0,0 +1,71 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from rubem.cache import StaticMapCache
+
+
+class TestStaticMapCache:
+
+    @pytest.mark.unit
+    def test_static_map_cache_save_and_load(self, tmp_path):
+        cache = StaticMapCache(tmp_path / "cache", max_size=10000)
+        ldd = np.array([[2, 5], [8, 255]], dtype=np.uint8)
+        slope = np.array([[0.1, 0.2], [0.3, -9999.0]], dtype=np.float32)
+
+        assert cache.load("a", ["ldd", "slope"]) is None
+        cache.save("a", {"ldd": ldd, "slope": slope})
+
+        maps = cache.load("a", ["ldd", "slope"])
+        np.testing.assert_array_equal(maps["ldd"], ldd)
+        np.testing.assert_array_equal(maps["slope"], slope)
+        assert isinstance(maps["slope"], np.memmap)
+        assert cache.load("a", ["ldd", "smc"]) is None
+
+    @pytest.mark.unit
+    def test_static_map_cache_key(self, tmp_path):
+        cache = StaticMapCache(tmp_path / "cache", max_size=10000)
+        dem = tmp_path / "dem.map"
+        dem.write_bytes(b"dem")
+
+        key = cache.key({"dem": str(dem), "ldd": None}, extra={"rows": 2})
+
+        assert key == cache.key({"dem": str(dem)}, extra={"rows": 2})
+        assert key != cache.key({"dem": str(dem)}, extra={"rows": 3})
+        dem.write_bytes(b"new dem")
+        assert key != cache.key({"dem": str(dem)}, extra={"rows": 2})
+
+    @pytest.mark.unit
+    def test_static_map_cache_evicts_least_recently_used(self, tmp_path):
+        maps = {"slope": np.zeros(100, dtype=np.float32)}
+        entry_size = 400 + 128
+        cache = StaticMapCache(tmp_path / "cache", max_size=int(2.5 * entry_size))
+        cache.save("a", maps)
+        cache.save("b", maps)
+        past = time.time() - 100
+        os.utime(cache.get_entry_path("b"), (past, past))
+        os.utime(cache.get_entry_path("a"), (past + 1, past + 1))
+
+        cache.save("c", maps)
+
+        assert cache.load("a", ["slope"]) is not None
+        assert cache.load("b", ["slope"]) is None
+        assert cache.load("c", ["slope"]) is not None
+
+    @pytest.mark.unit
+    def test_static_map_cache_bad_args(self, tmp_path):
+        with pytest.raises(ValueError):
+            _ = StaticMapCache(tmp_path, max_size=0)
+
+    @pytest.mark.unit
+    def test_static_map_cache_from_settings(self, tmp_path):
+        assert StaticMapCache.from_settings(None) is None
+        assert StaticMapCache.from_settings({"enabled": False}) is None
+
+        cache = StaticMapCache.from_settings(
+            {"enabled": True, "path": str(tmp_path), "max_size_mb": 1}
+        )
+        assert cache.path == str(tmp_path)
+        assert cache.max_size == 1024 * 1024
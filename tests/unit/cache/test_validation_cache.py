@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from rubem.cache import ValidationCache
+from rubem.validation.raster_data_rules import RasterDataRules
+
+
+class TestValidationCache:
+
+    @pytest.mark.unit
+    def test_validation_cache_put_and_get(self, tmp_path):
+        cache = ValidationCache(tmp_path / "cache")
+        raster = tmp_path / "dem.map"
+        raster.write_bytes(b"dem")
+        valid_range = {"min": 0.0, "max": 10.0}
+        rules = RasterDataRules.FORBID_NO_DATA | RasterDataRules.FORBID_ALL_ZEROES
+        result = {"num_bands": 1, "errors": ["FORBID_ALL_ZEROES"]}
+
+        assert cache.get(raster, valid_range, rules) is None
+        cache.put(raster, valid_range, rules, result)
+
+        assert cache.get(raster, valid_range, rules) == result
+        assert cache.get(raster, {"min": 0.0, "max": 20.0}, rules) is None
+        assert cache.get(raster, valid_range, RasterDataRules.FORBID_NO_DATA) is None
+        assert cache.get(tmp_path / "missing.map", valid_range, rules) is None
+        assert (cache.hits, cache.misses) == (1, 4)
+
+    @pytest.mark.unit
+    def test_validation_cache_persistence(self, tmp_path):
+        raster = tmp_path / "dem.map"
+        raster.write_bytes(b"dem")
+        valid_range = {"min": 0.0, "max": 10.0}
+        rules = RasterDataRules.FORBID_NO_DATA
+        result = {"num_bands": 1, "errors": []}
+
+        cache = ValidationCache(tmp_path / "cache")
+        cache.put(raster, valid_range, rules, result)
+        cache.save()
+
+        assert ValidationCache(tmp_path / "cache").get(raster, valid_range, rules) == result
+
+        # Same contents with a new modification time
+        os.utime(raster, ns=(0, 0))
+        assert ValidationCache(tmp_path / "cache").get(raster, valid_range, rules) == result
+
+        raster.write_bytes(b"new dem")
+        assert ValidationCache(tmp_path / "cache").get(raster, valid_range, rules) is None
+
+    @pytest.mark.unit
+    def test_validation_cache_ignores_invalid_store(self, tmp_path):
+        (tmp_path / "cache").mkdir()
+        (tmp_path / "cache" / "validation_results.json").write_text("{")
+        raster = tmp_path / "dem.map"
+        raster.write_bytes(b"dem")
+
+        cache = ValidationCache(tmp_path / "cache")
+
+        assert cache.get(raster, {"min": 0.0, "max": 10.0}, RasterDataRules.FORBID_NO_DATA) is None
+
+    @pytest.mark.unit
+    def test_validation_cache_from_settings(self, tmp_path):
+        assert ValidationCache.from_settings(None) is None
+        assert ValidationCache.from_settings({"enabled": False}) is None
+
+        cache = ValidationCache.from_settings({"enabled": True, "path": str(tmp_path / "cache")})
+
+        assert cache.path == str(tmp_path / "cache")
+        assert os.path.isdir(cache.path)
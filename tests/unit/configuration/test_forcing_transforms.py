@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from rubem.configuration.forcing_transforms import ForcingTransform
+
+
+class TestForcingTransform:
+
+    @pytest.mark.unit
+    def test_forcing_transform_monthly_factors_and_deltas(self):
+        transform = ForcingTransform(
+            monthly_factors=[1.0] * 5 + [2.0] + [1.0] * 6,
+            monthly_deltas=[0.0] * 5 + [-15.0] + [0.0] * 6,
+        )
+        array = np.array([[10.0, 5.0], [-9999.0, 0.0]], dtype=np.float32)
+
+        result = transform.apply(array, month=6, timestep=6)
+
+        np.testing.assert_allclose(result, [[5.0, 0.0], [-9999.0, 0.0]])
+        np.testing.assert_allclose(transform.apply(array, month=1, timestep=1), array)
+
+    @pytest.mark.unit
+    def test_forcing_transform_zone_factors(self, fs):
+        fs.create_file("/path/to/zones.map", contents="42")
+        transform = ForcingTransform(zones="/path/to/zones.map", zone_factors={"1": 0.5, "3": 2})
+
+        factors = transform.get_zone_factors(np.array([[1, 2], [3, -2147483648]]))
+        result = transform.apply(np.full((2, 2), 10.0), month=1, timestep=1, zone_factors=factors)
+
+        np.testing.assert_allclose(factors, [[0.5, 1.0], [2.0, 1.0]])
+        np.testing.assert_allclose(result, [[5.0, 10.0], [20.0, 10.0]])
+
+    @pytest.mark.unit
+    def test_forcing_transform_noise_is_reproducible(self):
+        transform = ForcingTransform(noise_std=0.1, seed=42)
+        array = np.full((50, 50), 100.0, dtype=np.float32)
+
+        result = transform.apply(array, month=1, timestep=3)
+
+        np.testing.assert_array_equal(result, transform.apply(array, month=1, timestep=3))
+        assert not np.array_equal(result, transform.apply(array, month=1, timestep=4))
+        assert not np.array_equal(
+            result, transform.apply(array, month=1, timestep=3, series_index=1)
+        )
+        assert abs(result.mean() - 100.0) < 1.0
+        assert result.min() >= 0.0
+
+    @pytest.mark.unit
+    def test_forcing_transform_noise_of_window(self):
+        transform = ForcingTransform(noise_std=0.1, seed=42)
+        array = np.full((50, 40), 100.0, dtype=np.float32)
+
+        result = transform.apply(array, month=1, timestep=3)
+        window = transform.apply(
+            array[10:20, 5:30], month=1, timestep=3, offset=(10, 5), grid_shape=(50, 40)
+        )
+        other_window = transform.apply(
+            array[20:30, 5:30], month=1, timestep=3, offset=(20, 5), grid_shape=(50, 40)
+        )
+
+        np.testing.assert_array_equal(window, result[10:20, 5:30])
+        assert not np.array_equal(window, other_window)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "settings",
+        [
+            {"monthly_factors": [1.0] * 11},
+            {"monthly_deltas": [0.0] * 13},
+            {"monthly_factors": [-1.0] * 12},
+            {"zone_factors": {1: 1.5}},
+            {"noise_std": -0.1},
+        ],
+    )
+    def test_forcing_transform_invalid_settings(self, settings):
+        with pytest.raises(ValueError):
+            ForcingTransform(**settings)
+
+    @pytest.mark.unit
+    def test_forcing_transform_zones_not_found(self):
+        with pytest.raises(FileNotFoundError):
+            ForcingTransform(zones="/not/found/zones.map", zone_factors={1: 1.5})
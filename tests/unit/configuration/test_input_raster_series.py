@@ -1,7 +1,204 @@
+import os
+
 import pytest
 
+from rubem.cache import ValidationCache
+from rubem.configuration import input_raster_series
 from rubem.configuration.input_raster_series import InputRasterSeries
+from rubem.validation.raster_data_rules import RasterDataRules
 
 
 class TestInputRasterSeries:
-    pass
+
+    @pytest.mark.unit
+    def test_input_raster_series_stack_paths(self, tmp_path):
+        series = InputRasterSeries(
+            etp=str(tmp_path / "etp.tif"),
+            etp_filename_prefix="",
+            precipitation=str(tmp_path / "prec"),
+            precipitation_filename_prefix="prec",
+            ndvi=str(tmp_path / "ndvi.tiff"),
+            ndvi_filename_prefix="ignored",
+            kp=str(tmp_path / "kp"),
+            kp_filename_prefix="kp",
+            landuse=str(tmp_path / "lulc"),
+            landuse_filename_prefix="cob",
+            validate_input=False,
+        )
+
+        assert series.etp == os.path.abspath(tmp_path / "etp.tif")
+        assert series.ndvi == os.path.abspath(tmp_path / "ndvi.tiff")
+        assert series.precipitation == os.path.abspath(tmp_path / "prec" / "prec")
+
+    @pytest.mark.unit
+    def test_input_raster_series_missing_prefix(self, tmp_path):
+        with pytest.raises(ValueError):
+            InputRasterSeries(
+                etp=str(tmp_path / "etp"),
+                etp_filename_prefix="",
+                precipitation=str(tmp_path / "prec"),
+                precipitation_filename_prefix="prec",
+                ndvi=str(tmp_path / "ndvi"),
+                ndvi_filename_prefix="ndvi",
+                kp=str(tmp_path / "kp"),
+                kp_filename_prefix="kp",
+                landuse=str(tmp_path / "lulc"),
+                landuse_filename_prefix="cob",
+                validate_input=False,
+            )
+
+    def create_series(self, tmp_path):
+        series = {}
+        for name, prefix in (
+            ("etp", "etp"),
+            ("prec", "prec"),
+            ("ndvi", "ndvi"),
+            ("kp", "kp"),
+            ("lulc", "cob"),
+        ):
+            directory = tmp_path / name
+            directory.mkdir()
+            for step in (2, 1):
+                (directory / f"{prefix.ljust(8, '0')}.00{step}").touch()
+
+            series[name] = (str(directory), prefix)
+
+        return series
+
+    @pytest.fixture
+    def validated_files(self, monkeypatch):
+        validated_files = []
+
+        def fake_validate_raster_file(file, valid_range, rules):
+            validated_files.append(os.path.basename(file))
+            return 1, ["invalid"] if os.path.basename(file).startswith("prec") else []
+
+        class FakeExecutor:
+            def __init__(self, max_workers):
+                validated_files.append(f"workers={max_workers}")
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def map(self, func, *iterables, chunksize=1):
+                # Results are returned in the order of the tasks, whatever their completion order
+                results = [func(*args) for args in reversed(list(zip(*iterables)))]
+                return reversed(results)
+
+        monkeypatch.setattr(input_raster_series, "validate_raster_file", fake_validate_raster_file)
+        monkeypatch.setattr(input_raster_series, "ProcessPoolExecutor", FakeExecutor)
+        return validated_files
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_input_raster_series_validation_order(self, tmp_path, validated_files, workers):
+        files = self.create_series(tmp_path)
+
+        series = InputRasterSeries(
+            etp=files["etp"][0],
+            etp_filename_prefix=files["etp"][1],
+            precipitation=files["prec"][0],
+            precipitation_filename_prefix=files["prec"][1],
+            ndvi=files["ndvi"][0],
+            ndvi_filename_prefix=files["ndvi"][1],
+            kp=files["kp"][0],
+            kp_filename_prefix=files["kp"][1],
+            landuse=files["lulc"][0],
+            landuse_filename_prefix=files["lulc"][1],
+            validation_workers=workers,
+        )
+
+        assert (workers > 1) == ("workers=4" in validated_files)
+        assert len([file for file in validated_files if "." in file]) == 10
+        assert [problem["file"] for problem in series.problems] == [
+            os.path.join(files["prec"][0], "prec0000.001"),
+            os.path.join(files["prec"][0], "prec0000.002"),
+        ]
+        assert series.problems[0]["reason"] == "Data rules violation(s): ['invalid']"
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_input_raster_series_validation_shared_files(
+        self, tmp_path, validated_files, monkeypatch, workers
+    ):
+        files = self.create_series(tmp_path)
+
+        def fake_validate_raster_file(file, valid_range, rules):
+            validated_files.append(os.path.basename(file))
+            return 1, ["all zeroes"] if RasterDataRules.FORBID_ALL_ZEROES in rules else []
+
+        monkeypatch.setattr(input_raster_series, "validate_raster_file", fake_validate_raster_file)
+
+        # The land use series is read from the files of the ETP series
+        series = InputRasterSeries(
+            etp=files["etp"][0],
+            etp_filename_prefix=files["etp"][1],
+            precipitation=files["prec"][0],
+            precipitation_filename_prefix=files["prec"][1],
+            ndvi=files["ndvi"][0],
+            ndvi_filename_prefix=files["ndvi"][1],
+            kp=files["kp"][0],
+            kp_filename_prefix=files["kp"][1],
+            landuse=files["etp"][0],
+            landuse_filename_prefix=files["etp"][1],
+            validation_workers=workers,
+        )
+
+        assert validated_files.count("etp00000.001") == 2
+        assert [problem["file"] for problem in series.problems] == [
+            os.path.join(files["etp"][0], "etp00000.001"),
+            os.path.join(files["etp"][0], "etp00000.002"),
+        ]
+
+    @pytest.mark.unit
+    def test_input_raster_series_validation_cache(self, tmp_path, validated_files):
+        files = self.create_series(tmp_path)
+        arguments = {
+            "etp": files["etp"][0],
+            "etp_filename_prefix": files["etp"][1],
+            "precipitation": files["prec"][0],
+            "precipitation_filename_prefix": files["prec"][1],
+            "ndvi": files["ndvi"][0],
+            "ndvi_filename_prefix": files["ndvi"][1],
+            "kp": files["kp"][0],
+            "kp_filename_prefix": files["kp"][1],
+            "landuse": files["lulc"][0],
+            "landuse_filename_prefix": files["lulc"][1],
+        }
+
+        first = InputRasterSeries(**arguments, validation_cache=ValidationCache(tmp_path / "cache"))
+        assert len(validated_files) == 10
+
+        validated_files.clear()
+        with open(os.path.join(files["kp"][0], "kp000000.002"), "w", encoding="utf-8") as f:
+            f.write("changed")
+
+        second = InputRasterSeries(
+            **arguments, validation_cache=ValidationCache(tmp_path / "cache")
+        )
+
+        assert validated_files == ["kp000000.002"]
+        assert second.problems == first.problems
+        assert len(second.problems) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers", [0, -1, 1.5])
+    def test_input_raster_series_invalid_validation_workers(self, tmp_path, workers):
+        with pytest.raises(ValueError):
+            InputRasterSeries(
+                etp=str(tmp_path / "etp.tif"),
+                etp_filename_prefix="",
+                precipitation=str(tmp_path / "prec"),
+                precipitation_filename_prefix="prec",
+                ndvi=str(tmp_path / "ndvi.tif"),
+                ndvi_filename_prefix="",
+                kp=str(tmp_path / "kp.tif"),
+                kp_filename_prefix="",
+                landuse=str(tmp_path / "lulc.tif"),
+                landuse_filename_prefix="",
+                validate_input=False,
+                validation_workers=workers,
+            )
@@ -88,3 +88,37 @@ class TestInputTables:
                 kc_max="/path/to/kc_max.csv",
                 validate_input=True,
             )
+
+    @pytest.mark.unit
+    def test_input_table_files_parameter_tables_replace_lookup_tables(self, fs):
+        fs.create_file("/path/to/rainy_days.csv", contents="42")
+        fs.create_file(
+            "/path/to/landuse.csv",
+            contents="class,a_i,a_o,a_s,a_v,manning,k_c_min,k_c_max\n1,0,0,0.1,0.9,0.6,0.8,1.1\n",
+        )
+        fs.create_file(
+            "/path/to/soil.csv",
+            contents="class,bulk_density,k_sat,t_fcap,t_sat,t_wp,rootzone_depth\n1,1.4,9,0.3,0.4,0.1,50\n",
+        )
+        input_tables = InputTableFiles(
+            rainy_days="/path/to/rainy_days.csv",
+            a_i="",
+            a_o="",
+            a_s="",
+            a_v="",
+            manning="",
+            bulk_density="",
+            k_sat="",
+            t_fcap="",
+            t_sat="",
+            t_wp="",
+            rootzone_depth="",
+            kc_min="",
+            kc_max="",
+            validate_input=True,
+            landuse_parameters="/path/to/landuse.csv",
+            soil_parameters="/path/to/soil.csv",
+        )
+
+        assert input_tables.landuse_parameters.classes.tolist() == [1]
+        assert input_tables.soil_parameters.values["rootzone_depth"].tolist() == [50]
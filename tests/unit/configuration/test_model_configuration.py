@@ -223,6 +223,33 @@ class TestModelConfiguration:
         input_dict["RASTERS"]["samples"] = None
         _ = ModelConfiguration(input_dict)
 
+    @pytest.mark.unit
+    def test_init_with_dictionary_forcing_transforms(self, mocker):
+        band_mock = MagicMock(spec=RasterBand)
+        band_mock.no_data_value = -9999
+        band_mock.data_array = np.ones((3, 3))
+        mocker.patch("osgeo.gdal.OpenEx")
+        mocker.patch("osgeo.gdal.GetDataTypeName")
+        mocker.patch("os.path.getsize", return_value=100)
+        mocker.patch("rubem.configuration.raster_map.RasterBand", return_value=band_mock)
+        input_dict = {
+            **self.valid_config_input,
+            "FORCING_TRANSFORMS": {"precipitation": {"monthly_factors": [1.1] * 12, "seed": 7}},
+        }
+
+        config = ModelConfiguration(input_dict)
+
+        assert list(config.forcing_transforms) == ["precipitation"]
+        assert config.forcing_transforms["precipitation"].seed == 7
+
+        input_dict["FORCING_TRANSFORMS"] = {"prec": {"monthly_factors": [1.1] * 12}}
+        with pytest.raises(ValueError):
+            _ = ModelConfiguration(input_dict)
+
+        input_dict["FORCING_TRANSFORMS"] = {"precipitation": {"monthly_factor": [1.1] * 12}}
+        with pytest.raises(ValueError, match="precipitation forcing transform settings"):
+            _ = ModelConfiguration(input_dict)
+
     @pytest.mark.unit
     def test_init_with_empty_dictionary(self):
         with pytest.raises(Exception):
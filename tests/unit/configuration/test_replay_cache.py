@@ -0,0 +1,36 @@
+import pytest
+
+from rubem.configuration.replay_cache import ReplayCache
+
+
+class TestReplayCache:
+
+    @pytest.mark.unit
+    def test_replay_cache_default_args(self):
+        rc = ReplayCache()
+        assert not rc.groundwater
+        assert not rc.any_enabled()
+
+    @pytest.mark.unit
+    def test_replay_cache_groundwater(self):
+        rc = ReplayCache(groundwater=True)
+        assert rc.groundwater
+        assert rc.any_enabled()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("routing", ["grid", "samples"])
+    def test_replay_cache_routing(self, routing):
+        rc = ReplayCache(routing=routing)
+        assert rc.routing == routing
+        assert rc.any_enabled()
+
+    @pytest.mark.unit
+    def test_replay_cache_routing_empty(self):
+        rc = ReplayCache(routing="")
+        assert rc.routing is None
+        assert not rc.any_enabled()
+
+    @pytest.mark.unit
+    def test_replay_cache_routing_bad_args(self):
+        with pytest.raises(ValueError):
+            _ = ReplayCache(routing="outlets")
@@ -0,0 +1,27 @@
+import pytest
+
+from rubem.configuration.routing import Routing
+
+
+class TestRouting:
+
+    @pytest.mark.unit
+    def test_routing_default_args(self):
+        r = Routing()
+        assert r.engine == "pcraster"
+        assert not r.is_batch
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "engine, is_batch", [("pcraster", False), ("numpy", False), ("batch", True)]
+    )
+    def test_routing_engine(self, engine, is_batch):
+        r = Routing(engine=engine)
+        assert r.engine == engine
+        assert r.is_batch == is_batch
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("engine", ["", "gdal", "NumPy"])
+    def test_routing_engine_bad_args(self, engine):
+        with pytest.raises(ValueError):
+            _ = Routing(engine=engine)
@@ -0,0 +1,47 @@
+import pytest
+
+from rubem.configuration.simulation_domain import SimulationDomain
+
+
+class TestSimulationDomain:
+
+    @pytest.mark.unit
+    def test_simulation_domain_default_args(self):
+        sd = SimulationDomain()
+        assert not sd.clip_to_samples_catchment
+        assert sd.preview_factor == 1
+        assert not sd.is_preview
+        assert sd.workers == 1
+        assert not sd.is_decomposed
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("clip", [True, False])
+    def test_simulation_domain_clip_to_samples_catchment(self, clip):
+        sd = SimulationDomain(clip_to_samples_catchment=clip)
+        assert sd.clip_to_samples_catchment == clip
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("factor, is_preview", [(1, False), (2, True), (8, True)])
+    def test_simulation_domain_preview_factor(self, factor, is_preview):
+        sd = SimulationDomain(preview_factor=factor)
+        assert sd.preview_factor == factor
+        assert sd.is_preview == is_preview
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("factor", [0, -1, 2.0, "2", True])
+    def test_simulation_domain_preview_factor_bad_args(self, factor):
+        with pytest.raises(ValueError):
+            _ = SimulationDomain(preview_factor=factor)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers, is_decomposed", [(1, False), (2, True), (16, True)])
+    def test_simulation_domain_workers(self, workers, is_decomposed):
+        sd = SimulationDomain(workers=workers)
+        assert sd.workers == workers
+        assert sd.is_decomposed == is_decomposed
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers", [0, -2, 4.0, "4", False])
+    def test_simulation_domain_workers_bad_args(self, workers):
+        with pytest.raises(ValueError):
+            _ = SimulationDomain(workers=workers)
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 import pytest
 
 from rubem.configuration.simulation_period import SimulationPeriod
@@ -78,3 +78,20 @@ class TestSimulationPeriod:
     def test_simulation_period_alignment_bad_args(self, start, end, alignment):
         with pytest.raises(Exception):
             SimulationPeriod(start=start, end=end, alignment=alignment)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "day, expected_step",
+        [
+            (date(2021, 1, 1), 25),
+            (date(2021, 1, 31), 25),
+            (datetime(2021, 3, 15, 12), 27),
+            (date(2022, 2, 1), 38),
+            (date(2020, 12, 31), 24),
+        ],
+    )
+    def test_simulation_period_get_step(self, day, expected_step):
+        sp = SimulationPeriod(
+            start=date(2021, 1, 1), end=date(2024, 3, 31), alignment=date(2019, 1, 1)
+        )
+        assert sp.get_step(day) == expected_step
@@ -0,0 +1,37 @@
+import pytest
+
+from rubem.configuration.model_configuration import ModelConfiguration
+from rubem.core import simulate
+
+
+class TestSimulate:
+
+    @pytest.mark.unit
+    def test_simulate_unknown_variable(self, mocker):
+        wrapper = mocker.patch("rubem.core.DynamicFrameworkWrapper")
+        config = mocker.MagicMock(spec=ModelConfiguration)
+        config.output_variables = mocker.MagicMock()
+        config.output_variables.get_variables.return_value = [{"id": "arn"}]
+
+        with pytest.raises(ValueError):
+            _ = simulate(config, variables=["xyz"])
+
+        wrapper.assert_not_called()
+
+    @pytest.mark.unit
+    def test_simulate_overrides_do_not_change_config(self, mocker):
+        mocker.patch("rubem.core.DynamicFrameworkWrapper")
+        loaded_settings = []
+
+        def model_configuration_init(self, config_input, *args, **kwargs):
+            loaded_settings.append(config_input)
+            self.output_variables = mocker.MagicMock()
+            self.simulation_period = mocker.MagicMock(total_steps=1, first_step=1)
+
+        mocker.patch.object(ModelConfiguration, "__init__", model_configuration_init)
+        settings = {"CALIBRATION": {"x": 0.5, "alpha": 4.5}}
+
+        _ = simulate(settings, overrides={"CALIBRATION": {"x": 0.9}}, variables=[])
+
+        assert loaded_settings == [{"CALIBRATION": {"x": 0.9, "alpha": 4.5}}]
+        assert settings == {"CALIBRATION": {"x": 0.5, "alpha": 4.5}}
@@ -0,0 +1,243 @@
+import threading
+
+import numpy as np
+import pcraster as pcr
+import pytest
+
+from rubem.file import _file_readers
+from rubem.file._file_readers import (
+    RasterGridGeometry,
+    generate_raster_series_file_name,
+    is_pcraster_map,
+    open_raster_dataset,
+    raster_matches_grid,
+    read_dataset_band,
+)
+
+
+class TestRasterGridGeometry:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "rows, cols, cell_size",
+        [(0, 1, 1.0), (1, 0, 1.0), (1, 1, 0.0), (1, 1, -1.0)],
+    )
+    def test_raster_grid_geometry_constructor_bad_args(self, rows, cols, cell_size):
+        with pytest.raises(ValueError):
+            _ = RasterGridGeometry(rows, cols, cell_size, 0.0, 0.0)
+
+    @pytest.mark.unit
+    def test_raster_grid_geometry_subset(self):
+        geometry = RasterGridGeometry(10, 20, 500.0, 1000.0, 9000.0)
+        window = geometry.subset(2, 3, 4, 5)
+        assert window == RasterGridGeometry(4, 5, 500.0, 2500.0, 8000.0)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "row_offset, col_offset, rows, cols",
+        [(-1, 0, 1, 1), (0, -1, 1, 1), (8, 0, 3, 1), (0, 18, 1, 3)],
+    )
+    def test_raster_grid_geometry_subset_outside(self, row_offset, col_offset, rows, cols):
+        geometry = RasterGridGeometry(10, 20, 500.0, 1000.0, 9000.0)
+        with pytest.raises(ValueError):
+            _ = geometry.subset(row_offset, col_offset, rows, cols)
+
+    @pytest.mark.unit
+    def test_raster_grid_geometry_window_in(self):
+        geometry = RasterGridGeometry(10, 20, 500.0, 1000.0, 9000.0)
+        window = geometry.subset(2, 3, 4, 5)
+        assert window.get_window_in(geometry.get_geotransform(), 20, 10) == (3, 2, 5, 4)
+
+    @pytest.mark.unit
+    def test_raster_grid_geometry_coarsen(self):
+        geometry = RasterGridGeometry(10, 21, 500.0, 1000.0, 9000.0)
+        assert geometry.coarsen(2) == RasterGridGeometry(5, 10, 1000.0, 1000.0, 9000.0)
+        assert geometry.coarsen(1) == geometry
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("factor", [0, -1, 11])
+    def test_raster_grid_geometry_coarsen_bad_args(self, factor):
+        geometry = RasterGridGeometry(10, 21, 500.0, 1000.0, 9000.0)
+        with pytest.raises(ValueError):
+            _ = geometry.coarsen(factor)
+
+    @pytest.mark.unit
+    def test_raster_grid_geometry_window_in_coarse_grid(self):
+        geometry = RasterGridGeometry(10, 21, 500.0, 1000.0, 9000.0)
+        window = geometry.coarsen(2).subset(1, 2, 3, 4)
+        assert window.get_window_in(geometry.get_geotransform(), 21, 10) == (4, 2, 8, 6)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "geotransform",
+        [
+            (1000.0, 300.0, 0.0, 9000.0, 0.0, -300.0),
+            (1000.0, 1000.0, 0.0, 9000.0, 0.0, -1000.0),
+            (1000.0, 250.0, 0.0, 9000.0, 0.0, -500.0),
+            (1100.0, 500.0, 0.0, 9000.0, 0.0, -500.0),
+            (1500.0, 500.0, 0.0, 9000.0, 0.0, -500.0),
+            (1000.0, 500.0, 0.1, 9000.0, 0.0, -500.0),
+        ],
+    )
+    def test_raster_grid_geometry_window_in_mismatch(self, geotransform):
+        geometry = RasterGridGeometry(10, 20, 500.0, 1000.0, 9000.0)
+        with pytest.raises(ValueError):
+            _ = geometry.get_window_in(geotransform, 20, 10)
+
+
+class TestGenerateRasterSeriesFileName:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "prefix, timestep, expected",
+        [
+            ("prec", 1, "prec0000.001"),
+            ("etp", 12, "etp00000.012"),
+            ("kp", 1000, "kp000001.000"),
+            ("ndvi0000", 999, "ndvi0000.999"),
+        ],
+    )
+    def test_generate_raster_series_file_name(self, prefix, timestep, expected):
+        assert generate_raster_series_file_name(prefix, timestep) == expected
+
+    @pytest.mark.unit
+    def test_generate_raster_series_file_name_keeps_directory(self, tmp_path):
+        result = generate_raster_series_file_name(tmp_path / "prec", 1)
+        assert result == str(tmp_path / "prec0000.001")
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "prefix, timestep, expected",
+        [("prec", 1, "prec0000001.tif"), ("etp", 12, "etp00000012.tif")],
+    )
+    def test_generate_raster_series_file_name_geotiff(self, prefix, timestep, expected):
+        assert generate_raster_series_file_name(prefix, timestep, ".tif") == expected
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("prefix, timestep", [("prec", -1), ("ndvi0000", 1000)])
+    def test_generate_raster_series_file_name_bad_args(self, prefix, timestep):
+        with pytest.raises(ValueError):
+            _ = generate_raster_series_file_name(prefix, timestep)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "file_path, expected",
+        [
+            ("dem.map", True),
+            ("DEM.MAP", True),
+            ("/maps/prec0000.001", True),
+            ("dem.tif", False),
+            ("/maps/prec0000001.tif", False),
+            ("dem.asc", False),
+        ],
+    )
+    def test_is_pcraster_map(self, file_path, expected):
+        assert is_pcraster_map(file_path) == expected
+
+
+class TestOpenRasterDataset:
+
+    @pytest.fixture
+    def opened(self, monkeypatch):
+        opened = []
+
+        class FakeDataset:
+            RasterXSize = 20
+            RasterYSize = 10
+
+            def GetGeoTransform(self):
+                return (1000.0, 500.0, 0.0, 9000.0, 0.0, -500.0)
+
+        def fake_open(file_path, *args, **kwargs):
+            opened.append(file_path)
+            return FakeDataset()
+
+        monkeypatch.setattr(_file_readers.gdal, "OpenEx", fake_open)
+        monkeypatch.setattr(_file_readers, "_open_datasets", threading.local())
+        return opened
+
+    @pytest.mark.unit
+    def test_open_raster_dataset_reuses_datasets(self, opened, tmp_path):
+        mosaic = tmp_path / "mosaic.tif"
+        mosaic.write_bytes(b"mosaic")
+
+        dataset = open_raster_dataset(mosaic)
+        assert open_raster_dataset(str(mosaic)) is dataset
+        assert opened == [str(mosaic)]
+
+        mosaic.write_bytes(b"new mosaic")
+        assert open_raster_dataset(mosaic) is not dataset
+        assert len(opened) == 2
+
+    @pytest.mark.unit
+    def test_open_raster_dataset_missing_file(self, opened, tmp_path):
+        with pytest.raises(RuntimeError):
+            open_raster_dataset(tmp_path / "missing.tif")
+
+        assert not opened
+
+    @pytest.mark.unit
+    def test_raster_matches_grid(self, opened, tmp_path):
+        mosaic = tmp_path / "mosaic.map"
+        mosaic.write_bytes(b"mosaic")
+        geometry = RasterGridGeometry(10, 20, 500.0, 1000.0, 9000.0)
+
+        assert raster_matches_grid(mosaic, geometry)
+        assert not raster_matches_grid(mosaic, geometry.subset(2, 3, 4, 5))
+
+
+class TestReadDatasetBand:
+
+    geometry = RasterGridGeometry(2, 2, 500.0, 1000.0, 9000.0)
+
+    @pytest.fixture
+    def int16_dataset(self, monkeypatch):
+        reads = []
+
+        class FakeBand:
+            DataType = "Int16"
+
+            def GetNoDataValue(self):
+                return -32768.0
+
+            def GetMetadataItem(self, name):
+                return None
+
+            def ReadAsArray(self, *window, **kwargs):
+                reads.append(kwargs["resample_alg"])
+                return np.array([[812, 815], [-32768, 820]], dtype=np.int16)
+
+        class FakeDataset:
+            RasterXSize = 2
+            RasterYSize = 2
+
+            def GetGeoTransform(self):
+                return (1000.0, 500.0, 0.0, 9000.0, 0.0, -500.0)
+
+            def GetRasterBand(self, band_number):
+                return FakeBand()
+
+        monkeypatch.setattr(_file_readers.gdal, "GetDataTypeName", lambda data_type: data_type)
+        return FakeDataset(), reads
+
+    @pytest.mark.unit
+    def test_read_dataset_band_int16_dem_as_scalar(self, int16_dataset):
+        dataset, reads = int16_dataset
+
+        array, data_type = read_dataset_band(dataset, 1, self.geometry, pcr.Scalar)
+
+        assert data_type == pcr.Scalar
+        assert array.dtype == np.float32
+        np.testing.assert_array_equal(array[0], [812.0, 815.0])
+        assert array[1, 0] == _file_readers.get_missing_value(pcr.Scalar)
+        assert reads == [_file_readers.gdal.GRIORA_Average]
+
+    @pytest.mark.unit
+    def test_read_dataset_band_int16_guessed_as_nominal(self, int16_dataset):
+        dataset, reads = int16_dataset
+
+        array, data_type = read_dataset_band(dataset, 1, self.geometry)
+
+        assert data_type == pcr.Nominal
+        assert array.dtype == np.int32
+        assert reads == [_file_readers.gdal.GRIORA_Mode]
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from rubem.file import _frame_cache
+from rubem.file._file_readers import RasterGridGeometry
+from rubem.file._frame_cache import FrameCache, cached_read, configure_frame_cache
+
+
+class TestFrameCache:
+
+    geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+
+    @pytest.fixture
+    def frame_cache(self, monkeypatch):
+        cache = FrameCache()
+        monkeypatch.setattr(_frame_cache, "_frame_cache", cache)
+        return cache
+
+    @pytest.mark.unit
+    def test_frame_cache_from_settings(self):
+        assert FrameCache.from_settings(None) is None
+        assert FrameCache.from_settings({"enabled": False}) is None
+
+        cache = FrameCache.from_settings({"enabled": True, "max_memory_mb": 2, "level": 6})
+
+        assert cache.max_memory == 2 * 1024 * 1024
+        assert cache.level == 6
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("settings", [{"max_memory": 0}, {"level": 0}, {"level": 10}])
+    def test_frame_cache_invalid_settings(self, settings):
+        with pytest.raises(ValueError):
+            FrameCache(**settings)
+
+    @pytest.mark.unit
+    def test_frame_cache_round_trip(self):
+        cache = FrameCache()
+        array = np.arange(6, dtype=np.float32).reshape(2, 3)
+
+        cache.put(("a",), array, "scalar")
+        frame, data_type = cache.get(("a",))
+
+        np.testing.assert_array_equal(frame, array)
+        assert frame.dtype == np.float32
+        assert data_type == "scalar"
+        assert cache.get(("b",)) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.unit
+    def test_frame_cache_evicts_least_recently_used(self):
+        array = np.zeros((16, 16), dtype=np.float32)
+        cache = FrameCache()
+        cache.put((0,), array, "scalar")
+        cache.max_memory = 2 * cache.memory
+
+        cache.put((1,), array, "scalar")
+        cache.get((0,))
+        cache.put((2,), array, "scalar")
+
+        assert len(cache) == 2
+        assert cache.get((1,)) is None
+        assert cache.get((0,)) is not None
+        assert cache.memory <= cache.max_memory
+
+    @pytest.mark.unit
+    def test_cached_read_reads_once(self, tmp_path, frame_cache):
+        path = tmp_path / "prec0000.001"
+        path.write_bytes(b"map")
+        reads = []
+
+        def read():
+            reads.append(1)
+            return np.ones((2, 3), dtype=np.float32), "scalar"
+
+        for _ in range(3):
+            array, data_type = cached_read(path, 1, self.geometry, None, read)
+
+        assert len(reads) == 1
+        np.testing.assert_array_equal(array, np.ones((2, 3)))
+        assert data_type == "scalar"
+
+        path.write_bytes(b"modified map")
+        cached_read(path, 1, self.geometry, None, read)
+        assert len(reads) == 2
+
+    @pytest.mark.unit
+    def test_cached_read_without_cache(self, monkeypatch):
+        monkeypatch.setattr(_frame_cache, "_frame_cache", None)
+        reads = []
+
+        cached_read("missing.map", 1, self.geometry, None, lambda: reads.append(1) or (None, None))
+
+        assert reads == [1]
+
+    @pytest.mark.unit
+    def test_configure_frame_cache(self, monkeypatch):
+        monkeypatch.setattr(_frame_cache, "_frame_cache", None)
+
+        cache = configure_frame_cache({"enabled": True})
+
+        assert _frame_cache.get_frame_cache() is cache
@@ -0,0 +1,122 @@
+import json
+import os
+
+import numpy as np
+import pcraster as pcr
+import pytest
+
+from rubem.file import _input_cube
+from rubem.file._file_readers import RasterGridGeometry, get_missing_value
+from rubem.file._input_cube import InputCube, ingest_raster_series
+
+
+class TestInputCube:
+
+    geometry = RasterGridGeometry(3, 4, 500.0, 1000.0, 9000.0)
+
+    @pytest.fixture
+    def series(self, monkeypatch, tmp_path):
+        def fake_read_raster_array(file_path, geometry, data_type=None):
+            name = os.path.basename(file_path)
+            if name == "cob00000.002":
+                raise RuntimeError(f"{file_path}: No such file or directory")
+
+            step = int(name.split(".")[-1])
+            if name.startswith("cob"):
+                return np.full((geometry.rows, geometry.cols), step, dtype=np.int32), pcr.Nominal
+
+            array = np.arange(geometry.rows * geometry.cols, dtype=np.float32).reshape(
+                geometry.rows, geometry.cols
+            )
+            return array + step, pcr.Scalar
+
+        monkeypatch.setattr(_input_cube, "read_raster_array", fake_read_raster_array)
+        return {
+            "precipitation": str(tmp_path / "prec"),
+            "landuse": str(tmp_path / "cob"),
+        }
+
+    @pytest.mark.unit
+    def test_input_cube_ingest_and_read(self, series, tmp_path):
+        cube = ingest_raster_series(tmp_path / "cube", series, 1, 3, self.geometry)
+
+        array, data_type = cube.read("precipitation", 2, self.geometry)
+        assert data_type == pcr.Scalar
+        assert isinstance(array.base, np.memmap) or isinstance(array, np.memmap)
+        np.testing.assert_array_equal(array, np.arange(12).reshape(3, 4) + 2)
+
+        array, data_type = cube.read("landuse", 3, self.geometry)
+        assert data_type == pcr.Nominal
+        np.testing.assert_array_equal(array, np.full((3, 4), 3))
+        assert not os.path.exists(f"{tmp_path / 'cube'}.tmp")
+
+    @pytest.mark.unit
+    def test_input_cube_ingest_requests_series_data_types(self, monkeypatch, tmp_path):
+        requested = {}
+
+        def fake_read_raster_array(file_path, geometry, data_type=None):
+            requested[os.path.basename(file_path)[:3]] = data_type
+            # Integer rasters, guessed as nominal unless a data type is requested
+            return np.ones((geometry.rows, geometry.cols), dtype=np.int32), data_type or pcr.Nominal
+
+        monkeypatch.setattr(_input_cube, "read_raster_array", fake_read_raster_array)
+        cube = ingest_raster_series(
+            tmp_path / "cube",
+            {"ndvi": str(tmp_path / "ndvi"), "landuse": str(tmp_path / "cob")},
+            1,
+            1,
+            self.geometry,
+        )
+
+        assert requested == {"ndv": pcr.Scalar, "cob": pcr.Nominal}
+        assert cube.read("ndvi", 1, self.geometry)[1] == pcr.Scalar
+
+    @pytest.mark.unit
+    def test_input_cube_missing_maps(self, series, tmp_path):
+        cube = ingest_raster_series(tmp_path / "cube", series, 1, 3, self.geometry)
+
+        with pytest.raises(RuntimeError):
+            cube.read("landuse", 2, self.geometry)
+
+        landuse = np.load(tmp_path / "cube" / "landuse.npy")
+        assert np.all(landuse[1] == get_missing_value(pcr.Nominal))
+
+    @pytest.mark.unit
+    def test_input_cube_read_window(self, series, tmp_path):
+        cube = ingest_raster_series(tmp_path / "cube", series, 1, 3, self.geometry)
+        window = self.geometry.subset(1, 2, 2, 2)
+
+        array, _ = cube.read("precipitation", 1, window)
+        np.testing.assert_array_equal(array, [[7, 8], [11, 12]])
+
+    @pytest.mark.unit
+    def test_input_cube_covers(self, series, tmp_path):
+        cube = ingest_raster_series(tmp_path / "cube", series, 1, 3, self.geometry)
+
+        assert cube.covers(series, 1, 3, self.geometry)
+        assert cube.covers(series, 2, 3, self.geometry.subset(1, 1, 2, 2))
+        assert not cube.covers(series, 1, 4, self.geometry)
+        assert not cube.covers({**series, "kp": str(tmp_path / "kp")}, 1, 3, self.geometry)
+        assert not cube.covers({**series, "landuse": str(tmp_path / "lulc")}, 1, 3, self.geometry)
+        assert not cube.covers(series, 1, 3, self.geometry.coarsen(3))
+
+    @pytest.mark.unit
+    def test_input_cube_not_found(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            InputCube(tmp_path / "cube")
+
+    @pytest.mark.unit
+    def test_input_cube_unsupported_format(self, series, tmp_path):
+        ingest_raster_series(tmp_path / "cube", series, 1, 3, self.geometry)
+        metadata_path = tmp_path / "cube" / "metadata.json"
+        metadata = json.loads(metadata_path.read_text())
+        metadata["version"] = 0
+        metadata_path.write_text(json.dumps(metadata))
+
+        with pytest.raises(ValueError):
+            InputCube(tmp_path / "cube")
+
+    @pytest.mark.unit
+    def test_input_cube_ingest_invalid_period(self, series, tmp_path):
+        with pytest.raises(ValueError):
+            ingest_raster_series(tmp_path / "cube", series, 3, 1, self.geometry)
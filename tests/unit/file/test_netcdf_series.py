@@ -0,0 +1,158 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from rubem.configuration.simulation_period import SimulationPeriod
+from rubem.file import _netcdf_series
+from rubem.file._file_readers import RasterGridGeometry
+from rubem.file._netcdf_series import NetCDFSeries, decode_cf_times, is_netcdf_series
+
+
+class FakeAttribute:
+    def __init__(self, value):
+        self.value = value
+
+    def ReadAsString(self):
+        return self.value
+
+
+class FakeMDArray:
+    def __init__(self, values=None, dimensions=None, attributes=None):
+        self.values = values
+        self.dimensions = dimensions or []
+        self.attributes = attributes or {}
+        self.view = None
+
+    def ReadAsArray(self):
+        return np.asarray(self.values)
+
+    def GetAttribute(self, name):
+        return FakeAttribute(self.attributes[name]) if name in self.attributes else None
+
+    def GetDimensions(self):
+        return self.dimensions
+
+    def GetScale(self):
+        return None
+
+    def GetOffset(self):
+        return None
+
+    def GetView(self, view):
+        self.view = view
+        return self
+
+    def AsClassicDataset(self, x_index, y_index):
+        return ("classic", x_index, y_index)
+
+
+class FakeDimension:
+    def __init__(self, name, dimension_type, indexing_variable=None):
+        self.name = name
+        self.dimension_type = dimension_type
+        self.indexing_variable = indexing_variable
+
+    def GetName(self):
+        return self.name
+
+    def GetType(self):
+        return self.dimension_type
+
+    def GetIndexingVariable(self):
+        return self.indexing_variable
+
+
+class TestNetCDFSeries:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("/data/prec.nc", True),
+            ("/data/era5.NC4:tp", True),
+            ("/data/prec/prec", False),
+            ("/data/prec.tif", False),
+        ],
+    )
+    def test_is_netcdf_series(self, path, expected):
+        assert is_netcdf_series(path) == expected
+
+    @pytest.mark.unit
+    def test_decode_cf_times(self):
+        dates = decode_cf_times([0, 31, 59.5], "days since 2000-01-01 00:00:00", "gregorian")
+        assert dates == [datetime(2000, 1, 1), datetime(2000, 2, 1), datetime(2000, 2, 29, 12)]
+
+        dates = decode_cf_times(np.array([24, 48]), "hours since 1990-1-1")
+        assert dates == [datetime(1990, 1, 2), datetime(1990, 1, 3)]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "units, calendar",
+        [("months since 2000-01-01", None), ("", None), ("days since 2000-01-01", "360_day")],
+    )
+    def test_decode_cf_times_unsupported(self, units, calendar):
+        with pytest.raises(ValueError):
+            decode_cf_times([0], units, calendar)
+
+    @pytest.fixture
+    def variable(self, monkeypatch):
+        time = FakeMDArray([0, 31, 60], attributes={"units": "days since 2000-01-01"})
+        latitudes = FakeMDArray([-10.0, -9.5])
+        variable = FakeMDArray(
+            dimensions=[
+                FakeDimension("time", "TEMPORAL", time),
+                FakeDimension("lat", "HORIZONTAL_Y", latitudes),
+                FakeDimension("lon", "HORIZONTAL_X", FakeMDArray([40.0, 40.5])),
+            ]
+        )
+
+        class FakeGroup:
+            def GetMDArrayNames(self):
+                return ["time", "lat", "lon", "prec"]
+
+            def OpenMDArray(self, name):
+                return variable if name == "prec" else FakeMDArray(dimensions=[None])
+
+        class FakeDataset:
+            def GetRootGroup(self):
+                return FakeGroup()
+
+        reads = []
+
+        def fake_read_dataset_band(dataset, band_number, geometry, data_type=None):
+            reads.append((dataset, band_number))
+            return np.zeros((geometry.rows, geometry.cols), dtype=np.float32), "scalar"
+
+        monkeypatch.setattr(_netcdf_series.gdal, "OpenEx", lambda *args: FakeDataset())
+        monkeypatch.setattr(_netcdf_series, "read_dataset_band", fake_read_dataset_band)
+        variable.reads = reads
+        return variable
+
+    @pytest.mark.unit
+    def test_netcdf_series_maps_time_to_timesteps(self, variable):
+        period = SimulationPeriod(date(2000, 2, 1), date(2000, 3, 31), alignment=date(1999, 1, 1))
+        series = NetCDFSeries("prec.nc", period)
+        geometry = RasterGridGeometry(2, 2, 0.5, 40.0, -9.0)
+
+        assert series.variable == "prec"
+        assert series.timesteps == [13, 14, 15]
+        assert variable.view == "[:,::-1,:]"
+
+        series.read(14, geometry)
+        assert variable.reads == [(("classic", 2, 1), 2)]
+
+        with pytest.raises(RuntimeError):
+            series.read(16, geometry)
+
+        series.close()
+        with pytest.raises(RuntimeError):
+            series.read(14, geometry)
+
+    @pytest.mark.unit
+    def test_netcdf_series_several_slices_per_month(self, variable):
+        variable.dimensions[0].indexing_variable.values = [0, 1, 31]
+        period = SimulationPeriod(date(2000, 1, 1), date(2000, 3, 31))
+
+        with pytest.raises(ValueError):
+            NetCDFSeries("prec.nc:prec", period)
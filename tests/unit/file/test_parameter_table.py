@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from rubem.file._parameter_table import ParameterTable
+
+
+class TestParameterTable:
+
+    columns = ("manning", "a_v")
+
+    def write_table(self, tmp_path, contents):
+        path = tmp_path / "landuse.csv"
+        path.write_text(contents)
+        return path
+
+    @pytest.mark.unit
+    def test_parameter_table_gathers_all_columns(self, tmp_path):
+        table = ParameterTable(
+            self.write_table(tmp_path, "class, manning, a_v, other\n7,0.6,0.9,1\n2,0.01,0,1\n"),
+            self.columns,
+        )
+        class_map = np.array([[2, 7], [-1, 2]], dtype=np.int32)
+
+        parameters = table.gather(class_map, -1, -9999.0)
+
+        assert table.classes.tolist() == [2, 7]
+        assert parameters.dtype.names == self.columns
+        np.testing.assert_allclose(parameters["manning"], [[0.01, 0.6], [-9999.0, 0.01]])
+        np.testing.assert_allclose(parameters["a_v"], [[0.0, 0.9], [-9999.0, 0.0]])
+
+    @pytest.mark.unit
+    def test_parameter_table_class_without_row(self, tmp_path):
+        table = ParameterTable(
+            self.write_table(tmp_path, "class,manning,a_v\n1,0.6,0.9\n"), self.columns
+        )
+
+        with pytest.raises(ValueError, match=r"\[3, 9\]"):
+            table.gather(np.array([[1, 3], [9, 9]]), -1, -9999.0)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            "class,manning\n1,0.6\n",
+            "class,manning,a_v\n1,0.6,0.9\n1,0.5,0.8\n",
+            "class,manning,a_v\n1.5,0.6,0.9\n",
+        ],
+    )
+    def test_parameter_table_invalid(self, tmp_path, contents):
+        with pytest.raises(ValueError):
+            ParameterTable(self.write_table(tmp_path, contents), self.columns)
+
+    @pytest.mark.unit
+    def test_parameter_table_not_found(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ParameterTable(tmp_path / "missing.csv", self.columns)
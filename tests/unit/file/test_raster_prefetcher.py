@@ -0,0 +1,113 @@
+import threading
+
+import numpy as np
+import pytest
+
+from rubem.file import _raster_prefetcher
+from rubem.file._file_readers import RasterGridGeometry
+from rubem.file._raster_prefetcher import RasterPrefetcher
+
+
+class TestRasterPrefetcher:
+
+    @pytest.fixture
+    def reads(self, monkeypatch):
+        reads = []
+
+        def fake_read_raster_array(file_path, geometry, data_type=None):
+            reads.append((file_path, threading.current_thread().name))
+            if "missing" in str(file_path):
+                raise RuntimeError(f"{file_path}: No such file or directory")
+            array = np.full((geometry.rows, geometry.cols), len(reads), dtype=np.float32)
+            return array, data_type or "scalar"
+
+        monkeypatch.setattr(_raster_prefetcher, "read_raster_array", fake_read_raster_array)
+        return reads
+
+    @pytest.mark.unit
+    def test_raster_prefetcher_reads_in_background(self, reads):
+        geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+        prefetcher = RasterPrefetcher(depth=2)
+        try:
+            assert prefetcher.prefetch("prec0000.001", geometry)
+            assert prefetcher.prefetch("prec0000.001", geometry)
+
+            array, data_type = prefetcher.get("prec0000.001", geometry)
+        finally:
+            prefetcher.close()
+
+        assert array.shape == (2, 3)
+        assert data_type == "scalar"
+        assert len(reads) == 1
+        assert reads[0][1].startswith("rubem-prefetch")
+
+    @pytest.mark.unit
+    def test_raster_prefetcher_reads_not_prefetched_rasters_synchronously(self, reads):
+        geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+        prefetcher = RasterPrefetcher()
+        try:
+            prefetcher.get("prec0000.001", geometry)
+        finally:
+            prefetcher.close()
+
+        assert reads == [("prec0000.001", threading.current_thread().name)]
+
+    @pytest.mark.unit
+    def test_raster_prefetcher_reads_requested_data_type(self, reads):
+        geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+        prefetcher = RasterPrefetcher()
+        try:
+            assert prefetcher.prefetch("cob00000.001", geometry, "nominal")
+
+            assert prefetcher.get("cob00000.001", geometry, "nominal")[1] == "nominal"
+            assert prefetcher.get("cob00000.002", geometry, "nominal")[1] == "nominal"
+        finally:
+            prefetcher.close()
+
+        assert len(reads) == 2
+
+    @pytest.mark.unit
+    def test_raster_prefetcher_memory_limit(self, reads):
+        geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+        prefetcher = RasterPrefetcher(max_memory=2 * 6 * 4)
+        try:
+            assert prefetcher.prefetch("prec0000.001", geometry)
+            assert prefetcher.prefetch("prec0000.002", geometry)
+            assert not prefetcher.prefetch("prec0000.003", geometry)
+
+            prefetcher.get("prec0000.001", geometry)
+            assert prefetcher.prefetch("prec0000.003", geometry)
+        finally:
+            prefetcher.close()
+
+    @pytest.mark.unit
+    def test_raster_prefetcher_raises_read_errors_when_taken(self, reads):
+        geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+        prefetcher = RasterPrefetcher()
+        try:
+            assert prefetcher.prefetch("missing0.001", geometry)
+
+            with pytest.raises(RuntimeError):
+                prefetcher.get("missing0.001", geometry)
+        finally:
+            prefetcher.close()
+
+    @pytest.mark.unit
+    def test_raster_prefetcher_from_settings(self):
+        assert RasterPrefetcher.from_settings(None) is None
+        assert RasterPrefetcher.from_settings({"enabled": False}) is None
+
+        prefetcher = RasterPrefetcher.from_settings(
+            {"enabled": True, "depth": 3, "workers": 4, "max_memory_mb": 1}
+        )
+        assert prefetcher.depth == 3
+        assert prefetcher.workers == 4
+        assert prefetcher.max_memory == 1024 * 1024
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "kwargs", [{"depth": 0}, {"max_memory": 0}, {"workers": 0}, {"depth": -1}]
+    )
+    def test_raster_prefetcher_invalid_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            RasterPrefetcher(**kwargs)
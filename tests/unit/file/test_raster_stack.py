@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from rubem.file import _raster_stack
+from rubem.file._file_readers import RasterGridGeometry
+from rubem.file._raster_stack import RasterStack, is_raster_stack
+
+
+class TestRasterStack:
+
+    geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+
+    @pytest.fixture
+    def reads(self, monkeypatch):
+        reads = []
+
+        class FakeDataset:
+            RasterCount = 3
+
+        def fake_read_dataset_band(dataset, band_number, geometry, data_type=None):
+            reads.append(band_number)
+            return np.full((geometry.rows, geometry.cols), band_number, dtype=np.float32), "scalar"
+
+        monkeypatch.setattr(_raster_stack.gdal, "OpenEx", lambda *args, **kwargs: FakeDataset())
+        monkeypatch.setattr(_raster_stack, "read_dataset_band", fake_read_dataset_band)
+        return reads
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("/data/ndvi.tif", True),
+            ("/data/NDVI.TIFF", True),
+            ("/data/ndvi/ndvi", False),
+            ("/data/ndvi.map", False),
+        ],
+    )
+    def test_is_raster_stack(self, path, expected):
+        assert is_raster_stack(path) == expected
+
+    @pytest.mark.unit
+    def test_raster_stack_reads_band_of_timestep(self, reads):
+        stack = RasterStack("ndvi.tif")
+
+        array, data_type = stack.read(2, self.geometry)
+
+        assert stack.band_count == 3
+        assert reads == [2]
+        np.testing.assert_array_equal(array, np.full((2, 3), 2))
+        assert data_type == "scalar"
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("timestep", [0, 4])
+    def test_raster_stack_missing_band(self, reads, timestep):
+        stack = RasterStack("ndvi.tif")
+
+        with pytest.raises(RuntimeError):
+            stack.read(timestep, self.geometry)
+
+        assert not reads
+
+    @pytest.mark.unit
+    def test_raster_stack_closed(self, reads):
+        stack = RasterStack("ndvi.tif")
+        stack.close()
+
+        with pytest.raises(RuntimeError):
+            stack.read(1, self.geometry)
@@ -0,0 +1,143 @@
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+
+from rubem.configuration.simulation_period import SimulationPeriod
+from rubem.file import _series_manifest
+from rubem.file import SeriesManifest, is_series_manifest, write_series_manifest
+from rubem.file._file_readers import RasterGridGeometry
+from rubem.file._series_files import is_single_file_series, open_single_file_series
+
+
+class TestSeriesManifest:
+
+    geometry = RasterGridGeometry(2, 3, 1.0, 0.0, 2.0)
+
+    @pytest.fixture
+    def period(self):
+        return SimulationPeriod(date(2000, 1, 1), date(2099, 12, 1))
+
+    def write_manifest(self, path, files):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": files}, f)
+
+        return path
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("/data/prec.json", True),
+            ("/data/PREC.JSON", True),
+            ("/data/prec/prec", False),
+            ("/data/prec0000.001", False),
+        ],
+    )
+    def test_is_series_manifest(self, path, expected):
+        assert is_series_manifest(path) == expected
+        assert is_single_file_series(path) == expected
+
+    @pytest.mark.unit
+    def test_series_manifest_maps_timesteps_and_months(self, tmp_path, period):
+        path = self.write_manifest(
+            tmp_path / "prec.json", {"1200": "prec/last.tif", "2000-02": "/data/feb2000.tif"}
+        )
+
+        manifest = SeriesManifest(path, period)
+
+        assert manifest.timesteps == [2, 1200]
+        assert manifest.get_file(1200) == str(tmp_path / "prec" / "last.tif")
+        assert manifest.get_file(2) == "/data/feb2000.tif"
+
+    @pytest.mark.unit
+    def test_series_manifest_missing_timestep(self, tmp_path):
+        manifest = SeriesManifest(self.write_manifest(tmp_path / "prec.json", {"1": "a.tif"}))
+
+        with pytest.raises(RuntimeError):
+            manifest.get_file(2)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "files",
+        [
+            {"1": "a.tif", "2000-01": "b.tif"},
+            {"January": "a.tif"},
+        ],
+    )
+    def test_series_manifest_invalid_files(self, tmp_path, period, files):
+        with pytest.raises(ValueError):
+            SeriesManifest(self.write_manifest(tmp_path / "prec.json", files), period)
+
+    @pytest.mark.unit
+    def test_series_manifest_holds_last_file(self, tmp_path, period):
+        path = tmp_path / "landuse.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "version": 1,
+                    "hold_last": True,
+                    "files": {"2000-01": "lulc2000.map", "2001-01": "lulc2001.map"},
+                }
+            )
+        )
+
+        manifest = SeriesManifest(path, period)
+
+        assert manifest.timesteps == [1, 13]
+        assert [manifest.get_change_point(step) for step in (1, 12, 13, 500)] == [1, 1, 13, 13]
+        assert manifest.get_file(12) == str(tmp_path / "lulc2000.map")
+        with pytest.raises(RuntimeError):
+            manifest.get_change_point(0)
+
+    @pytest.mark.unit
+    def test_series_manifest_month_requires_period(self, tmp_path):
+        with pytest.raises(ValueError):
+            SeriesManifest(self.write_manifest(tmp_path / "prec.json", {"2000-01": "a.tif"}))
+
+    @pytest.mark.unit
+    def test_series_manifest_unsupported_version(self, tmp_path):
+        path = tmp_path / "prec.json"
+        path.write_text(json.dumps({"version": 2, "files": {}}))
+
+        with pytest.raises(ValueError):
+            SeriesManifest(path)
+
+    @pytest.mark.unit
+    def test_series_manifest_reads_file_of_timestep(self, tmp_path, monkeypatch, period):
+        reads = []
+
+        def fake_read_raster_array(file_path, geometry, data_type=None):
+            reads.append(file_path)
+            return np.zeros((geometry.rows, geometry.cols), dtype=np.float32), "scalar"
+
+        monkeypatch.setattr(_series_manifest, "read_raster_array", fake_read_raster_array)
+        path = self.write_manifest(tmp_path / "prec.json", {"1500": "prec1500.tif"})
+
+        manifest = open_single_file_series(path, period)
+        array, data_type = manifest.read(1500, self.geometry)
+
+        assert isinstance(manifest, SeriesManifest)
+        assert reads == [str(tmp_path / "prec1500.tif")]
+        assert array.shape == (2, 3)
+        assert data_type == "scalar"
+
+    @pytest.mark.unit
+    def test_write_series_manifest_from_map_series(self, tmp_path):
+        series_dir = tmp_path / "prec"
+        series_dir.mkdir()
+        for name in ("prec0000.001", "prec0000.012", "prec0001001.tif", "other0000.001"):
+            (series_dir / name).touch()
+
+        manifest = write_series_manifest(tmp_path / "prec.json", series_dir / "prec")
+
+        assert manifest.timesteps == [1, 12, 1001]
+        assert manifest.get_file(1001) == str(series_dir / "prec0001001.tif")
+        with open(tmp_path / "prec.json", encoding="utf-8") as f:
+            assert json.load(f)["files"]["12"] == "prec/prec0000.012"
+
+    @pytest.mark.unit
+    def test_write_series_manifest_requires_series_or_files(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_series_manifest(tmp_path / "prec.json")
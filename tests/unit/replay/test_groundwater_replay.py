@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pytest
+
+from rubem.replay import GroundwaterReplay, ReplayStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    recharge = [[[10.0, np.nan]], [[0.0, 1.0]], [[30.0, 2.0]]]
+    store = ReplayStore.create(
+        tmp_path,
+        ["rec", "srn", "lfw"],
+        3,
+        (1, 2),
+        {
+            "groundwater": {
+                "alpha_gw": 0.5,
+                "baseflow_limit": 5.0,
+                "initial_baseflow": 1.0,
+                "initial_saturated_zone_storage": 10.0,
+            }
+        },
+    )
+    for t in range(3):
+        store.write("rec", t, np.array(recharge[t]))
+        store.write("srn", t, np.full((1, 2), 2.0))
+        store.write("lfw", t, np.full((1, 2), 1.0))
+
+    return store
+
+
+class TestGroundwaterReplay:
+
+    @pytest.mark.unit
+    def test_groundwater_replay_matches_recursion(self, store):
+        result = GroundwaterReplay(store).run(0.5, 5.0, 1.0, 10.0)
+
+        recession = math.exp(-0.5)
+        baseflow, storage = 1.0, 10.0
+        for t, recharge in enumerate([10.0, 0.0, 30.0]):
+            baseflow = (baseflow * recession + (1 - recession) * recharge) * (storage > 5.0)
+            storage = storage + recharge - baseflow
+            assert result["bfw"][t, 0, 0] == pytest.approx(baseflow, rel=1e-6)
+            assert result["sat_zone_storage"][t, 0, 0] == pytest.approx(storage, rel=1e-6)
+            assert result["rnf"][t, 0, 0] == pytest.approx(baseflow + 3.0, rel=1e-6)
+
+        assert np.all(np.isnan(result["bfw"][:, 0, 1]))
+
+    @pytest.mark.unit
+    def test_groundwater_replay_threshold(self, store):
+        result = GroundwaterReplay(store).run(0.5, 100.0, 1.0, 10.0)
+        assert np.all(result["bfw"][:, 0, 0] == 0)
+
+    @pytest.mark.unit
+    def test_groundwater_replay_from_metadata(self, store):
+        replay = GroundwaterReplay(store)
+        expected = replay.run(0.1, 5.0, 1.0, 10.0)
+        result = replay.run_from_metadata(alpha_gw=0.1)
+        np.testing.assert_array_equal(result["bfw"], expected["bfw"])
+
+    @pytest.mark.unit
+    def test_groundwater_replay_missing_series(self, tmp_path):
+        store = ReplayStore.create(tmp_path, ["rec"], 1, (1, 1))
+        with pytest.raises(KeyError):
+            _ = GroundwaterReplay(store)
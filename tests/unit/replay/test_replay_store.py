@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from rubem.replay import ReplayStore
+
+
+class TestReplayStore:
+
+    @pytest.mark.unit
+    def test_replay_store_create_and_read(self, tmp_path):
+        store = ReplayStore.create(tmp_path, ["rec", "srn"], 3, (2, 4), {"first_step": 5})
+        store.write("rec", 1, np.ones((2, 4)))
+        store.flush()
+
+        reopened = ReplayStore(tmp_path)
+        assert reopened.variables == ["rec", "srn"]
+        assert reopened.steps == 3
+        assert reopened.shape == (2, 4)
+        assert reopened.metadata["first_step"] == 5
+
+        series = reopened.read("rec")
+        assert series.shape == (3, 2, 4)
+        assert series.dtype == np.float32
+        assert np.all(series[1] == 1)
+        assert np.all(np.isnan(series[[0, 2]]))
+
+    @pytest.mark.unit
+    def test_replay_store_read_only(self, tmp_path):
+        ReplayStore.create(tmp_path, ["rec"], 1, (1, 1))
+        reopened = ReplayStore(tmp_path)
+        with pytest.raises(KeyError):
+            reopened.write("rec", 0, np.zeros((1, 1)))
+
+        with pytest.raises(KeyError):
+            _ = reopened.read("lfw")
+
+    @pytest.mark.unit
+    def test_replay_store_not_found(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            _ = ReplayStore(tmp_path)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "variables, steps, shape",
+        [
+            ([], 1, (1, 1)),
+            (["rec"], 0, (1, 1)),
+            (["rec"], 1, (0, 1)),
+            (["rec"], 1, ()),
+            (["rec"], 1, (1, 1, 1)),
+        ],
+    )
+    def test_replay_store_create_bad_args(self, tmp_path, variables, steps, shape):
+        with pytest.raises(ValueError):
+            _ = ReplayStore.create(tmp_path, variables, steps, shape)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from rubem.replay import ReplayStore, RoutingReplay, nash_sutcliffe_efficiency
+
+ACCUMULATED = np.array([[1.0, 2.0], [4.0, 0.0], [2.0, 6.0], [8.0, 1.0], [3.0, 3.0]])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReplayStore.create(
+        tmp_path, ["acc"], 5, (2,), {"routing": {"x": 0.5, "sample_ids": [3, 7]}}
+    )
+    for t, values in enumerate(ACCUMULATED):
+        store.write("acc", t, values)
+
+    return store
+
+
+def route(x):
+    runoff = np.zeros_like(ACCUMULATED)
+    previous = np.zeros(2)
+    for t, values in enumerate(ACCUMULATED):
+        previous = x * previous + (1 - x) * values
+        runoff[t] = previous
+
+    return runoff
+
+
+class TestRoutingReplay:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("x", [0.0, 0.3, 1.0])
+    def test_routing_replay_single_factor(self, store, x):
+        result = RoutingReplay(store).run(x)
+        assert result.shape == (5, 2)
+        np.testing.assert_allclose(result, route(x), rtol=1e-6)
+
+    @pytest.mark.unit
+    def test_routing_replay_many_factors(self, store):
+        factors = np.array([0.1, 0.5, 0.9])
+        result = RoutingReplay(store).run(factors)
+        assert result.shape == (3, 5, 2)
+        for k, x in enumerate(factors):
+            np.testing.assert_allclose(result[k], route(x), rtol=1e-6)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("x", [-0.1, 1.1, [[0.5]]])
+    def test_routing_replay_bad_factor(self, store, x):
+        with pytest.raises(ValueError):
+            _ = RoutingReplay(store).run(x)
+
+    @pytest.mark.unit
+    def test_routing_replay_calibrate(self, store):
+        observed = route(0.37)
+        observed[2, 1] = np.nan
+        x, score = RoutingReplay(store).calibrate(observed, tolerance=1e-5)
+        assert x == pytest.approx(0.37, abs=1e-3)
+        assert score == pytest.approx(1.0, abs=1e-6)
+
+    @pytest.mark.unit
+    def test_routing_replay_calibrate_bad_shape(self, store):
+        with pytest.raises(ValueError):
+            _ = RoutingReplay(store).calibrate(np.zeros((5, 3)))
+
+    @pytest.mark.unit
+    def test_routing_replay_sample_ids(self, store):
+        assert RoutingReplay(store).sample_ids == [3, 7]
+
+    @pytest.mark.unit
+    def test_routing_replay_missing_series(self, tmp_path):
+        store = ReplayStore.create(tmp_path, ["rec"], 1, (1,))
+        with pytest.raises(KeyError):
+            _ = RoutingReplay(store)
+
+
+class TestNashSutcliffeEfficiency:
+
+    @pytest.mark.unit
+    def test_nash_sutcliffe_efficiency(self):
+        observed = np.array([[1.0, 1.0], [2.0, np.nan], [3.0, 1.0]])
+        assert nash_sutcliffe_efficiency(observed, observed) == 1.0
+        assert nash_sutcliffe_efficiency(np.full_like(observed, 2.0), observed) == 0.0
+
+    @pytest.mark.unit
+    def test_nash_sutcliffe_efficiency_no_observations(self):
+        observed = np.full((3, 2), np.nan)
+        assert np.isnan(nash_sutcliffe_efficiency(np.zeros((3, 2)), observed))
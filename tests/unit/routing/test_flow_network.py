@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from rubem.routing import FlowNetwork
+
+MISSING_VALUE = 255
+
+
+def naive_accuflux(ldd: np.ndarray, material: np.ndarray) -> np.ndarray:
+    row_offsets = {1: 1, 2: 1, 3: 1, 4: 0, 6: 0, 7: -1, 8: -1, 9: -1}
+    col_offsets = {1: -1, 2: 0, 3: 1, 4: -1, 6: 1, 7: -1, 8: 0, 9: 1}
+    rows, cols = ldd.shape
+    accumulated = np.where(ldd != MISSING_VALUE, material, np.nan).astype(np.float64)
+    for row in range(rows):
+        for col in range(cols):
+            if ldd[row, col] == MISSING_VALUE:
+                continue
+
+            value = material[row, col]
+            r, c = row, col
+            while ldd[r, c] != 5:
+                r, c = r + row_offsets[ldd[r, c]], c + col_offsets[ldd[r, c]]
+                if not (0 <= r < rows and 0 <= c < cols) or ldd[r, c] == MISSING_VALUE:
+                    break
+
+                accumulated[r, c] += value
+
+    return accumulated
+
+
+def random_ldd(rows: int, cols: int, seed: int) -> np.ndarray:
+    """LDD of a random spanning forest, which has no cycles."""
+    rng = np.random.default_rng(seed)
+    ldd = np.full((rows, cols), MISSING_VALUE, dtype=np.uint8)
+    directions = {(1, -1): 1, (1, 0): 2, (1, 1): 3, (0, -1): 4, (0, 1): 6}
+    directions.update({(-1, -1): 7, (-1, 0): 8, (-1, 1): 9})
+    outlets = rng.choice(rows * cols, size=3, replace=False)
+    for outlet in outlets:
+        ldd.flat[outlet] = 5
+
+    while np.any(ldd == MISSING_VALUE):
+        row, col = np.argwhere(ldd == MISSING_VALUE)[
+            rng.integers(np.count_nonzero(ldd == MISSING_VALUE))
+        ]
+        neighbours = [
+            (dr, dc)
+            for dr, dc in directions
+            if 0 <= row + dr < rows
+            and 0 <= col + dc < cols
+            and ldd[row + dr, col + dc] != MISSING_VALUE
+        ]
+        if neighbours:
+            ldd[row, col] = directions[neighbours[rng.integers(len(neighbours))]]
+
+    return ldd
+
+
+class TestFlowNetwork:
+
+    @pytest.mark.unit
+    def test_flow_network_accumulate_converging(self):
+        ldd = np.array([[3, 2, 1], [6, 5, 4], [9, 8, 7]])
+
+        network = FlowNetwork.from_ldd(ldd, MISSING_VALUE)
+
+        assert len(network.levels) == 1
+        np.testing.assert_array_equal(
+            network.accumulate(np.ones((3, 3))), [[1, 1, 1], [1, 9, 1], [1, 1, 1]]
+        )
+
+    @pytest.mark.unit
+    def test_flow_network_accumulate_chain(self):
+        network = FlowNetwork.from_ldd(np.array([[6, 6, 6, 5]]), MISSING_VALUE)
+
+        assert len(network.levels) == 3
+        np.testing.assert_array_equal(
+            network.accumulate(np.array([[1.0, 2.0, 3.0, 4.0]])), [[1, 3, 6, 10]]
+        )
+
+    @pytest.mark.unit
+    def test_flow_network_accumulate_missing_cells(self):
+        ldd = np.array([[6, 6, MISSING_VALUE, 4, 6, 5]])
+        material = np.array([[1.0, 2.0, 3.0, 4.0, np.nan, 1.0]])
+
+        accumulated = FlowNetwork.from_ldd(ldd, MISSING_VALUE).accumulate(material)
+
+        # Cells draining into missing cells or outside the grid are outlets
+        np.testing.assert_array_equal(accumulated, [[1, 3, np.nan, 4, np.nan, np.nan]])
+
+    @pytest.mark.unit
+    def test_flow_network_accumulate_off_grid_outlet(self):
+        accumulated = FlowNetwork.from_ldd(np.array([[6, 6]]), MISSING_VALUE).accumulate(
+            np.ones((1, 2))
+        )
+        np.testing.assert_array_equal(accumulated, [[1, 2]])
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_flow_network_accumulate_random_network(self, seed):
+        ldd = random_ldd(12, 9, seed)
+        material = np.random.default_rng(seed).random(ldd.shape)
+
+        accumulated = FlowNetwork.from_ldd(ldd, MISSING_VALUE).accumulate(material)
+
+        np.testing.assert_allclose(accumulated, naive_accuflux(ldd, material))
+
+    @pytest.mark.unit
+    def test_flow_network_accumulate_block(self):
+        ldd = random_ldd(6, 5, 3)
+        material = np.random.default_rng(3).random((4, *ldd.shape))
+        network = FlowNetwork.from_ldd(ldd, MISSING_VALUE)
+
+        accumulated = network.accumulate(material)
+
+        assert accumulated.shape == material.shape
+        for step, values in enumerate(material):
+            np.testing.assert_allclose(accumulated[step], network.accumulate(values))
+
+    @pytest.mark.unit
+    def test_flow_network_accumulate_single_precision_block(self):
+        ldd = random_ldd(6, 5, 4)
+        material = np.random.default_rng(4).random((3, *ldd.shape)).astype(np.float32)
+        network = FlowNetwork.from_ldd(ldd, MISSING_VALUE)
+
+        accumulated = network.accumulate(material)
+
+        assert accumulated.dtype == np.float64
+        np.testing.assert_allclose(accumulated, network.accumulate(material.astype(np.float64)))
+
+    @pytest.mark.unit
+    def test_flow_network_cycle(self):
+        with pytest.raises(ValueError):
+            _ = FlowNetwork.from_ldd(np.array([[6, 4]]), MISSING_VALUE)
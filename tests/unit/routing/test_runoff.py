@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from rubem.routing import smooth_runoff
+
+
+def recursive_runoff(accumulated: np.ndarray, x: float, initial: float) -> np.ndarray:
+    runoff = np.empty(accumulated.shape)
+    previous = initial
+    for t, values in enumerate(accumulated):
+        runoff[t] = x * previous + (1 - x) * values
+        previous = runoff[t]
+
+    return runoff
+
+
+class TestSmoothRunoff:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("steps", [1, 2, 7, 64, 100])
+    @pytest.mark.parametrize("x", [0.0, 0.35, 1.0])
+    def test_smooth_runoff(self, steps, x):
+        accumulated = np.random.default_rng(steps).random((steps, 3, 4))
+
+        runoff = smooth_runoff(accumulated, x, initial=2.0)
+
+        np.testing.assert_allclose(runoff, recursive_runoff(accumulated, x, 2.0))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("chunk_steps", [1, 3, 7])
+    def test_smooth_runoff_chunks(self, chunk_steps):
+        accumulated = np.random.default_rng(chunk_steps).random((10, 3, 4))
+        runoff = np.empty(accumulated.shape)
+        initial = 0.0
+        for start in range(0, len(accumulated), chunk_steps):
+            chunk = smooth_runoff(accumulated[start : start + chunk_steps], 0.35, initial=initial)
+            runoff[start : start + chunk_steps] = chunk
+            initial = chunk[-1]
+
+        np.testing.assert_allclose(runoff, smooth_runoff(accumulated, 0.35))
+
+    @pytest.mark.unit
+    def test_smooth_runoff_missing_values(self):
+        accumulated = np.array([[1.0, np.nan], [1.0, 1.0]])
+
+        runoff = smooth_runoff(accumulated, 0.5)
+
+        np.testing.assert_allclose(runoff, [[0.5, np.nan], [0.75, np.nan]])
+
+    @pytest.mark.unit
+    def test_smooth_runoff_no_steps(self):
+        assert smooth_runoff(np.empty((0, 2)), 0.5).shape == (0, 2)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("x", [-0.1, 1.5])
+    def test_smooth_runoff_bad_args(self, x):
+        with pytest.raises(ValueError):
+            _ = smooth_runoff(np.ones((2, 2)), x)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from rubem._basin_decomposition import mosaic_partitions, partition_basins
+
+
+class TestPartitionBasins:
+
+    @pytest.mark.unit
+    def test_partition_basins_balanced(self):
+        basins = np.array(
+            [
+                [1, 1, 1, 2],
+                [1, 1, 3, 2],
+                [4, 4, 3, -1],
+            ]
+        )
+
+        partitions = partition_basins(basins, -1, 2)
+
+        assert len(partitions) == 2
+        # Basin 1 (5 cells) alone, basins 2, 3 and 4 (2 cells each) together
+        np.testing.assert_array_equal(partitions[0], basins == 1)
+        np.testing.assert_array_equal(partitions[1], np.isin(basins, [2, 3, 4]))
+        assert not np.any(partitions[0] & partitions[1])
+
+    @pytest.mark.unit
+    def test_partition_basins_fewer_basins_than_partitions(self):
+        basins = np.array([[5, 5], [6, -1]])
+
+        partitions = partition_basins(basins, -1, 8)
+
+        assert len(partitions) == 2
+        assert sum(np.count_nonzero(p) for p in partitions) == 3
+
+    @pytest.mark.unit
+    def test_partition_basins_single_partition(self):
+        basins = np.array([[5, 5], [6, -1]])
+
+        partitions = partition_basins(basins, -1, 1)
+
+        assert len(partitions) == 1
+        np.testing.assert_array_equal(partitions[0], basins != -1)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("partitions", [0, -1])
+    def test_partition_basins_bad_args(self, partitions):
+        with pytest.raises(ValueError):
+            _ = partition_basins(np.ones((2, 2)), -1, partitions)
+
+
+class TestMosaicPartitions:
+
+    @pytest.mark.unit
+    def test_mosaic_partitions(self):
+        first = np.array([[[1.0, np.nan], [2.0, 3.0]]])
+        second = np.array([[[np.nan, 4.0]]])
+
+        mosaic = mosaic_partitions((3, 3), [((0, 0), {"arn": first}), ((0, 1), {"arn": second})])
+
+        assert mosaic["arn"].shape == (1, 3, 3)
+        np.testing.assert_array_equal(
+            mosaic["arn"][0],
+            [[1.0, np.nan, 4.0], [2.0, 3.0, np.nan], [np.nan, np.nan, np.nan]],
+        )
+
+    @pytest.mark.unit
+    def test_mosaic_partitions_to_files(self, tmp_path):
+        first = np.array([[[1.0, np.nan], [2.0, 3.0]], [[5.0, 6.0], [np.nan, 7.0]]])
+        second = np.array([[[np.nan, 4.0]], [[8.0, np.nan]]])
+        partitions = [((0, 0), {"arn": first}), ((0, 1), {"arn": second})]
+
+        mosaic = mosaic_partitions((3, 3), partitions, path=str(tmp_path))
+
+        assert isinstance(mosaic["arn"], np.memmap)
+        assert (tmp_path / "arn.npy").is_file()
+        np.testing.assert_array_equal(mosaic["arn"], mosaic_partitions((3, 3), partitions)["arn"])
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from rubem._sample_locations import SampleLocations
+from rubem.hooks import StepContext, StepHook
+
+
+class TestStepContext:
+
+    @pytest.mark.unit
+    def test_step_context_array_shares_memory(self, mocker):
+        values = np.array([[1.0, 2.0], [3.0, np.nan]], dtype=np.float32)
+        pcr = mocker.patch("rubem.hooks.pcr")
+        pcr.pcr_as_numpy.return_value = values
+        field = mocker.MagicMock()
+        field.isSpatial.return_value = True
+
+        context = StepContext(1, datetime(2000, 1, 1), {"arn": field})
+
+        assert context.array("arn") is values
+        assert context.array("arn") is values
+        pcr.pcr_as_numpy.assert_called_once_with(field)
+        pcr.spatial.assert_not_called()
+
+    @pytest.mark.unit
+    def test_step_context_array_non_spatial(self, mocker):
+        pcr = mocker.patch("rubem.hooks.pcr")
+        field = mocker.MagicMock()
+        field.isSpatial.return_value = False
+
+        context = StepContext(1, datetime(2000, 1, 1), {"bfw": field})
+        _ = context.array("bfw")
+
+        pcr.spatial.assert_called_once_with(field)
+        pcr.pcr_as_numpy.assert_called_once_with(pcr.spatial.return_value)
+
+    @pytest.mark.unit
+    def test_step_context_sample(self, mocker):
+        pcr = mocker.patch("rubem.hooks.pcr")
+        pcr.pcr_as_numpy.return_value = np.array([[1.0, 2.0], [3.0, np.nan]])
+        sample_locations = SampleLocations(np.array([[1, 1], [2, 2]]), 0)
+
+        context = StepContext(
+            1, datetime(2000, 1, 1), {"rnf": mocker.MagicMock()}, sample_locations
+        )
+
+        np.testing.assert_array_equal(context.sample("rnf"), [1.5, 3.0])
+
+    @pytest.mark.unit
+    def test_step_context_sample_without_locations(self, mocker):
+        context = StepContext(1, datetime(2000, 1, 1), {"rnf": mocker.MagicMock()})
+        with pytest.raises(ValueError):
+            _ = context.sample("rnf")
+
+    @pytest.mark.unit
+    def test_step_context_unknown_field(self):
+        context = StepContext(1, datetime(2000, 1, 1), {})
+        with pytest.raises(KeyError):
+            _ = context.array("arn")
+
+
+class TestStepHook:
+
+    @pytest.mark.unit
+    def test_step_hook_default_methods(self, mocker):
+        hook = StepHook()
+        hook.initial(mocker.MagicMock())
+        hook.dynamic(StepContext(1, datetime(2000, 1, 1), {}))
+        hook.final(mocker.MagicMock())
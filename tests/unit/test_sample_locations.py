@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from rubem._sample_locations import SampleLocations
+
+
+class TestSampleLocations:
+
+    @pytest.mark.unit
+    def test_sample_locations_average(self):
+        samples = np.array([[7, 7, -1], [3, -1, 9]])
+        values = np.array([[1.0, 3.0, 5.0], [4.0, 6.0, np.nan]])
+
+        sample_locations = SampleLocations(samples, -1)
+
+        np.testing.assert_array_equal(sample_locations.ids, [3, 7, 9])
+        assert len(sample_locations) == 3
+        np.testing.assert_array_equal(sample_locations.average(values), [4.0, 2.0, np.nan])
+
+    @pytest.mark.unit
+    def test_sample_locations_empty(self):
+        sample_locations = SampleLocations(np.full((2, 2), -1), -1)
+        assert len(sample_locations) == 0
+        assert sample_locations.average(np.ones((2, 2))).size == 0